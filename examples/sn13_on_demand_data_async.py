@@ -15,43 +15,10 @@ As of the latest data-universe release:
 import os
 import asyncio
 import time
-from typing import Optional
 
 import macrocosmos as mc
 
 
-async def fetch_data(
-    client: mc.AsyncSn13Client,
-    source: str,
-    request_id: int,
-    limit: int = 100,
-    start_date: Optional[str] = None,
-    end_date: Optional[str] = None,
-    keyword_mode: Optional[str] = None,
-    url: Optional[str] = None,
-    keywords: Optional[list] = None,
-    usernames: Optional[list] = None,
-):
-    """Fetch data for a single request and track its timing."""
-    start_time = time.time()
-    print(f"Starting request {request_id}...")
-
-    response = await client.sn13.OnDemandData(
-        source=source,
-        usernames=usernames,
-        keywords=keywords,
-        start_date=start_date,
-        end_date=end_date,
-        limit=limit,
-        keyword_mode=keyword_mode,
-        url=url,
-    )
-
-    end_time = time.time()
-    print(f"\nRequest {request_id} completed in {end_time - start_time:.2f} seconds")
-    return response
-
-
 async def main():
     # Get API key from environment variables
     api_key = os.environ.get("SN13_API_KEY", os.environ.get("MACROCOSMOS_API_KEY"))
@@ -73,7 +40,6 @@ async def main():
             "start_date": "2024-04-01",
             "end_date": "2024-04-28",
             "limit": 5,
-            "request_id": 1,
             "keyword_mode": "any",
         },
         {
@@ -86,7 +52,6 @@ async def main():
             "start_date": "2025-10-01",
             "end_date": "2025-10-06",
             "limit": 1,
-            "request_id": 2,
             "keyword_mode": "all",
         },
         {
@@ -95,7 +60,6 @@ async def main():
             "start_date": "2025-07-01",
             "end_date": "2025-09-04",
             "limit": 1,
-            "request_id": 3,
         },
         {
             "source": "youtube",
@@ -103,7 +67,6 @@ async def main():
             "start_date": "2025-07-01",
             "end_date": "2025-09-04",
             "limit": 1,
-            "request_id": 4,
         },
         {
             "source": "x",
@@ -111,33 +74,33 @@ async def main():
             "start_date": "2025-01-01T00:00:00Z",
             "end_date": "2025-10-31T23:59:57Z",
             "limit": 1,
-            "request_id": 5,
         },
     ]
 
     print("Starting concurrent requests...")
     start_time = time.time()
 
-    # Create tasks for all requests
-    tasks = [fetch_data(client, **request) for request in requests]
-
-    # Stream results as each request completes
+    # Stream results as each request completes; at most 3 requests are in flight at once
     completed = 0
-    for coro in asyncio.as_completed(tasks):
-        try:
-            response = await coro
-            completed += 1
-            elapsed = time.time() - start_time
-            print(f"\n[{completed}/{len(tasks)}] completed at {elapsed:.2f} seconds")
-            print("\n--------------------------------")
-            print(f"\nResponse {completed}:")
-            print(f"Status: {response.get('status', 'completed')}")
-            print(f"Number of results: {len(response.get('data', []))}")
-            print(f"Data: {response.get('data', [])}")
-        except Exception as e:
-            completed += 1
-            elapsed = time.time() - start_time
-            print(f"\n[{completed}/{len(tasks)}] failed at {elapsed:.2f} seconds: {e}")
+    async for result in client.sn13.OnDemandDataMany(requests, max_concurrency=3):
+        completed += 1
+        elapsed = time.time() - start_time
+        request_id = result.index + 1
+        if not result.ok:
+            print(
+                f"\n[{completed}/{len(requests)}] request {request_id} failed at {elapsed:.2f} seconds: {result.error}"
+            )
+            continue
+
+        response = result.response
+        print(
+            f"\n[{completed}/{len(requests)}] request {request_id} completed at {elapsed:.2f} seconds"
+        )
+        print("\n--------------------------------")
+        print(f"\nResponse {request_id}:")
+        print(f"Status: {response.get('status', 'completed')}")
+        print(f"Number of results: {len(response.get('data', []))}")
+        print(f"Data: {response.get('data', [])}")
 
     end_time = time.time()
     print(f"\nAll requests completed in {end_time - start_time:.2f} seconds")
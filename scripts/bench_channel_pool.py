@@ -0,0 +1,88 @@
+import asyncio
+import statistics
+import time
+from concurrent import futures
+
+import grpc
+
+import macrocosmos as mc
+from macrocosmos.generated.gravity.v1 import gravity_pb2, gravity_pb2_grpc
+
+"""
+This script measures the per-call latency of `GetCrawler` with a fresh channel per call
+(the SDK behavior before channel pooling) and with the client's pooled channel.
+It runs against a local stand-in gRPC server, so no API key or network access is needed.
+Run it from the root directory of the repo with
+`uv run scripts/bench_channel_pool.py`
+
+The stand-in server is plaintext, so the numbers exclude the TLS handshake that a fresh
+channel also pays against the real API; the real-world gap is larger.
+"""
+
+CALLS = 500
+
+
+class StandInGravityService(gravity_pb2_grpc.GravityServiceServicer):
+    def GetCrawler(self, request, context):
+        return gravity_pb2.GetCrawlerResponse(
+            crawler=gravity_pb2.Crawler(crawler_id=request.crawler_id)
+        )
+
+
+def start_server() -> tuple:
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=8))
+    gravity_pb2_grpc.add_GravityServiceServicer_to_server(
+        StandInGravityService(), server
+    )
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+    return server, f"localhost:{port}"
+
+
+async def fresh_channel_call(client: mc.AsyncGravityClient) -> None:
+    channel = client._create_async_channel()
+    try:
+        stub = gravity_pb2_grpc.GravityServiceStub(channel)
+        await stub.GetCrawler(gravity_pb2.GetCrawlerRequest(crawler_id="crawler-0"))
+    finally:
+        await channel.close()
+
+
+async def pooled_channel_call(client: mc.AsyncGravityClient) -> None:
+    await client.gravity.GetCrawler(crawler_id="crawler-0")
+
+
+async def measure(name: str, call, client: mc.AsyncGravityClient) -> None:
+    # Warm up so that neither variant pays for one-off initialization
+    for _ in range(10):
+        await call(client)
+
+    latencies = []
+    for _ in range(CALLS):
+        start = time.perf_counter()
+        await call(client)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies.sort()
+    print(
+        f"{name:<16} mean={statistics.mean(latencies):7.3f}ms "
+        f"p50={latencies[len(latencies) // 2]:7.3f}ms "
+        f"p99={latencies[int(len(latencies) * 0.99)]:7.3f}ms"
+    )
+
+
+async def main():
+    server, address = start_server()
+    try:
+        async with mc.AsyncGravityClient(
+            api_key="benchmark", base_url=address, secure=False, compress=False
+        ) as client:
+            print(f"GetCrawler latency over {CALLS} calls against {address}")
+            await measure("fresh channel", fresh_channel_call, client)
+            await measure("pooled channel", pooled_channel_call, client)
+    finally:
+        server.stop(None)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
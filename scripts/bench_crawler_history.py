@@ -0,0 +1,88 @@
+import argparse
+import time
+
+import numpy as np
+
+from macrocosmos.generated.gravity.v1 import gravity_pb2
+from macrocosmos.resources.crawler_history import CrawlerHistory
+
+"""
+This script compares per-crawler Python loops with the vectorized `CrawlerHistory` for
+fleet-wide collection rates, moving averages and time-to-target estimates. The one-off
+conversion of the response is reported separately, as it costs more than the forecast.
+It builds a synthetic `GetCrawlerHistory` response locally, so no API key or network access
+is needed.
+Run it from the root directory of the repo with
+`uv run scripts/bench_crawler_history.py --crawlers 5000 --entries 48`
+"""
+
+WINDOW = 6
+
+
+def build_response(
+    crawlers: int, entries: int
+) -> gravity_pb2.GetCrawlerHistoryResponse:
+    rng = np.random.default_rng(0)
+    response = gravity_pb2.GetCrawlerHistoryResponse(gravity_task_id="benchmark")
+    for i in range(crawlers):
+        crawler = response.crawlers.add(crawler_id=f"crawler-{i}")
+        records = np.cumsum(rng.integers(0, 500, entries))
+        for j in range(entries):
+            entry = crawler.crawler_history.add(
+                records_collected=int(records[j]), bytes_collected=int(records[j]) * 700
+            )
+            entry.ingest_dt.FromSeconds(1_700_000_000 + j * 3600)
+    return response
+
+
+def loop_forecast(response, target):
+    etas = {}
+    for crawler in response.crawlers:
+        history = sorted(
+            (entry.ingest_dt.ToSeconds(), entry.records_collected)
+            for entry in crawler.crawler_history
+        )
+        rates = [
+            (history[i][1] - history[i - 1][1]) / (history[i][0] - history[i - 1][0])
+            for i in range(1, len(history))
+        ]
+        recent = rates[-WINDOW:]
+        rate = sum(recent) / len(recent) if recent else 0.0
+        remaining = target - history[-1][1] if history else target
+        etas[crawler.crawler_id] = (
+            0.0 if remaining <= 0 else remaining / rate if rate > 0 else float("inf")
+        )
+    return etas
+
+
+def vectorized_forecast(history, target):
+    rates = history.rates()
+    history.moving_average(rates, WINDOW)
+    return history.time_to_target(target, window=WINDOW)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--crawlers", type=int, default=5000)
+    parser.add_argument("--entries", type=int, default=48)
+    parser.add_argument("--target", type=int, default=100_000)
+    args = parser.parse_args()
+
+    response = build_response(args.crawlers, args.entries)
+    print(f"{args.crawlers} crawlers, {args.crawlers * args.entries} history entries")
+
+    start = time.perf_counter()
+    loop_forecast(response, args.target)
+    print(f"{'python loops':>26}: {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    start = time.perf_counter()
+    history = CrawlerHistory.from_response(response)
+    converted = time.perf_counter()
+    vectorized_forecast(history, args.target)
+    done = time.perf_counter()
+    print(f"{'CrawlerHistory conversion':>26}: {(converted - start) * 1000:8.1f} ms")
+    print(f"{'vectorized forecast':>26}: {(done - converted) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import argparse
+import http.server
+import os
+import re
+import tempfile
+import threading
+import time
+
+import macrocosmos as mc
+
+"""
+This script compares single-stream and parallel range-request downloads of dataset files.
+It serves a random file from a local HTTP server that throttles each connection, as object
+stores and CDNs do, so no API key or network access is needed.
+Run it from the root directory of the repo with
+`uv run scripts/bench_download.py --size-mb 64 --connections 8`
+"""
+
+
+class ThrottledRangeHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the files of a directory with range support, at a fixed rate per connection."""
+
+    directory = ""
+    bytes_per_second = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        path = os.path.join(self.directory, os.path.basename(self.path.split("?")[0]))
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        size = os.path.getsize(path)
+        start, end = 0, size - 1
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range") or "")
+        if match:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else end
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+
+        chunk_size = 256 * 1024
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining:
+                chunk = f.read(min(chunk_size, remaining))
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+                time.sleep(len(chunk) / self.bytes_per_second)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--connections", type=int, default=8)
+    parser.add_argument("--part-mb", type=int, default=4)
+    parser.add_argument(
+        "--mb-per-second", type=float, default=32, help="throughput per connection"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        served = os.path.join(directory, "served")
+        os.makedirs(served)
+        with open(os.path.join(served, "data.parquet"), "wb") as f:
+            f.write(os.urandom(args.size_mb * 1024 * 1024))
+
+        ThrottledRangeHandler.directory = served
+        ThrottledRangeHandler.bytes_per_second = args.mb_per_second * 1024 * 1024
+        server = http.server.ThreadingHTTPServer(
+            ("127.0.0.1", 0), ThrottledRangeHandler
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        files = [
+            {
+                "file_name": "data.parquet",
+                "url": f"http://127.0.0.1:{server.server_address[1]}/data.parquet",
+                "file_size_bytes": args.size_mb * 1024 * 1024,
+            }
+        ]
+
+        client = mc.GravityClient(api_key="benchmark")
+        try:
+            for label, connections, part_size in (
+                ("single stream", 1, args.size_mb * 1024 * 1024),
+                (
+                    f"{args.connections} range requests",
+                    args.connections,
+                    args.part_mb * 1024 * 1024,
+                ),
+            ):
+                output = os.path.join(directory, label.replace(" ", "_"))
+                start = time.perf_counter()
+                client.gravity.download_dataset_files(
+                    files, output, max_connections=connections, part_size=part_size
+                )
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{label:>20}: {elapsed:6.2f}s, {args.size_mb / elapsed:7.1f} MB/s"
+                )
+        finally:
+            client.close()
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import argparse
+import multiprocessing
+import tempfile
+import time
+from concurrent import futures
+
+import grpc
+
+import macrocosmos as mc
+from macrocosmos.generated.gravity.v1 import gravity_pb2, gravity_pb2_grpc
+
+"""
+This script checks the cross-process rate limiter: several worker processes share one API
+key and one FileRateLimitBackend directory, and together they must not exceed the limit.
+It runs against a local stand-in gRPC server, so no API key or network access is needed.
+Run it from the root directory of the repo with
+`uv run scripts/bench_rate_limit.py --processes 8 --calls 25 --rate 50`
+"""
+
+
+class StandInGravityService(gravity_pb2_grpc.GravityServiceServicer):
+    def GetCrawler(self, request, context):
+        return gravity_pb2.GetCrawlerResponse(
+            crawler=gravity_pb2.Crawler(crawler_id=request.crawler_id)
+        )
+
+
+def start_server() -> tuple:
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=16))
+    gravity_pb2_grpc.add_GravityServiceServicer_to_server(
+        StandInGravityService(), server
+    )
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+    return server, f"localhost:{port}"
+
+
+def worker(address: str, directory: str, rate: float, calls: int) -> list:
+    rate_limiter = mc.RateLimiter(
+        {"GravityService": mc.RateLimit(rate, burst=1)},
+        backend=mc.FileRateLimitBackend(directory),
+    )
+    timestamps = []
+    with mc.GravityClient(
+        api_key="benchmark",
+        base_url=address,
+        secure=False,
+        rate_limiter=rate_limiter,
+    ) as client:
+        for i in range(calls):
+            client.gravity.GetCrawler(crawler_id=f"crawler-{i}")
+            timestamps.append(time.time())
+    return timestamps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--calls", type=int, default=25, help="calls per process")
+    parser.add_argument(
+        "--rate", type=float, default=50, help="shared calls per second"
+    )
+    args = parser.parse_args()
+
+    server, address = start_server()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.time()
+            # Spawn, as forking a process that runs a gRPC server is unsafe
+            with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+                results = pool.starmap(
+                    worker,
+                    [(address, directory, args.rate, args.calls)] * args.processes,
+                )
+            elapsed = time.time() - start
+    finally:
+        server.stop(None)
+
+    timestamps = sorted(t for result in results for t in result)
+    total = len(timestamps)
+    # The busiest one-second window across all processes
+    busiest = max(
+        sum(1 for t in timestamps[i:] if t - timestamps[i] < 1.0) for i in range(total)
+    )
+    print(
+        f"{total} calls from {args.processes} processes in {elapsed:.2f}s: "
+        f"{total / (timestamps[-1] - timestamps[0]):.1f} calls/s overall, "
+        f"at most {busiest} in any second (limit {args.rate:g}/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
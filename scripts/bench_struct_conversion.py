@@ -0,0 +1,110 @@
+import statistics
+import time
+
+from google.protobuf.json_format import MessageToDict
+
+from macrocosmos.generated.sn13.v1 import sn13_validator_pb2
+from macrocosmos.resources.ondemand.lazy import (
+    LazyOnDemandDataResponse,
+    response_to_dict,
+)
+
+"""
+This script measures the cost of converting a large SN13 `OnDemandDataResponse` to Python:
+`MessageToDict` (the SDK behavior before the bulk converter), the bulk converter used by
+`OnDemandData` by default, and the lazy response returned with `lazy=True`, both when only a
+few rows are read and when every row is. Expect the bulk converter to be about 1.5x faster
+than `MessageToDict`; only the lazy response avoids the cost of rows that are not read.
+It builds a synthetic response locally, so no API key or network access is needed.
+Run it from the root directory of the repo with
+`uv run scripts/bench_struct_conversion.py`
+"""
+
+ROWS = 10_000
+RUNS = 5
+
+
+def build_response(rows: int) -> sn13_validator_pb2.OnDemandDataResponse:
+    response = sn13_validator_pb2.OnDemandDataResponse(status="success")
+    for i in range(rows):
+        response.data.add().update(
+            {
+                "uri": f"https://x.com/user{i % 100}/status/{i}",
+                "datetime": "2025-01-01T00:00:00Z",
+                "source": "X",
+                "label": "#bittensor",
+                "content": "An example post about decentralized AI " * 4,
+                "user": {
+                    "username": f"user{i % 100}",
+                    "display_name": f"User {i % 100}",
+                    "id": str(i % 100),
+                    "verified": False,
+                    "followers_count": 1200,
+                    "following_count": 300,
+                },
+                "tweet": {
+                    "id": str(i),
+                    "like_count": 12,
+                    "retweet_count": 3,
+                    "reply_count": 1,
+                    "quote_count": 0,
+                    "hashtags": ["#bittensor", "#ai"],
+                    "is_retweet": False,
+                    "is_reply": False,
+                    "is_quote": False,
+                    "conversation_id": str(i),
+                    "in_reply_to_user_id": None,
+                },
+                "media": None,
+            }
+        )
+    response.meta.update({"miners_queried": 5, "items_returned": rows})
+    return response
+
+
+def measure(name: str, convert, response) -> None:
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        convert(response)
+        timings.append((time.perf_counter() - start) * 1000)
+    print(
+        f"{name:<36} best={min(timings):8.2f}ms mean={statistics.mean(timings):8.2f}ms"
+    )
+
+
+def read_first_rows(response) -> None:
+    data = LazyOnDemandDataResponse(response)["data"]
+    len(data)
+    for row in data[:10]:
+        row["uri"]
+
+
+def read_all_rows(response) -> None:
+    for row in LazyOnDemandDataResponse(response)["data"]:
+        row["uri"]
+
+
+def main():
+    response = build_response(ROWS)
+    print(
+        f"Converting a {ROWS}-row response "
+        f"({response.ByteSize() / 1_000_000:.1f} MB serialized), best of {RUNS} runs"
+    )
+
+    expected = MessageToDict(response, preserving_proto_field_name=True)
+    assert response_to_dict(response) == expected
+    assert LazyOnDemandDataResponse(response).to_dict() == expected
+
+    measure(
+        "MessageToDict",
+        lambda r: MessageToDict(r, preserving_proto_field_name=True),
+        response,
+    )
+    measure("response_to_dict", response_to_dict, response)
+    measure("lazy, len + first 10 rows", read_first_rows, response)
+    measure("lazy, all rows", read_all_rows, response)
+
+
+if __name__ == "__main__":
+    main()
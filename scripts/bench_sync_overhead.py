@@ -0,0 +1,111 @@
+import asyncio
+import statistics
+import time
+from concurrent import futures
+
+import grpc
+
+import macrocosmos as mc
+from macrocosmos.resources.gravity import AsyncGravity
+from macrocosmos.generated.gravity.v1 import gravity_pb2, gravity_pb2_grpc
+from macrocosmos.generated.logger.v1 import logger_pb2, logger_pb2_grpc
+
+"""
+This script measures the per-call overhead of the synchronous wrappers: running each call
+with `asyncio.run()` (the SDK behavior before the background event loop) against submitting
+it to the client's long-lived background loop and, for Gravity, against the native sync stub.
+It runs against a local stand-in gRPC server, so no API key or network access is needed.
+Run it from the root directory of the repo with
+`uv run scripts/bench_sync_overhead.py`
+"""
+
+CALLS = 500
+
+
+class StandInGravityService(gravity_pb2_grpc.GravityServiceServicer):
+    def GetCrawler(self, request, context):
+        return gravity_pb2.GetCrawlerResponse(
+            crawler=gravity_pb2.Crawler(crawler_id=request.crawler_id)
+        )
+
+
+class StandInLoggerService(logger_pb2_grpc.LoggerServiceServicer):
+    def CreateRun(self, request, context):
+        return logger_pb2.Ack()
+
+    def StoreRecordBatch(self, request, context):
+        return logger_pb2.Ack()
+
+
+def start_server() -> tuple:
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=8))
+    gravity_pb2_grpc.add_GravityServiceServicer_to_server(
+        StandInGravityService(), server
+    )
+    logger_pb2_grpc.add_LoggerServiceServicer_to_server(StandInLoggerService(), server)
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+    return server, f"localhost:{port}"
+
+
+def measure(name: str, call) -> None:
+    # Warm up so that neither variant pays for one-off initialization
+    for _ in range(10):
+        call()
+
+    latencies = []
+    for _ in range(CALLS):
+        start = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies.sort()
+    print(
+        f"{name:<32} mean={statistics.mean(latencies):7.3f}ms "
+        f"p50={latencies[len(latencies) // 2]:7.3f}ms "
+        f"p99={latencies[int(len(latencies) * 0.99)]:7.3f}ms"
+    )
+
+
+def main():
+    server, address = start_server()
+    try:
+        print(f"Sync call overhead over {CALLS} calls against {address}")
+
+        with mc.GravityClient(
+            api_key="benchmark", base_url=address, secure=False, compress=False
+        ) as client:
+            async_gravity = AsyncGravity(client)
+            measure(
+                "GetCrawler asyncio.run()",
+                lambda: asyncio.run(async_gravity.GetCrawler(crawler_id="crawler-0")),
+            )
+            measure(
+                "GetCrawler background loop",
+                lambda: client.run_sync(
+                    async_gravity.GetCrawler(crawler_id="crawler-0")
+                ),
+            )
+            measure(
+                "GetCrawler native sync stub",
+                lambda: client.gravity.GetCrawler(crawler_id="crawler-0"),
+            )
+
+        with mc.LoggerClient(base_url=address, secure=False) as client:
+            logger = client.logger
+            logger.init(project="benchmark")
+            try:
+                async_logger = logger._async_logger
+                measure(
+                    "Logger.log asyncio.run()",
+                    lambda: asyncio.run(async_logger.log({"step": 1})),
+                )
+                measure("Logger.log background loop", lambda: logger.log({"step": 1}))
+            finally:
+                logger.finish()
+    finally:
+        server.stop(None)
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,26 @@ from .gravity_client import AsyncGravityClient, GravityClient
 from .billing_client import BillingClient, AsyncBillingClient
 from .sn13_client import Sn13Client, AsyncSn13Client
 from .logger_client import LoggerClient, AsyncLoggerClient
+from .resources._retry import RetryBudget, RetryPolicy
+from .resources._circuit_breaker import CircuitBreakerConfig
+from .resources._cache import DiskCacheBackend, MemoryCacheBackend, ResponseCache
+from .resources.topics import TopicIndex
+from .resources.watcher import GravityWatcher
+from .resources.crawler_history import CrawlerHistory
+from .resources.datasets.cache import DatasetFileCache
+from .resources._rate_limit import (
+    FileRateLimitBackend,
+    MemoryRateLimitBackend,
+    RateLimit,
+    RateLimiter,
+)
+from .resources.ondemand.dedup import (
+    BloomDeduplicator,
+    ExactDeduplicator,
+    load_deduplicator,
+)
+from .resources.ondemand.sink import SegmentSink
+from .resources.ondemand.jobs import HarvestQueue
 
 __all__ = [
     "__package_name__",
@@ -33,4 +53,23 @@ __all__ = [
     "AsyncSn13Client",
     "LoggerClient",
     "AsyncLoggerClient",
+    "RetryPolicy",
+    "RetryBudget",
+    "CircuitBreakerConfig",
+    "ResponseCache",
+    "MemoryCacheBackend",
+    "DiskCacheBackend",
+    "TopicIndex",
+    "GravityWatcher",
+    "CrawlerHistory",
+    "DatasetFileCache",
+    "RateLimiter",
+    "RateLimit",
+    "MemoryRateLimitBackend",
+    "FileRateLimitBackend",
+    "ExactDeduplicator",
+    "BloomDeduplicator",
+    "load_deduplicator",
+    "SegmentSink",
+    "HarvestQueue",
 ]
@@ -3,6 +3,10 @@ from typing import Optional
 
 from macrocosmos.resources.billing import AsyncBilling, SyncBilling
 from macrocosmos.resources._client import BaseClient
+from macrocosmos.resources._cache import ResponseCache
+from macrocosmos.resources._circuit_breaker import CircuitBreakerConfig
+from macrocosmos.resources._rate_limit import RateLimiter
+from macrocosmos.resources._retry import RetryBudget, RetryPolicy
 
 
 class AsyncBillingClient(BaseClient):
@@ -19,6 +23,12 @@ class AsyncBillingClient(BaseClient):
         compress: bool = True,
         secure: Optional[bool] = None,
         app_name: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        circuit_breaker: Optional[CircuitBreakerConfig] = None,
+        cache: Optional[ResponseCache] = None,
+        single_flight: bool = True,
+        rate_limiter: Optional[RateLimiter] = None,
     ):
         """
         Initialize the asynchronous Billing client.
@@ -31,6 +41,13 @@ class AsyncBillingClient(BaseClient):
             compress: Whether to compress the request using gzip (default: True).
             secure: Whether to use HTTPS (default: True).
             app_name: The name of the application using the client.
+            retry_policy: The retry policy for failed calls. Overrides max_retries when set.
+            retry_budget: The retry budget shared by all calls of the client.
+            circuit_breaker: The configuration of the per-service circuit breakers.
+            cache: The cache for responses of read-only calls. (default: None, no caching)
+            single_flight: Whether concurrent identical read-only calls share one in-flight call.
+                (default: True)
+            rate_limiter: The client-side rate limiter, applied to every call. (default: None)
         """
         if not api_key:
             api_key = os.environ.get("BILLING_API_KEY")
@@ -43,6 +60,12 @@ class AsyncBillingClient(BaseClient):
             secure=secure,
             compress=compress,
             app_name=app_name,
+            retry_policy=retry_policy,
+            retry_budget=retry_budget,
+            circuit_breaker=circuit_breaker,
+            cache=cache,
+            single_flight=single_flight,
+            rate_limiter=rate_limiter,
         )
 
         self.billing = AsyncBilling(self)
@@ -62,6 +85,11 @@ class BillingClient(BaseClient):
         secure: Optional[bool] = None,
         compress: bool = True,
         app_name: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        circuit_breaker: Optional[CircuitBreakerConfig] = None,
+        cache: Optional[ResponseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
     ):
         """
         Initialize the synchronous Billing client.
@@ -74,6 +102,11 @@ class BillingClient(BaseClient):
             secure: Whether to use HTTPS (default: True).
             compress: Whether to compress the request using gzip (default: True).
             app_name: The name of the application using the client.
+            retry_policy: The retry policy for failed calls. Overrides max_retries when set.
+            retry_budget: The retry budget shared by all calls of the client.
+            circuit_breaker: The configuration of the per-service circuit breakers.
+            cache: The cache for responses of read-only calls. (default: None, no caching)
+            rate_limiter: The client-side rate limiter, applied to every call. (default: None)
         """
         if not api_key:
             api_key = os.environ.get("BILLING_API_KEY")
@@ -86,6 +119,11 @@ class BillingClient(BaseClient):
             secure=secure,
             compress=compress,
             app_name=app_name,
+            retry_policy=retry_policy,
+            retry_budget=retry_budget,
+            circuit_breaker=circuit_breaker,
+            cache=cache,
+            rate_limiter=rate_limiter,
         )
 
         self.billing = SyncBilling(self)
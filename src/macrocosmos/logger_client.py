@@ -2,6 +2,9 @@ from typing import Optional
 
 from macrocosmos.resources.logger import AsyncLogger, Logger
 from macrocosmos.resources._client import BaseClient
+from macrocosmos.resources._circuit_breaker import CircuitBreakerConfig
+from macrocosmos.resources._rate_limit import RateLimiter
+from macrocosmos.resources._retry import RetryBudget, RetryPolicy
 
 
 class AsyncLoggerClient(BaseClient):
@@ -16,6 +19,10 @@ class AsyncLoggerClient(BaseClient):
         max_retries: int = 0,
         secure: Optional[bool] = None,
         app_name: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        circuit_breaker: Optional[CircuitBreakerConfig] = None,
+        rate_limiter: Optional[RateLimiter] = None,
     ):
         """
         Initialize the asynchronous Logger client.
@@ -26,6 +33,10 @@ class AsyncLoggerClient(BaseClient):
             max_retries: The maximum number of retries. (default: 0)
             secure: Whether to use HTTPS (default: True).
             app_name: The name of the application using the client.
+            retry_policy: The retry policy for failed calls. Overrides max_retries when set.
+            retry_budget: The retry budget shared by all calls of the client.
+            circuit_breaker: The configuration of the per-service circuit breakers.
+            rate_limiter: The client-side rate limiter, applied to every call. (default: None)
         """
 
         super().__init__(
@@ -36,6 +47,10 @@ class AsyncLoggerClient(BaseClient):
             secure=secure,
             compress=True,
             app_name=app_name,
+            retry_policy=retry_policy,
+            retry_budget=retry_budget,
+            circuit_breaker=circuit_breaker,
+            rate_limiter=rate_limiter,
         )
 
         self.logger = AsyncLogger(self)
@@ -53,6 +68,10 @@ class LoggerClient(BaseClient):
         max_retries: int = 0,
         secure: Optional[bool] = None,
         app_name: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        circuit_breaker: Optional[CircuitBreakerConfig] = None,
+        rate_limiter: Optional[RateLimiter] = None,
     ):
         """
         Initialize the synchronous Logger client.
@@ -63,6 +82,10 @@ class LoggerClient(BaseClient):
             max_retries: The maximum number of retries. (default: 0)
             secure: Whether to use HTTPS (default: True).
             app_name: The name of the application using the client.
+            retry_policy: The retry policy for failed calls. Overrides max_retries when set.
+            retry_budget: The retry budget shared by all calls of the client.
+            circuit_breaker: The configuration of the per-service circuit breakers.
+            rate_limiter: The client-side rate limiter, applied to every call. (default: None)
         """
 
         super().__init__(
@@ -73,6 +96,10 @@ class LoggerClient(BaseClient):
             secure=secure,
             compress=True,
             app_name=app_name,
+            retry_policy=retry_policy,
+            retry_budget=retry_budget,
+            circuit_breaker=circuit_breaker,
+            rate_limiter=rate_limiter,
         )
 
         self.logger = Logger(self)
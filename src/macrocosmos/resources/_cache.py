@@ -0,0 +1,408 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple, Union
+
+from google.protobuf import descriptor_pool, message_factory
+
+# Read-only methods whose responses may be cached, with their default time-to-live in seconds.
+DEFAULT_METHOD_TTLS: Dict[str, Dict[str, float]] = {
+    "Sn13Service": {
+        "OnDemandData": 60.0,
+        "ListTopics": 300.0,
+        "ValidateRedditTopic": 3600.0,
+    },
+    "GravityService": {
+        "GetGravityTasks": 10.0,
+        "GetCrawler": 10.0,
+        "GetDataset": 10.0,
+        "GetGravityTaskDatasetFiles": 10.0,
+        "GetGravityMarketplaceTaskDatasetFiles": 10.0,
+        "GetCrawlerHistory": 10.0,
+    },
+    "BillingService": {"GetUsage": 30.0},
+}
+
+# Methods whose successful calls change what the cached reads of their service return.
+MUTATING_METHODS: Dict[str, FrozenSet[str]] = {
+    "GravityService": frozenset(
+        {
+            "CreateGravityTask",
+            "BuildDataset",
+            "BuildAllDatasets",
+            "CancelGravityTask",
+            "CancelDataset",
+        }
+    ),
+}
+
+# A cached entry: the wall-clock expiry time, so that entries on disk stay valid across
+# processes, the full name of the response message type and the serialized response.
+CacheEntry = Tuple[float, str, bytes]
+
+
+class CacheBackend:
+    """
+    Storage for cached responses. Subclass it to keep responses elsewhere, e.g. in a
+    shared store.
+
+    Keys are strings of the form "<service>/<method>/<digest>".
+    """
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Get the entry stored under a key, or None."""
+        raise NotImplementedError
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry under a key, evicting other entries if needed."""
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Delete every entry whose key starts with the prefix, returning how many."""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    @property
+    def evictions(self) -> int:
+        """Get the number of entries evicted to stay within the size limits."""
+        return 0
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-memory LRU storage, bounded by the number of entries and their total size."""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize the in-memory storage.
+
+        Args:
+            max_entries: The maximum number of entries. (default: 1024)
+            max_bytes: The maximum total size of the serialized responses. (default: 64 MiB)
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._evictions = 0
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        size = len(entry[2])
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous[2])
+            self._entries[key] = entry
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted[2])
+                self._evictions += 1
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                self._bytes -= len(self._entries.pop(key)[2])
+            return len(keys)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def evictions(self) -> int:
+        return self._evictions
+
+
+class DiskCacheBackend(CacheBackend):
+    """
+    On-disk storage, one file per entry, bounded by the total size of the files. The least
+    recently used files are removed first. It can be shared by several processes.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Initialize the on-disk storage.
+
+        Args:
+            directory: The directory to store the entries in. It is created if missing.
+            max_bytes: The maximum total size of the entry files. (default: 512 MiB)
+        """
+        directory = os.path.expanduser(directory)
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._bytes = sum(size for _, size, _ in self._files())
+        self._evictions = 0
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                header = json.loads(f.readline())
+                data = f.read()
+            # Touch the file so that eviction removes the least recently used entries
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return header["expires_at"], header["type"], data
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        expires_at, type_name, data = entry
+        header = json.dumps({"expires_at": expires_at, "type": type_name}).encode()
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(header + b"\n" + data)
+            with self._lock:
+                self._bytes -= _file_size(path)
+                os.replace(tmp_path, path)
+                self._bytes += _file_size(path)
+                if self._bytes > self.max_bytes:
+                    self._evict()
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def delete_prefix(self, prefix: str) -> int:
+        file_prefix = _file_name(prefix)
+        deleted = 0
+        with self._lock:
+            for path, size, _ in self._files():
+                if os.path.basename(path).startswith(file_prefix):
+                    if _remove(path):
+                        self._bytes -= size
+                        deleted += 1
+        return deleted
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._files())
+
+    @property
+    def evictions(self) -> int:
+        return self._evictions
+
+    def _evict(self) -> None:
+        # Rescan, as other processes may share the directory
+        files = sorted(self._files(), key=lambda file: file[2])
+        self._bytes = sum(size for _, size, _ in files)
+        for path, size, _ in files:
+            if self._bytes <= self.max_bytes:
+                break
+            if _remove(path):
+                self._bytes -= size
+                self._evictions += 1
+
+    def _files(self) -> Iterable[Tuple[str, int, float]]:
+        """Yield the path, size and last access time of each entry file."""
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".bin"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                yield entry.path, stat.st_size, stat.st_mtime
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, _file_name(key) + ".bin")
+
+
+def _file_name(key: str) -> str:
+    return key.replace("/", ".")
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _remove(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
+
+
+class ResponseCache:
+    """
+    Cache of responses to read-only RPCs, keyed on the service, method and serialized request.
+
+    Only methods with a TTL are cached (by default the SN13 reads, the Gravity task, crawler
+    and dataset reads, and `GetUsage`). A successful call to a mutating method of a service,
+    such as `CancelGravityTask` (see MUTATING_METHODS), invalidates the cached responses of
+    that service. Responses are stored serialized, so every hit returns a new message.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[Dict[Union[str, Tuple[str, str]], float]] = None,
+        backend: Optional[CacheBackend] = None,
+    ):
+        """
+        Initialize the response cache.
+
+        Args:
+            ttl: Time-to-live in seconds by (service, method) pair, e.g.
+                `("GravityService", "GetDataset")`, overriding the defaults. A method name
+                alone applies to the methods of that name in DEFAULT_METHOD_TTLS. A TTL of 0
+                disables caching of the method. (default: see DEFAULT_METHOD_TTLS)
+            backend: The storage for the responses. (default: MemoryCacheBackend())
+        """
+        self.ttls: Dict[Tuple[str, str], float] = {
+            (service, method): method_ttl
+            for service, methods in DEFAULT_METHOD_TTLS.items()
+            for method, method_ttl in methods.items()
+        }
+        for name, method_ttl in (ttl or {}).items():
+            if isinstance(name, tuple):
+                self.ttls[name] = method_ttl
+                continue
+            services = [
+                service
+                for service, methods in DEFAULT_METHOD_TTLS.items()
+                if name in methods
+            ]
+            if not services:
+                raise ValueError(
+                    f"unknown cached method: {name!r}, pass a (service, method) pair"
+                )
+            for service in services:
+                self.ttls[(service, name)] = method_ttl
+
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self._lock = threading.Lock()
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+        self._invalidations = 0
+
+    def is_cacheable(self, service: str, method_name: str) -> bool:
+        """Check whether responses of a method are cached."""
+        return self.ttls.get((service, method_name), 0) > 0
+
+    def key(
+        self, namespace: str, service: str, method_name: str, request: Any
+    ) -> Optional[str]:
+        """
+        Get the cache key of a request, or None if the method is not cached.
+
+        Args:
+            namespace: Identifies the caller, so that clients with different API keys or
+                base URLs sharing a cache never see each other's responses.
+            service: The name of the service, e.g. "GravityService".
+            method_name: The name of the method.
+            request: The request message.
+        """
+        if not self.is_cacheable(service, method_name):
+            return None
+        digest = hashlib.sha256(namespace.encode())
+        digest.update(b"\0")
+        digest.update(request.SerializeToString(deterministic=True))
+        return f"{service}/{method_name}/{digest.hexdigest()}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get the cached response for a key, counting a hit or a miss.
+
+        Returns:
+            A new response message, or None if there is no fresh entry.
+        """
+        method_name = key.split("/", 2)[1]
+        entry = self.backend.get(key)
+        response = None
+        if entry is not None and entry[0] > time.time():
+            try:
+                response = _message_class(entry[1]).FromString(entry[2])
+            except Exception:
+                response = None
+
+        with self._lock:
+            counters = self._misses if response is None else self._hits
+            counters[method_name] = counters.get(method_name, 0) + 1
+        return response
+
+    def set(self, key: str, response: Any) -> None:
+        """Store the response for a key."""
+        service, method_name, _ = key.split("/", 2)
+        expires_at = time.time() + self.ttls[(service, method_name)]
+        self.backend.set(
+            key,
+            (expires_at, response.DESCRIPTOR.full_name, response.SerializeToString()),
+        )
+
+    def invalidate(
+        self, service: Optional[str] = None, method_name: Optional[str] = None
+    ):
+        """
+        Remove cached responses.
+
+        Args:
+            service: Only remove responses of this service. (default: all services)
+            method_name: Only remove responses of this method of the service. (default: all)
+        """
+        prefix = ""
+        if service is not None:
+            prefix = f"{service}/"
+            if method_name is not None:
+                prefix += f"{method_name}/"
+        deleted = self.backend.delete_prefix(prefix)
+        with self._lock:
+            self._invalidations += deleted
+
+    def on_success(self, service: str, method_name: str) -> None:
+        """Invalidate the responses of a service after a successful mutating call."""
+        if method_name in MUTATING_METHODS.get(service, ()):
+            self.invalidate(service)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the cache counters for monitoring.
+
+        Returns:
+            A dictionary with the total `hits` and `misses`, their counts by method in
+            `methods`, the number of `entries`, `evictions` and `invalidations`.
+        """
+        with self._lock:
+            methods = {
+                method: {
+                    "hits": self._hits.get(method, 0),
+                    "misses": self._misses.get(method, 0),
+                }
+                for method in sorted(set(self._hits) | set(self._misses))
+            }
+            return {
+                "hits": sum(self._hits.values()),
+                "misses": sum(self._misses.values()),
+                "methods": methods,
+                "entries": len(self.backend),
+                "evictions": self.backend.evictions,
+                "invalidations": self._invalidations,
+            }
+
+
+def _message_class(type_name: str):
+    descriptor = descriptor_pool.Default().FindMessageTypeByName(type_name)
+    return message_factory.GetMessageClass(descriptor)
@@ -0,0 +1,187 @@
+import threading
+import time
+from enum import Enum
+from typing import Any, Dict, FrozenSet, Iterable, Optional
+
+import grpc
+
+from macrocosmos.types import CircuitOpenError
+
+# Status codes that indicate the service (or the path to it) is unhealthy. Other errors,
+# such as INVALID_ARGUMENT, mean the service answered and don't count as failures.
+DEFAULT_FAILURE_STATUS_CODES: FrozenSet[grpc.StatusCode] = frozenset(
+    {
+        grpc.StatusCode.UNAVAILABLE,
+        grpc.StatusCode.DEADLINE_EXCEEDED,
+        grpc.StatusCode.RESOURCE_EXHAUSTED,
+        grpc.StatusCode.INTERNAL,
+        grpc.StatusCode.UNKNOWN,
+    }
+)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreakerConfig:
+    """Configuration of the per-service circuit breakers of a client."""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        failure_status_codes: Optional[Iterable[grpc.StatusCode]] = None,
+    ):
+        """
+        Initialize the circuit breaker configuration.
+
+        Args:
+            enabled: Whether calls go through the circuit breakers. (default: True)
+            failure_threshold: Consecutive failures that open the circuit. (default: 5)
+            recovery_timeout: Seconds the circuit stays open before trial calls are let
+                through. (default: 30)
+            half_open_max_calls: Concurrent trial calls allowed while half-open. (default: 1)
+            failure_status_codes: The status codes counted as failures.
+                (default: UNAVAILABLE, DEADLINE_EXCEEDED, RESOURCE_EXHAUSTED, INTERNAL, UNKNOWN)
+        """
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be >= 1")
+        if half_open_max_calls < 1:
+            raise ValueError("half_open_max_calls must be >= 1")
+
+        self.enabled = enabled
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.failure_status_codes = frozenset(
+            DEFAULT_FAILURE_STATUS_CODES
+            if failure_status_codes is None
+            else failure_status_codes
+        )
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for a single service.
+
+    While closed, calls go through and consecutive failures are counted. Reaching the failure
+    threshold opens the circuit and every call fails fast with `CircuitOpenError`. After the
+    recovery timeout the circuit is half-open: a limited number of trial calls go through, and
+    the first result closes the circuit again (success) or re-opens it (failure).
+    """
+
+    def __init__(self, service: str, config: CircuitBreakerConfig):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            service: The name of the service, e.g. "GravityService".
+            config: The circuit breaker configuration.
+        """
+        self.service = service
+        self.config = config
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._half_open_started_at = 0.0
+        self._times_opened = 0
+        self._rejected_calls = 0
+
+    def before_call(self) -> None:
+        """
+        Check whether a call may proceed.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with all trial slots taken.
+        """
+        if not self.config.enabled:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            if self._state == CircuitState.OPEN:
+                retry_after = self._opened_at + self.config.recovery_timeout - now
+                if retry_after > 0:
+                    self._rejected_calls += 1
+                    raise CircuitOpenError(self.service, retry_after)
+                self._state = CircuitState.HALF_OPEN
+                self._half_open_calls = 0
+
+            if self._state == CircuitState.HALF_OPEN:
+                # A trial that never reported back (e.g. a cancelled call) must not wedge
+                # the circuit, so trial slots expire after another recovery timeout.
+                if now - self._half_open_started_at >= self.config.recovery_timeout:
+                    self._half_open_calls = 0
+                if self._half_open_calls >= self.config.half_open_max_calls:
+                    self._rejected_calls += 1
+                    raise CircuitOpenError(
+                        self.service,
+                        self._half_open_started_at + self.config.recovery_timeout - now,
+                    )
+                if self._half_open_calls == 0:
+                    self._half_open_started_at = now
+                self._half_open_calls += 1
+
+    def record_success(self) -> None:
+        """Record a call that reached a healthy service, closing the circuit."""
+        with self._lock:
+            self._consecutive_failures = 0
+            self._state = CircuitState.CLOSED
+
+    def record_error(self, code: grpc.StatusCode) -> None:
+        """
+        Record a call that failed with the given status code.
+
+        Args:
+            code: The status code of the failed call.
+        """
+        if code not in self.config.failure_status_codes:
+            # The service answered, so it is healthy as far as the breaker is concerned
+            self.record_success()
+            return
+
+        with self._lock:
+            self._consecutive_failures += 1
+            if (
+                self._state == CircuitState.HALF_OPEN
+                or self._consecutive_failures >= self.config.failure_threshold
+            ):
+                if self._state != CircuitState.OPEN:
+                    self._times_opened += 1
+                self._state = CircuitState.OPEN
+                self._opened_at = time.monotonic()
+
+    @property
+    def state(self) -> CircuitState:
+        """Get the current state of the circuit."""
+        with self._lock:
+            if (
+                self._state == CircuitState.OPEN
+                and time.monotonic() - self._opened_at >= self.config.recovery_timeout
+            ):
+                return CircuitState.HALF_OPEN
+            return self._state
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the circuit breaker counters for monitoring.
+
+        Returns:
+            A dictionary with the `state`, the `consecutive_failures`, the number of times the
+            circuit was opened (`times_opened`) and the number of `rejected_calls`.
+        """
+        state = self.state
+        with self._lock:
+            return {
+                "state": state.value,
+                "consecutive_failures": self._consecutive_failures,
+                "times_opened": self._times_opened,
+                "rejected_calls": self._rejected_calls,
+            }
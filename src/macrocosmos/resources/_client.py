@@ -1,16 +1,37 @@
 from abc import ABC
+import asyncio
 import grpc
-from typing import Optional
+import threading
+from typing import Awaitable, Dict, Optional, Set, TypeVar
 import os
 from macrocosmos.types import MacrocosmosError
+from macrocosmos.resources._cache import ResponseCache
+from macrocosmos.resources._circuit_breaker import CircuitBreaker, CircuitBreakerConfig
+from macrocosmos.resources._rate_limit import RateLimiter
+from macrocosmos.resources._retry import RetryBudget, RetryPolicy
+from macrocosmos.resources._single_flight import SingleFlight
+from macrocosmos.resources._utils import EventLoopThread
 
 DEFAULT_BASE_URL = "constellation.api.cloud.macrocosmos.ai"
 DEFAULT_USE_HTTPS = True
+CHANNEL_CLOSE_TIMEOUT = 5
+
+T = TypeVar("T")
+
+# Channel close tasks scheduled from synchronous code, referenced until they finish
+_closing_tasks: Set[asyncio.Task] = set()
 
 
 class BaseClient(ABC):
     """
     Abstract base class for client.
+
+    The client owns the gRPC channels used by its resources. Channels are created lazily on
+    first use and reused for every subsequent call: one shared channel for synchronous calls
+    and one channel per event loop for asynchronous calls. Synchronous wrappers around async
+    code run on a single background event loop owned by the client (see `run_sync()`).
+    Call `close()` (or `aclose()`), or use the client as a (async) context manager, to
+    release them.
     """
 
     def __init__(
@@ -22,6 +43,12 @@ class BaseClient(ABC):
         secure: Optional[bool] = None,
         compress: bool = True,
         app_name: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        circuit_breaker: Optional[CircuitBreakerConfig] = None,
+        cache: Optional[ResponseCache] = None,
+        single_flight: bool = True,
+        rate_limiter: Optional[RateLimiter] = None,
     ):
         """
         Initialize the abstract base class for the client.
@@ -34,6 +61,19 @@ class BaseClient(ABC):
             secure: Whether to use HTTPS. Set this if you're using a custom base URL.
             compress: Whether to compress the request using gzip (default: True).
             app_name: The name of the application using the client.
+            retry_policy: The retry policy for failed calls. Overrides max_retries when set.
+                (default: exponential backoff with jitter on transient errors, up to max_retries)
+            retry_budget: The retry budget shared by all calls of the client. Pass the same
+                instance to several clients to share it between them. (default: a new RetryBudget)
+            circuit_breaker: The configuration of the per-service circuit breakers.
+                (default: CircuitBreakerConfig())
+            cache: The cache for responses of read-only calls. Pass the same instance to
+                several clients to share it between them. (default: None, no caching)
+            single_flight: Whether concurrent identical asynchronous read-only calls, such as
+                `GetDataset` or `GetCrawler`, share one in-flight call. Each caller receives
+                its own copy of the response. (default: True)
+            rate_limiter: The client-side rate limiter, applied to every call before it is sent.
+                Use a FileRateLimitBackend to share it between processes. (default: None)
         """
         if not api_key:
             api_key = os.environ.get("MACROCOSMOS_API_KEY")
@@ -60,14 +100,142 @@ class BaseClient(ABC):
         self.api_key = api_key
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
-        self.max_retries = max_retries
+        self.retry_policy = retry_policy or RetryPolicy(max_retries=max_retries)
+        self.max_retries = self.retry_policy.max_retries
+        self.retry_budget = retry_budget or RetryBudget()
+        self.circuit_breaker_config = circuit_breaker or CircuitBreakerConfig()
+        self._circuit_breakers: Dict[str, CircuitBreaker] = {}
+        self.cache = cache
+        self.single_flight = SingleFlight() if single_flight else None
+        self.rate_limiter = rate_limiter
         self.secure = secure
         self.compress = compress
         self.app_name = app_name
 
+        # Pooled channels, created lazily and shared by all resources of this client
+        self._channel_lock = threading.Lock()
+        self._sync_channel: Optional[grpc.Channel] = None
+        self._async_channels: Dict[asyncio.AbstractEventLoop, grpc.aio.Channel] = {}
+
+        # Background event loop for synchronous wrappers, started lazily
+        self._loop_thread = EventLoopThread()
+
+    def get_circuit_breaker(self, service: str) -> CircuitBreaker:
+        """
+        Get the circuit breaker of a service, creating it on first use.
+
+        Args:
+            service: The name of the service, e.g. "GravityService".
+        """
+        with self._channel_lock:
+            breaker = self._circuit_breakers.get(service)
+            if breaker is None:
+                breaker = CircuitBreaker(service, self.circuit_breaker_config)
+                self._circuit_breakers[service] = breaker
+            return breaker
+
+    @property
+    def circuit_breakers(self) -> Dict[str, CircuitBreaker]:
+        """Get the circuit breakers created so far, keyed by service name."""
+        return dict(self._circuit_breakers)
+
+    def run_sync(self, coro: Awaitable[T]) -> T:
+        """
+        Run a coroutine to completion on the client's background event loop.
+
+        This is safe to call from synchronous code whether or not an event loop is running in
+        the calling thread.
+
+        Args:
+            coro: The coroutine to run.
+
+        Returns:
+            The result of the coroutine.
+        """
+        return self._loop_thread.run(coro)
+
     def get_async_channel(self) -> grpc.aio.Channel:
         """
-        Get an asynchronous channel for the given client.
+        Get the pooled asynchronous channel for the running event loop.
+
+        gRPC aio channels are bound to the event loop they were created on, so one channel is
+        kept per loop. The channel must not be closed by the caller.
+        """
+        loop = asyncio.get_running_loop()
+        with self._channel_lock:
+            channel = self._async_channels.get(loop)
+            stale_channels = []
+            if channel is None:
+                # Drop channels whose loop is gone; they can no longer be used
+                for stale_loop in [lp for lp in self._async_channels if lp.is_closed()]:
+                    stale_channels.append(
+                        (stale_loop, self._async_channels.pop(stale_loop))
+                    )
+                channel = self._create_async_channel()
+                self._async_channels[loop] = channel
+
+        for stale_loop, stale_channel in stale_channels:
+            _close_async_channel(stale_loop, stale_channel)
+        return channel
+
+    def get_sync_channel(self) -> grpc.Channel:
+        """
+        Get the pooled synchronous channel.
+
+        The channel is thread-safe and shared by every synchronous call of this client. It must
+        not be closed by the caller.
+        """
+        with self._channel_lock:
+            if self._sync_channel is None:
+                self._sync_channel = self._create_sync_channel()
+            return self._sync_channel
+
+    def close(self) -> None:
+        """
+        Close all pooled channels and stop the background event loop.
+
+        The client can still be used afterwards; new channels (and the background loop) are
+        created on the next call.
+        """
+        with self._channel_lock:
+            sync_channel, self._sync_channel = self._sync_channel, None
+            async_channels, self._async_channels = self._async_channels, {}
+
+        if sync_channel is not None:
+            sync_channel.close()
+
+        for loop, channel in async_channels.items():
+            _close_async_channel(loop, channel)
+
+        self._loop_thread.stop()
+
+    async def aclose(self) -> None:
+        """
+        Close all pooled channels, awaiting the channel of the running event loop, and stop
+        the background event loop.
+        """
+        loop = asyncio.get_running_loop()
+        with self._channel_lock:
+            channel = self._async_channels.pop(loop, None)
+        if channel is not None:
+            await channel.close()
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    def _create_async_channel(self) -> grpc.aio.Channel:
+        """
+        Create a new asynchronous channel for the given client.
         """
         if self.secure:
             return grpc.aio.secure_channel(
@@ -75,10 +243,55 @@ class BaseClient(ABC):
             )
         return grpc.aio.insecure_channel(self.base_url)
 
-    def get_sync_channel(self) -> grpc.Channel:
+    def _create_sync_channel(self) -> grpc.Channel:
         """
-        Get a synchronous channel for the given client.
+        Create a new synchronous channel for the given client.
         """
         if self.secure:
             return grpc.secure_channel(self.base_url, grpc.ssl_channel_credentials())
         return grpc.insecure_channel(self.base_url)
+
+
+def _close_async_channel(
+    loop: asyncio.AbstractEventLoop, channel: grpc.aio.Channel
+) -> None:
+    """
+    Close an asynchronous channel on the loop it belongs to, from synchronous code.
+
+    Args:
+        loop: The event loop the channel was created on.
+        channel: The channel to close.
+    """
+    try:
+        running_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        running_loop = None
+
+    if loop.is_closed():
+        # No call can be active on a closed loop, so closing the channel only releases its
+        # resources and can be done from any loop
+        if running_loop is not None:
+            task = running_loop.create_task(channel.close())
+            _closing_tasks.add(task)
+            task.add_done_callback(_closing_tasks.discard)
+        else:
+            close_loop = asyncio.new_event_loop()
+            try:
+                close_loop.run_until_complete(channel.close())
+            finally:
+                close_loop.close()
+        return
+
+    if loop is running_loop:
+        # Called from a coroutine on the channel's own loop; we cannot block here
+        loop.create_task(channel.close())
+    elif loop.is_running():
+        future = asyncio.run_coroutine_threadsafe(channel.close(), loop)
+        try:
+            future.result(timeout=CHANNEL_CLOSE_TIMEOUT)
+        except Exception:
+            pass
+    elif running_loop is None:
+        loop.run_until_complete(channel.close())
+    # Otherwise the loop is idle while another loop runs in this thread, so the channel
+    # cannot be driven to close; it is released when garbage collected.
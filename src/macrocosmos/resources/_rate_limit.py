@@ -0,0 +1,229 @@
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Dict, Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DEFAULT_RATE_LIMIT_DIRECTORY = os.path.join(
+    tempfile.gettempdir(), "macrocosmos-rate-limits"
+)
+
+# The state of a bucket in a file: tokens and the wall-clock time they were counted at.
+_BUCKET_STATE = struct.Struct("<dd")
+
+
+class RateLimit:
+    """
+    A token bucket limit: a sustained rate of calls per second and a burst size.
+
+    The burst is on top of the rate: after a quiet period, up to `burst` calls go through at
+    once and calls then continue at `rate`, so at most `rate + burst` calls are made in any
+    one-second window.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """
+        Initialize the limit.
+
+        Args:
+            rate: The sustained number of calls per second.
+            burst: The number of calls that may be made at once after a quiet period.
+                (default: 1)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = rate
+        self.burst = burst if burst is not None else 1.0
+        if self.burst < 1:
+            raise ValueError("burst must be >= 1")
+
+    def __repr__(self) -> str:
+        return f"RateLimit(rate={self.rate}, burst={self.burst})"
+
+
+class RateLimitBackend:
+    """Storage for the token buckets of a rate limiter."""
+
+    # Whether `reserve()` may block, e.g. on a file lock held by another process, so that
+    # asynchronous calls must reserve from a worker thread rather than on the event loop
+    blocking = False
+
+    def reserve(self, bucket: str, limit: RateLimit) -> float:
+        """
+        Take a token from a bucket, going into debt if it is empty.
+
+        Args:
+            bucket: The name of the bucket.
+            limit: The limit of the bucket.
+
+        Returns:
+            The number of seconds to wait before making the call.
+        """
+        raise NotImplementedError
+
+
+def _take_token(
+    tokens: float, updated: float, now: float, limit: RateLimit
+) -> Tuple[float, float]:
+    """
+    Refill a bucket up to `now` and take a token.
+
+    Returns:
+        The tokens left, which are negative while calls are queued, and the wait in seconds.
+    """
+    tokens = min(limit.burst, tokens + max(now - updated, 0.0) * limit.rate) - 1
+    wait = -tokens / limit.rate if tokens < 0 else 0.0
+    return tokens, wait
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Token buckets shared by the threads of this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    def reserve(self, bucket: str, limit: RateLimit) -> float:
+        now = time.time()
+        with self._lock:
+            tokens, updated = self._buckets.get(bucket, (limit.burst, now))
+            tokens, wait = _take_token(tokens, updated, now, limit)
+            self._buckets[bucket] = (tokens, now)
+        return wait
+
+
+class FileRateLimitBackend(RateLimitBackend):
+    """
+    Token buckets shared by every process on the host that uses the same directory. Each
+    bucket is a small file updated under an exclusive `fcntl` lock (POSIX only).
+    """
+
+    blocking = True
+
+    def __init__(self, directory: str = DEFAULT_RATE_LIMIT_DIRECTORY):
+        """
+        Initialize the file backend.
+
+        Args:
+            directory: The directory holding the bucket files. It is created if missing.
+                (default: "macrocosmos-rate-limits" in the temporary directory)
+        """
+        if fcntl is None:
+            raise RuntimeError("FileRateLimitBackend requires fcntl (POSIX systems)")
+        directory = os.path.expanduser(directory)
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._files: Dict[str, int] = {}
+        self._pid = os.getpid()
+
+    def reserve(self, bucket: str, limit: RateLimit) -> float:
+        with self._lock:
+            fd = self._file(bucket)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                now = time.time()
+                data = os.pread(fd, _BUCKET_STATE.size, 0)
+                if len(data) == _BUCKET_STATE.size:
+                    tokens, updated = _BUCKET_STATE.unpack(data)
+                else:
+                    tokens, updated = limit.burst, now
+                tokens, wait = _take_token(tokens, updated, now, limit)
+                os.pwrite(fd, _BUCKET_STATE.pack(tokens, now), 0)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        return wait
+
+    def _file(self, bucket: str) -> int:
+        if os.getpid() != self._pid:
+            # A forked child shares the parent's open files, and with them the flock locks,
+            # so it must open its own
+            self._files = {}
+            self._pid = os.getpid()
+        fd = self._files.get(bucket)
+        if fd is None:
+            path = os.path.join(self.directory, bucket.replace("/", ".") + ".bucket")
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            self._files[bucket] = fd
+        return fd
+
+
+class RateLimiter:
+    """
+    Client-side rate limiter: token buckets per service or method, scoped to the API key.
+
+    Rules are keyed by "<service>/<method>" (e.g. "Sn13Service/OnDemandData"), by service
+    (e.g. "GravityService") or "*" for every call; the most specific rule applies, and all
+    calls matching a rule share its bucket. Calls wait for a token before anything is sent.
+    With a `FileRateLimitBackend`, the buckets are shared by every process on the host, so
+    workers using the same API key stay within one quota together.
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, Union[RateLimit, float]],
+        backend: Optional[RateLimitBackend] = None,
+    ):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            limits: The limits by rule, as RateLimit or as calls per second.
+            backend: The storage for the buckets. (default: MemoryRateLimitBackend())
+        """
+        self.limits: Dict[str, RateLimit] = {
+            rule: limit if isinstance(limit, RateLimit) else RateLimit(limit)
+            for rule, limit in limits.items()
+        }
+        self.backend = backend if backend is not None else MemoryRateLimitBackend()
+        self._lock = threading.Lock()
+        self._waits = 0
+        self._wait_seconds = 0.0
+
+    def rule(self, service: str, method_name: str) -> Optional[str]:
+        """Get the rule that applies to a method, if any."""
+        for rule in (f"{service}/{method_name}", service, "*"):
+            if rule in self.limits:
+                return rule
+        return None
+
+    def reserve(self, api_key: str, service: str, method_name: str) -> float:
+        """
+        Reserve a call of a method.
+
+        Args:
+            api_key: The API key the call is made with.
+            service: The name of the service, e.g. "GravityService".
+            method_name: The name of the method.
+
+        Returns:
+            The number of seconds to wait before making the call.
+        """
+        rule = self.rule(service, method_name)
+        if rule is None:
+            return 0.0
+        key_id = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+        wait = self.backend.reserve(f"{key_id}/{rule}", self.limits[rule])
+        if wait > 0:
+            with self._lock:
+                self._waits += 1
+                self._wait_seconds += wait
+        return wait
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get the rate limiter counters for monitoring.
+
+        Returns:
+            A dictionary with the number of calls that had to `waits` and the total
+            `wait_seconds`, in this process.
+        """
+        with self._lock:
+            return {"waits": self._waits, "wait_seconds": self._wait_seconds}
@@ -0,0 +1,278 @@
+import asyncio
+import time
+from typing import Any, List, Optional, Tuple
+
+import grpc
+
+from macrocosmos import __package_name__, __version__
+from macrocosmos.resources._client import BaseClient
+from macrocosmos.resources._single_flight import SINGLE_FLIGHT_METHODS
+from macrocosmos.types import MacrocosmosError
+
+
+def build_metadata(client: BaseClient, authorize: bool = True) -> List[Tuple[str, str]]:
+    """
+    Build the request metadata for the given client.
+
+    Args:
+        client: The client instance for making requests.
+        authorize: Whether to send the client's API key. (default: True)
+
+    Returns:
+        The metadata to send with the request.
+    """
+    metadata = [
+        ("x-source", client.app_name),
+        ("x-client-id", __package_name__),
+        ("x-client-version", __version__),
+    ]
+    if authorize:
+        metadata.append(("authorization", f"Bearer {client.api_key}"))
+    return metadata
+
+
+def service_name(stub_class: Any) -> str:
+    """
+    Get the service name of a generated stub class, e.g. "GravityService".
+    """
+    name = stub_class.__name__
+    return name[: -len("Stub")] if name.endswith("Stub") else name
+
+
+def _cache_key(
+    client: BaseClient, service: str, method_name: str, request
+) -> Optional[str]:
+    """
+    Get the key of the request in the client's response cache, or None if it isn't cached.
+    """
+    if client.cache is None:
+        return None
+    # The cache may be shared by clients of different accounts or environments
+    namespace = f"{client.base_url}\0{client.api_key}"
+    return client.cache.key(namespace, service, method_name, request)
+
+
+def _cache_response(
+    client: BaseClient,
+    service: str,
+    method_name: str,
+    cache_key: Optional[str],
+    response,
+) -> None:
+    """
+    Store the response of a cached method, or invalidate the service's cached responses
+    after a successful mutating call.
+    """
+    if client.cache is None:
+        return
+    if cache_key is not None:
+        client.cache.set(cache_key, response)
+    else:
+        client.cache.on_success(service, method_name)
+
+
+def _rate_limit_delay(client: BaseClient, service: str, method_name: str) -> float:
+    """
+    Reserve a call with the client's rate limiter.
+
+    Returns:
+        The number of seconds to wait before making the call.
+    """
+    if client.rate_limiter is None:
+        return 0.0
+    return client.rate_limiter.reserve(client.api_key, service, method_name)
+
+
+async def _async_rate_limit_delay(
+    client: BaseClient, service: str, method_name: str
+) -> float:
+    """
+    Reserve a call with the client's rate limiter without blocking the event loop.
+
+    Returns:
+        The number of seconds to wait before making the call.
+    """
+    if client.rate_limiter is None:
+        return 0.0
+    if not client.rate_limiter.backend.blocking:
+        return _rate_limit_delay(client, service, method_name)
+    # Waiting for a lock held by another process must not stall every other coroutine
+    return await asyncio.get_running_loop().run_in_executor(
+        None, _rate_limit_delay, client, service, method_name
+    )
+
+
+def _next_retry_delay(
+    client: BaseClient, error: grpc.RpcError, retry: int, deadline: Optional[float]
+) -> Optional[float]:
+    """
+    Record a failed attempt against the retry budget and decide whether to retry it.
+
+    Returns:
+        The delay in seconds before retrying, or None if the call should fail.
+    """
+    policy = client.retry_policy
+    if error.code() in policy.retryable_status_codes:
+        client.retry_budget.on_failure()
+
+    delay = policy.next_delay(error, retry, deadline)
+    if delay is None or not client.retry_budget.try_retry():
+        return None
+    return delay
+
+
+async def make_async_request(
+    client: BaseClient,
+    stub_class: Any,
+    method_name: str,
+    request,
+    authorize: bool = True,
+):
+    """
+    Make an async request to a service, retrying according to the client's retry policy.
+
+    Args:
+        client: The client instance for making requests.
+        stub_class: The generated service stub class, e.g. `GravityServiceStub`.
+        method_name: The name of the method to call.
+        request: The request message.
+        authorize: Whether to send the client's API key. (default: True)
+
+    Returns:
+        The response from the service.
+    """
+    service = service_name(stub_class)
+    if (
+        client.single_flight is not None
+        and (service, method_name) in SINGLE_FLIGHT_METHODS
+    ):
+        # Concurrent identical reads share one call, and its response or error
+        key = (service, method_name, request.SerializeToString(deterministic=True))
+        return await client.single_flight.do(
+            key,
+            lambda: _make_async_request(
+                client, stub_class, service, method_name, request, authorize
+            ),
+        )
+    return await _make_async_request(
+        client, stub_class, service, method_name, request, authorize
+    )
+
+
+async def _make_async_request(
+    client: BaseClient,
+    stub_class: Any,
+    service: str,
+    method_name: str,
+    request,
+    authorize: bool,
+):
+    metadata = build_metadata(client, authorize)
+    compression = grpc.Compression.Gzip if client.compress else None
+    policy = client.retry_policy
+    deadline = policy.deadline()
+    breaker = client.get_circuit_breaker(service)
+
+    cache_key = _cache_key(client, service, method_name, request)
+    if cache_key is not None:
+        cached = client.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    retry = 0
+    while True:
+        wait = await _async_rate_limit_delay(client, service, method_name)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        breaker.before_call()
+        try:
+            channel = client.get_async_channel()
+            method = getattr(stub_class(channel), method_name)
+            response = await method(
+                request,
+                metadata=metadata,
+                timeout=policy.attempt_timeout(client.timeout, deadline),
+                compression=compression,
+            )
+            breaker.record_success()
+            client.retry_budget.on_success()
+            _cache_response(client, service, method_name, cache_key, response)
+            return response
+        except grpc.RpcError as e:
+            breaker.record_error(e.code())
+            delay = _next_retry_delay(client, e, retry, deadline)
+            if delay is None:
+                raise MacrocosmosError(
+                    f"RPC error: {e.code()}: {e.details()}", code=e.code()
+                )
+            retry += 1
+        except Exception as e:
+            raise MacrocosmosError(f"Error calling {method_name}: {e}")
+
+        await asyncio.sleep(delay)
+
+
+def make_sync_request(
+    client: BaseClient,
+    stub_class: Any,
+    method_name: str,
+    request,
+    authorize: bool = True,
+):
+    """
+    Make a request to a service, retrying according to the client's retry policy.
+
+    Args:
+        client: The client instance for making requests.
+        stub_class: The generated service stub class, e.g. `GravityServiceStub`.
+        method_name: The name of the method to call.
+        request: The request message.
+        authorize: Whether to send the client's API key. (default: True)
+
+    Returns:
+        The response from the service.
+    """
+    metadata = build_metadata(client, authorize)
+    compression = grpc.Compression.Gzip if client.compress else None
+    policy = client.retry_policy
+    deadline = policy.deadline()
+    service = service_name(stub_class)
+    breaker = client.get_circuit_breaker(service)
+
+    cache_key = _cache_key(client, service, method_name, request)
+    if cache_key is not None:
+        cached = client.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    retry = 0
+    while True:
+        wait = _rate_limit_delay(client, service, method_name)
+        if wait > 0:
+            time.sleep(wait)
+        breaker.before_call()
+        try:
+            channel = client.get_sync_channel()
+            method = getattr(stub_class(channel), method_name)
+            response = method(
+                request,
+                metadata=metadata,
+                timeout=policy.attempt_timeout(client.timeout, deadline),
+                compression=compression,
+            )
+            breaker.record_success()
+            client.retry_budget.on_success()
+            _cache_response(client, service, method_name, cache_key, response)
+            return response
+        except grpc.RpcError as e:
+            breaker.record_error(e.code())
+            delay = _next_retry_delay(client, e, retry, deadline)
+            if delay is None:
+                raise MacrocosmosError(
+                    f"RPC error: {e.code()}: {e.details()}", code=e.code()
+                )
+            retry += 1
+        except Exception as e:
+            raise MacrocosmosError(f"Error calling {method_name}: {e}")
+
+        time.sleep(delay)
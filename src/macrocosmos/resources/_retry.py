@@ -0,0 +1,238 @@
+import random
+import threading
+import time
+from typing import Dict, FrozenSet, Iterable, Optional
+
+import grpc
+
+# Status codes that indicate a transient condition on the server or network.
+DEFAULT_RETRYABLE_STATUS_CODES: FrozenSet[grpc.StatusCode] = frozenset(
+    {
+        grpc.StatusCode.UNAVAILABLE,
+        grpc.StatusCode.RESOURCE_EXHAUSTED,
+        grpc.StatusCode.DEADLINE_EXCEEDED,
+    }
+)
+
+# Trailing metadata key the server uses to ask clients to wait (or not retry at all).
+RETRY_PUSHBACK_METADATA_KEY = "grpc-retry-pushback-ms"
+
+
+class RetryPolicy:
+    """
+    Retry policy for RPCs: exponential backoff with jitter, a retryable status allowlist,
+    server retry pushback and an optional deadline budget shared by all attempts.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 0,
+        initial_backoff: float = 0.1,
+        max_backoff: float = 5.0,
+        backoff_multiplier: float = 2.0,
+        jitter: float = 1.0,
+        retryable_status_codes: Optional[Iterable[grpc.StatusCode]] = None,
+        total_timeout: Optional[float] = None,
+    ):
+        """
+        Initialize the retry policy.
+
+        Args:
+            max_retries: The maximum number of retries after the first attempt. (default: 0)
+            initial_backoff: The backoff before the first retry in seconds. (default: 0.1)
+            max_backoff: The upper bound of the backoff in seconds. (default: 5.0)
+            backoff_multiplier: The factor the backoff grows by on each retry. (default: 2.0)
+            jitter: The fraction of the backoff that is randomized, between 0 (no jitter)
+                and 1 (full jitter). (default: 1.0)
+            retryable_status_codes: The status codes that are retried.
+                (default: UNAVAILABLE, RESOURCE_EXHAUSTED and DEADLINE_EXCEEDED)
+            total_timeout: Time budget in seconds for all attempts of a call, including
+                backoff. No more attempts are started once it is spent. (default: None)
+        """
+        if max_retries < 0:
+            raise ValueError("max_retries must be >= 0")
+        if not 0 <= jitter <= 1:
+            raise ValueError("jitter must be between 0 and 1")
+
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.backoff_multiplier = backoff_multiplier
+        self.jitter = jitter
+        self.retryable_status_codes = frozenset(
+            DEFAULT_RETRYABLE_STATUS_CODES
+            if retryable_status_codes is None
+            else retryable_status_codes
+        )
+        self.total_timeout = total_timeout
+
+    def deadline(self) -> Optional[float]:
+        """
+        Get the monotonic deadline for a call starting now, if the policy has a time budget.
+        """
+        if self.total_timeout is None:
+            return None
+        return time.monotonic() + self.total_timeout
+
+    def attempt_timeout(
+        self, timeout: Optional[float], deadline: Optional[float]
+    ) -> Optional[float]:
+        """
+        Get the timeout for the next attempt, capped by the remaining time budget.
+
+        Args:
+            timeout: The per-attempt timeout configured on the client.
+            deadline: The deadline returned by `deadline()`.
+        """
+        if deadline is None:
+            return timeout
+        remaining = max(deadline - time.monotonic(), 0.0)
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def backoff(self, retry: int) -> float:
+        """
+        Get the jittered backoff before the given retry.
+
+        Args:
+            retry: The zero-based index of the retry.
+        """
+        backoff = min(
+            self.initial_backoff * (self.backoff_multiplier**retry), self.max_backoff
+        )
+        return backoff * (1 - self.jitter * random.random())
+
+    def next_delay(
+        self, error: grpc.RpcError, retry: int, deadline: Optional[float]
+    ) -> Optional[float]:
+        """
+        Decide whether a failed attempt is retried and how long to wait first.
+
+        Args:
+            error: The error raised by the failed attempt.
+            retry: The zero-based index of the retry that would follow.
+            deadline: The deadline returned by `deadline()`.
+
+        Returns:
+            The delay in seconds before retrying, or None if the call should not be retried.
+        """
+        if retry >= self.max_retries:
+            return None
+        if error.code() not in self.retryable_status_codes:
+            return None
+
+        delay = self.backoff(retry)
+        pushback = _retry_pushback(error)
+        if pushback is not None:
+            if pushback < 0:
+                # The server asked us not to retry
+                return None
+            delay = pushback
+
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return None
+        return delay
+
+
+class RetryBudget:
+    """
+    Client-wide retry budget, modeled on gRPC retry throttling.
+
+    The budget is a token bucket shared by every call of a client (or of several clients, if
+    the same instance is passed to each). Each failed attempt with a retryable status takes
+    one token and each successful call gives back `token_ratio` tokens. Retries are only
+    allowed while more than half of `max_tokens` remain, so during an outage calls fail fast
+    instead of multiplying the load on the API by the retry count.
+    """
+
+    def __init__(self, max_tokens: float = 10.0, token_ratio: float = 0.1):
+        """
+        Initialize the retry budget.
+
+        Args:
+            max_tokens: The capacity of the bucket, which also starts full. (default: 10)
+            token_ratio: The number of tokens returned by each successful call. (default: 0.1)
+        """
+        if max_tokens <= 0:
+            raise ValueError("max_tokens must be > 0")
+        if token_ratio <= 0:
+            raise ValueError("token_ratio must be > 0")
+
+        self.max_tokens = max_tokens
+        self.token_ratio = token_ratio
+        self._lock = threading.Lock()
+        self._tokens = float(max_tokens)
+        self._successes = 0
+        self._failures = 0
+        self._retries = 0
+        self._retries_throttled = 0
+
+    def on_success(self) -> None:
+        """Record a successful call, refilling the bucket."""
+        with self._lock:
+            self._successes += 1
+            self._tokens = min(self._tokens + self.token_ratio, self.max_tokens)
+
+    def on_failure(self) -> None:
+        """Record a failed attempt with a retryable status, draining the bucket."""
+        with self._lock:
+            self._failures += 1
+            self._tokens = max(self._tokens - 1, 0.0)
+
+    def try_retry(self) -> bool:
+        """
+        Check whether the budget allows another retry, recording the outcome.
+
+        Returns:
+            True if the retry may proceed, False if it is throttled.
+        """
+        with self._lock:
+            if self._tokens > self.max_tokens / 2:
+                self._retries += 1
+                return True
+            self._retries_throttled += 1
+            return False
+
+    @property
+    def tokens(self) -> float:
+        """Get the number of tokens currently in the bucket."""
+        return self._tokens
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get the budget counters for monitoring.
+
+        Returns:
+            A dictionary with the current `tokens`, the `max_tokens`, and the number of
+            `successes`, retryable `failures`, `retries` allowed and `retries_throttled`.
+        """
+        with self._lock:
+            return {
+                "tokens": self._tokens,
+                "max_tokens": self.max_tokens,
+                "successes": self._successes,
+                "failures": self._failures,
+                "retries": self._retries,
+                "retries_throttled": self._retries_throttled,
+            }
+
+
+def _retry_pushback(error: grpc.RpcError) -> Optional[float]:
+    """
+    Get the server retry pushback in seconds from the error's trailing metadata.
+
+    Returns:
+        The pushback in seconds, -1 if the server asked not to retry, or None if absent.
+    """
+    try:
+        trailing_metadata = error.trailing_metadata() or ()
+    except Exception:
+        return None
+
+    for key, value in trailing_metadata:
+        if key == RETRY_PUSHBACK_METADATA_KEY:
+            try:
+                pushback_ms = int(value)
+            except (TypeError, ValueError):
+                return -1
+            return pushback_ms / 1000 if pushback_ms >= 0 else -1
+    return None
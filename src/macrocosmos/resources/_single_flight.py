@@ -0,0 +1,90 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Idempotent read-only methods, for which concurrent identical calls are coalesced.
+# Mutating methods such as CreateGravityTask or BuildDataset are never coalesced.
+SINGLE_FLIGHT_METHODS: FrozenSet[Tuple[str, str]] = frozenset(
+    {
+        ("Sn13Service", "OnDemandData"),
+        ("Sn13Service", "ListTopics"),
+        ("Sn13Service", "ValidateRedditTopic"),
+        ("GravityService", "GetGravityTasks"),
+        ("GravityService", "GetCrawler"),
+        ("GravityService", "GetDataset"),
+        ("GravityService", "GetGravityTaskDatasetFiles"),
+        ("GravityService", "GetGravityMarketplaceTaskDatasetFiles"),
+        ("GravityService", "GetCrawlerHistory"),
+        ("BillingService", "GetUsage"),
+    }
+)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical asynchronous calls into a single in-flight call.
+
+    The first caller for a key starts the call; callers arriving while it is in flight wait
+    for it and receive the same result or error. Each waiting caller gets its own copy of the
+    response message, so a caller mutating its response does not affect the others. Once the
+    call completes, the next caller starts a new one. Calls are shared only within an event
+    loop. A caller that is cancelled stops waiting without cancelling the call for the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Tuple[asyncio.AbstractEventLoop, Hashable], asyncio.Task] = {}
+        self._started = 0
+        self._coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `fn()`, or wait for the in-flight call with the same key.
+
+        Args:
+            key: Identifies identical calls.
+            fn: Starts the call.
+
+        Returns:
+            The result of the call.
+        """
+        loop = asyncio.get_running_loop()
+        call_key = (loop, key)
+        task = self._calls.get(call_key)
+        if task is None:
+            task = loop.create_task(fn())
+            self._calls[call_key] = task
+            task.add_done_callback(lambda done: self._finish(call_key, done))
+            self._started += 1
+            return await asyncio.shield(task)
+
+        self._coalesced += 1
+        return _copy(await asyncio.shield(task))
+
+    def _finish(self, call_key, task: asyncio.Task) -> None:
+        if self._calls.get(call_key) is task:
+            del self._calls[call_key]
+        if not task.cancelled():
+            # Mark the error as retrieved in case every caller was cancelled
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the single-flight counters for monitoring.
+
+        Returns:
+            A dictionary with the number of calls `started`, the number of calls `coalesced`
+            into an in-flight call, and the number currently `in_flight`.
+        """
+        return {
+            "started": self._started,
+            "coalesced": self._coalesced,
+            "in_flight": len(self._calls),
+        }
+
+
+def _copy(result: T) -> T:
+    """Copy a protobuf message result; other results are returned as they are."""
+    if hasattr(result, "SerializeToString"):
+        return type(result).FromString(result.SerializeToString())
+    return result
@@ -1,4 +1,4 @@
-from typing import AsyncIterator, Generic, TypeVar
+from typing import AsyncIterator, Generic, Optional, TypeVar
 
 from grpc.aio import Channel
 
@@ -6,15 +6,28 @@ T = TypeVar("T")
 
 
 class StreamGenerator(Generic[T], AsyncIterator[T]):
-    """Generator for async iterator to close the channel when the iterator is closed."""
+    """
+    Generator for async iterator that releases its resources when the iterator is exhausted
+    or closed: the source iterator and, if one was passed, a dedicated channel.
 
-    def __init__(self, stream_response: AsyncIterator[T], channel: Channel):
+    Pooled channels (see `BaseClient.get_async_channel()`) are shared with other calls and
+    must not be passed here, so they stay open.
+    """
+
+    def __init__(
+        self, stream_response: AsyncIterator[T], channel: Optional[Channel] = None
+    ):
         self._generator = self.stream_generator(stream_response)
         self._channel = channel
 
     async def stream_generator(self, stream_response: AsyncIterator[T]):
-        async for chunk in stream_response:
-            yield chunk
+        try:
+            async for chunk in stream_response:
+                yield chunk
+        finally:
+            aclose = getattr(stream_response, "aclose", None)
+            if aclose is not None:
+                await aclose()
 
     def __aiter__(self):
         return self
@@ -22,9 +35,16 @@ class StreamGenerator(Generic[T], AsyncIterator[T]):
     async def __anext__(self) -> T:
         try:
             return await self._generator.__anext__()
-        except StopAsyncIteration:
-            await self._channel.close()
+        except BaseException:
+            # Exhausted or failed; the stream can't be resumed either way
+            await self._close_channel()
             raise
 
     async def aclose(self):
-        await self._channel.close()
+        await self._generator.aclose()
+        await self._close_channel()
+
+    async def _close_channel(self):
+        channel, self._channel = self._channel, None
+        if channel is not None:
+            await channel.close()
@@ -1,32 +1,115 @@
 import asyncio
 import threading
+from typing import Awaitable, Optional, TypeVar
 
+T = TypeVar("T")
 
-def run_sync_threadsafe(coro):
+LOOP_THREAD_STOP_TIMEOUT = 5
+
+
+class EventLoopThread:
     """
-    Run async code synchronously, even if inside a running event loop.
+    A long-lived event loop running in a daemon thread.
+
+    Synchronous code submits coroutines to it with `run()`, so that sync calls neither create
+    and tear down an event loop per call nor spawn a thread per call, and so that async
+    resources (such as pooled aio channels) bound to the loop can be reused across calls.
     """
-    try:
-        asyncio.get_running_loop()
-    except RuntimeError:
-        # If there's no running event loop, run the coroutine directly
-        return asyncio.run(coro)
-
-    # If we get here, there's a running event loop - use thread-safe approach
-    result = None
-    exception = None
-
-    def runner():
-        nonlocal result, exception
+
+    def __init__(self, name: str = "macrocosmos-event-loop"):
+        """
+        Initialize the event loop thread. The thread is started lazily on first use.
+
+        Args:
+            name: The name of the thread.
+        """
+        self._name = name
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def run(self, coro: Awaitable[T]) -> T:
+        """
+        Run a coroutine on the background loop and block until it completes.
+
+        Args:
+            coro: The coroutine to run.
+
+        Returns:
+            The result of the coroutine.
+        """
+        loop = self._ensure_started()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError(
+                "Cannot run a synchronous call from the client's own event loop thread"
+            )
+
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        try:
+            return future.result()
+        except BaseException:
+            # e.g. KeyboardInterrupt while waiting; don't leave the coroutine running
+            future.cancel()
+            raise
+
+    def stop(self) -> None:
+        """
+        Cancel any pending work, stop the loop and join the thread.
+
+        The thread is started again on the next call to `run()`.
+        """
+        with self._lock:
+            loop, self._loop = self._loop, None
+            thread, self._thread = self._thread, None
+
+        if loop is None or thread is None:
+            return
+
+        if thread is threading.current_thread():
+            # Stopping from inside the loop; it is closed by the thread when it exits
+            loop.stop()
+            return
+
+        asyncio.run_coroutine_threadsafe(_shutdown_loop(), loop)
+        thread.join(timeout=LOOP_THREAD_STOP_TIMEOUT)
+
+    @property
+    def loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        """Get the background event loop, if it is running."""
+        return self._loop
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        """Start the loop thread if it is not running yet and return its loop."""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=self._run_loop, args=(loop,), name=self._name, daemon=True
+                )
+                self._loop = loop
+                self._thread = thread
+                thread.start()
+            return self._loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+        """Thread target: run the loop until it is stopped, then close it."""
+        asyncio.set_event_loop(loop)
         try:
-            result = asyncio.run(coro)
-        except Exception as e:
-            exception = e
+            loop.run_forever()
+        finally:
+            try:
+                loop.run_until_complete(loop.shutdown_asyncgens())
+            finally:
+                loop.close()
 
-    thread = threading.Thread(target=runner)
-    thread.start()
-    thread.join()
 
-    if exception:
-        raise exception
-    return result
+async def _shutdown_loop() -> None:
+    """Cancel every other task on the running loop, then stop the loop."""
+    current = asyncio.current_task()
+    tasks = [task for task in asyncio.all_tasks() if task is not current]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    asyncio.get_running_loop().stop()
@@ -1,10 +1,6 @@
-import grpc
-
-from macrocosmos import __package_name__, __version__
 from macrocosmos.generated.billing.v1 import billing_pb2, billing_pb2_grpc
-from macrocosmos.types import MacrocosmosError
 from macrocosmos.resources._client import BaseClient
-from macrocosmos.resources._utils import run_sync_threadsafe
+from macrocosmos.resources._request import make_async_request, make_sync_request
 
 
 class AsyncBilling:
@@ -36,39 +32,9 @@ class AsyncBilling:
             product_type=product_type,
         )
 
-        metadata = [
-            ("x-source", self._client.app_name),
-            ("x-client-id", __package_name__),
-            ("x-client-version", __version__),
-            ("authorization", f"Bearer {self._client.api_key}"),
-        ]
-
-        compression = grpc.Compression.Gzip if self._client.compress else None
-
-        retries = 0
-        last_error = None
-        while retries <= self._client.max_retries:
-            channel = None
-            try:
-                channel = self._client.get_async_channel()
-                stub = billing_pb2_grpc.BillingServiceStub(channel)
-                response = await stub.GetUsage(
-                    request,
-                    metadata=metadata,
-                    timeout=self._client.timeout,
-                    compression=compression,
-                )
-                return response
-            except grpc.RpcError as e:
-                last_error = MacrocosmosError(f"RPC error: {e.code()}: {e.details()}")
-                retries += 1
-            except Exception as e:
-                raise MacrocosmosError(f"Error getting usage: {e}")
-            finally:
-                if channel:
-                    await channel.close()
-
-        raise last_error
+        return await make_async_request(
+            self._client, billing_pb2_grpc.BillingServiceStub, "GetUsage", request
+        )
 
 
 class SyncBilling:
@@ -82,7 +48,6 @@ class SyncBilling:
             client: The client to use for the resource.
         """
         self._client = client
-        self._async_billing = AsyncBilling(client)
 
     def GetUsage(
         self,
@@ -97,8 +62,10 @@ class SyncBilling:
         Returns:
             A response containing the usage and billing information.
         """
-        return run_sync_threadsafe(
-            self._async_billing.GetUsage(
-                product_type=product_type,
-            )
+        request = billing_pb2.GetUsageRequest(
+            product_type=product_type,
+        )
+
+        return make_sync_request(
+            self._client, billing_pb2_grpc.BillingServiceStub, "GetUsage", request
         )
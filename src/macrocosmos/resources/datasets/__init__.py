@@ -0,0 +1 @@
+"""Helpers for working with Gravity datasets."""
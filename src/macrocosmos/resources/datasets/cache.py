@@ -0,0 +1,297 @@
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Set
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DEFAULT_DATASET_CACHE_DIRECTORY = os.path.join("~", ".cache", "macrocosmos", "datasets")
+
+INDEX_NAME = "index.json"
+INDEX_LOCK_NAME = "index.lock"
+
+LINK_MODES = ("hardlink", "symlink", "copy")
+
+
+def cache_key(s3_key: str, last_modified: Optional[str]) -> str:
+    """Get the cache key of a dataset file version: a digest of its S3 key and timestamp."""
+    return hashlib.sha256(f"{s3_key}\0{last_modified or ''}".encode()).hexdigest()
+
+
+class DatasetFileCache:
+    """
+    A local cache of Gravity dataset files, keyed by `s3_key` plus `last_modified`, so a file
+    that has not changed is downloaded once and reused by every later download.
+
+    Files are stored under their key and moved into place with an atomic rename, so a
+    crash never leaves a partial file in the cache. `index.json` maps each key to its size
+    and last use, for O(1) lookups and least recently used eviction beyond `max_bytes`.
+    Several processes can share a cache directory: each writes its changes to the index by
+    merging them into the index on disk, under an exclusive `fcntl` lock on POSIX systems.
+    Cached files are materialized into the caller's directory as hard links (falling back to
+    symlinks or copies, see `link`); treat them as read-only.
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_DATASET_CACHE_DIRECTORY,
+        max_bytes: int = 50 * 1024**3,
+        link: str = "hardlink",
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            directory: The cache directory. It is created if missing.
+                (default: "~/.cache/macrocosmos/datasets")
+            max_bytes: The size above which least recently used files are evicted.
+                (default: 50 GiB)
+            link: How to materialize cached files: "hardlink", "symlink" or "copy". Hard
+                links fall back to symlinks across file systems, and symlinks to copies.
+                (default: "hardlink")
+        """
+        if link not in LINK_MODES:
+            raise ValueError(f"invalid link: {link!r}, must be one of {LINK_MODES}")
+        self.directory = os.path.expanduser(directory)
+        self.max_bytes = max_bytes
+        self.link = link
+        self._objects = os.path.join(self.directory, "objects")
+        self.staging_directory = os.path.join(self.directory, "staging")
+        os.makedirs(self._objects, exist_ok=True)
+        os.makedirs(self.staging_directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._index: Dict[str, Dict[str, Any]] = self._load_index()
+        # Changes not yet merged into the index on disk
+        self._added: Dict[str, Dict[str, Any]] = {}
+        self._removed: Set[str] = set()
+        self._used: Dict[str, float] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def path(self, key: str) -> str:
+        """Get the path of a cached file in the cache."""
+        return os.path.join(self._objects, key[:2], key)
+
+    def staging_path(self, key: str) -> str:
+        """Get where to download a file before it is added with `put()`."""
+        return os.path.join(self.staging_directory, key)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a file.
+
+        Args:
+            key: The cache key, from `cache_key()`.
+
+        Returns:
+            The path of the cached file, or None if it is not cached.
+        """
+        with self._lock:
+            entry = self._index.get(key)
+            exists = os.path.exists(self.path(key))
+            if entry is None and exists:
+                # Possibly added by another process since the index was read
+                self._sync()
+                entry = self._index.get(key)
+            if entry is not None and not exists:
+                # Removed from outside the cache
+                del self._index[key]
+                self._removed.add(key)
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            entry["last_used"] = self._used[key] = time.time()
+            self._hits += 1
+            return self.path(key)
+
+    def put(
+        self,
+        key: str,
+        source: str,
+        s3_key: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> str:
+        """
+        Move a downloaded file into the cache, then evict old files if it is over its size.
+
+        Args:
+            key: The cache key, from `cache_key()`.
+            source: The downloaded file, preferably at `staging_path(key)` so the move is
+                a rename on the same file system.
+            s3_key: The S3 key of the file, recorded in the index. (default: None)
+            last_modified: The last modification time of the file, recorded in the index.
+                (default: None)
+
+        Returns:
+            The path of the cached file.
+        """
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            os.replace(source, path)
+        except OSError:
+            # On another file system: copy next to the target first, then rename
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            os.close(fd)
+            shutil.copyfile(source, tmp_path)
+            os.replace(tmp_path, path)
+            os.remove(source)
+
+        with self._lock:
+            self._index[key] = self._added[key] = {
+                "s3_key": s3_key,
+                "last_modified": last_modified,
+                "size": os.path.getsize(path),
+                "last_used": time.time(),
+            }
+            self._removed.discard(key)
+            self._sync(keep=key)
+        return path
+
+    def materialize(self, key: str, destination: str) -> str:
+        """
+        Make a cached file available at `destination`, replacing any file there.
+
+        Returns:
+            The destination path.
+        """
+        source = self.path(key)
+        os.makedirs(os.path.dirname(os.path.abspath(destination)), exist_ok=True)
+        tmp_path = f"{destination}.{os.getpid()}.{threading.get_ident()}.tmp"
+        modes = LINK_MODES[LINK_MODES.index(self.link) :]
+        for mode in modes:
+            try:
+                if mode == "hardlink":
+                    os.link(source, tmp_path)
+                elif mode == "symlink":
+                    os.symlink(os.path.abspath(source), tmp_path)
+                else:
+                    shutil.copyfile(source, tmp_path)
+                break
+            except OSError:
+                if mode == modes[-1]:
+                    raise
+        os.replace(tmp_path, destination)
+        return destination
+
+    def save(self) -> None:
+        """Merge the changes to the index into the index on disk, if there are any."""
+        with self._lock:
+            if self._added or self._removed or self._used:
+                self._sync()
+
+    def clear(self) -> None:
+        """Remove every file from the cache."""
+        with self._lock:
+            self._sync(clear=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the cache counters for monitoring.
+
+        Returns:
+            A dictionary with the number of `hits`, `misses` and `evictions`, and the number
+            of `files` and `bytes` cached.
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "files": len(self._index),
+                "bytes": sum(entry["size"] for entry in self._index.values()),
+            }
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _evict(self, keep: Optional[str]) -> None:
+        total = sum(entry["size"] for entry in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for key in sorted(self._index, key=lambda key: self._index[key]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= self._index[key]["size"]
+            self._remove(key)
+            self._evictions += 1
+
+    def _remove(self, key: str) -> None:
+        # Materialized hard links and copies stay valid; symlinks to the file break
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+        del self._index[key]
+
+    def _sync(self, keep: Optional[str] = None, clear: bool = False) -> None:
+        """
+        Merge this instance's changes into the index on disk, evict files or clear the
+        cache, and write the index back. Called with `_lock` held.
+        """
+        with self._index_lock():
+            index = self._load_index()
+            for key in self._removed:
+                index.pop(key, None)
+            index.update(self._added)
+            for key, last_used in self._used.items():
+                entry = index.get(key)
+                if entry is not None:
+                    entry["last_used"] = max(entry["last_used"], last_used)
+            self._index = index
+            if clear:
+                for key in list(index):
+                    self._remove(key)
+            else:
+                self._evict(keep)
+            self._save()
+        self._added, self._removed, self._used = {}, set(), {}
+
+    @contextlib.contextmanager
+    def _index_lock(self) -> Iterator[None]:
+        """Hold the lock on the index shared with other processes, where supported."""
+        if fcntl is None:
+            yield
+            return
+        fd = os.open(
+            os.path.join(self.directory, INDEX_LOCK_NAME), os.O_RDWR | os.O_CREAT, 0o600
+        )
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            # Closing the file releases the lock
+            os.close(fd)
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(os.path.join(self.directory, INDEX_NAME)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self._index, f)
+            os.replace(tmp_path, os.path.join(self.directory, INDEX_NAME))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
@@ -0,0 +1,520 @@
+import asyncio
+import http.client
+import json
+import os
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional, Tuple
+
+from macrocosmos.resources.datasets.cache import DatasetFileCache, cache_key
+from macrocosmos.types import MacrocosmosError
+
+# Size of the byte ranges large files are split into, each fetched by one request.
+DEFAULT_PART_SIZE = 16 * 1024 * 1024
+
+# Size of the reads from a response, and so the granularity of progress reports.
+READ_SIZE = 1024 * 1024
+
+PARTIAL_SUFFIX = ".part"
+STATE_SUFFIX = ".part.json"
+
+# Content-Range header of a partial response: bytes <start>-<end>/<size or *>.
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)$")
+
+# HTTP errors worth retrying: throttling and server errors.
+_RETRYABLE_HTTP_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+class DownloadProgress(NamedTuple):
+    """
+    The progress of a download, reported as data arrives. `file_size` is None while the
+    size of the file is unknown.
+    """
+
+    file_name: str
+    path: str
+    bytes_downloaded: int
+    file_size: Optional[int]
+    total_bytes_downloaded: int
+    total_bytes: int
+
+
+class FileSpec(NamedTuple):
+    """A file to download: where from, where to, and its expected size if known."""
+
+    url: str
+    path: str
+    size: Optional[int]
+    key: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+def dataset_file_specs(files: Iterable[Any], directory: str) -> List[FileSpec]:
+    """
+    Get the download specs of dataset files.
+
+    Args:
+        files: `DatasetFile` or `DatasetFileWithId` messages, dicts with the same fields, or
+            `Dataset` messages or `GetDatasetResponse`s whose files to take.
+        directory: The output directory. Files with a `dataset_id` go in a subdirectory named
+            after it.
+
+    Returns:
+        The specs, one per file.
+    """
+    specs = []
+    for file in _expand_files(files):
+
+        def get(name: str) -> Any:
+            if isinstance(file, dict):
+                return file.get(name)
+            return getattr(file, name, None)
+
+        url = get("url")
+        if not url:
+            raise ValueError(f"dataset file has no url: {get('file_name')!r}")
+        file_name = _path_component(
+            os.path.basename(get("file_name") or url.split("?")[0]), "file name"
+        )
+        dataset_id = get("dataset_id")
+        if dataset_id:
+            dataset_id = _path_component(dataset_id, "dataset ID")
+        path = os.path.join(directory, dataset_id, file_name) if dataset_id else None
+        last_modified = get("last_modified")
+        if last_modified is not None and hasattr(last_modified, "ToJsonString"):
+            last_modified = (
+                last_modified.ToJsonString()
+                if last_modified.seconds or last_modified.nanos
+                else None
+            )
+        specs.append(
+            FileSpec(
+                url=url,
+                path=path or os.path.join(directory, file_name),
+                size=get("file_size_bytes") or None,
+                key=get("s3_key") or None,
+                last_modified=last_modified or None,
+            )
+        )
+    return specs
+
+
+def _path_component(name: str, what: str) -> str:
+    """Check that a name from the API is a single path component, so it stays in place."""
+    separators = {"/", "\\", os.sep} | ({os.altsep} if os.altsep else set())
+    if (
+        name in ("", ".", "..")
+        or any(sep in name for sep in separators)
+        or "\0" in name
+    ):
+        raise ValueError(f"unsafe {what} for a dataset file: {name!r}")
+    return name
+
+
+def _expand_files(files: Iterable[Any]) -> Iterable[Any]:
+    for item in files:
+        if hasattr(item, "dataset") and hasattr(item.dataset, "files"):
+            # GetDatasetResponse
+            yield from item.dataset.files
+        elif hasattr(item, "files") and hasattr(item, "total_steps"):
+            # Dataset
+            yield from item.files
+        else:
+            yield item
+
+
+class _Download:
+    """The state of one file download: its byte ranges and which of them are complete."""
+
+    def __init__(
+        self, spec: FileSpec, size: Optional[int], ranged: bool, part_size: int
+    ):
+        self.spec = spec
+        self.size = size
+        self.partial_path = spec.path + PARTIAL_SUFFIX
+        self.state_path = spec.path + STATE_SUFFIX
+        self.lock = threading.Lock()
+        self.bytes_downloaded = 0
+        # Set once a request is fetching the whole file, as the server ignores ranges
+        self.fetching_whole_file = False
+
+        if size is None:
+            # The size is learned from the one request that streams the whole file
+            self.ranges: List[Tuple[int, Optional[int]]] = [(0, None)]
+        elif ranged and size > part_size:
+            self.ranges = [
+                (start, min(start + part_size, size) - 1)
+                for start in range(0, size, part_size)
+            ]
+        else:
+            self.ranges = [(0, size - 1)] if size else []
+        self.completed = self._load_state()
+        self.bytes_downloaded = sum(end - start + 1 for start, end in self.completed)
+
+    @property
+    def pending(self) -> List[Tuple[int, Optional[int]]]:
+        return [
+            byte_range for byte_range in self.ranges if byte_range not in self.completed
+        ]
+
+    @property
+    def done(self) -> bool:
+        return len(self.completed) == len(self.ranges)
+
+    def _load_state(self) -> set:
+        """Get the ranges completed by a previous attempt, if its files are consistent."""
+        completed = set()
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+            if (
+                state.get("url_path") == self.spec.url.split("?")[0]
+                and state.get("size") == self.size
+                and os.path.getsize(self.partial_path) == self.size
+            ):
+                completed = {tuple(byte_range) for byte_range in state["completed"]}
+                completed &= set(self.ranges)
+        except (OSError, ValueError, KeyError):
+            pass
+
+        if not completed:
+            os.makedirs(os.path.dirname(os.path.abspath(self.spec.path)), exist_ok=True)
+            with open(self.partial_path, "wb") as f:
+                f.truncate(self.size or 0)
+        return completed
+
+    def complete_range(self, byte_range: Tuple[int, Optional[int]]) -> None:
+        with self.lock:
+            if byte_range == (0, self.size - 1):
+                # The whole file, which covers every range
+                self.completed.update(self.ranges)
+            else:
+                self.completed.add(byte_range)
+            state = {
+                "url_path": self.spec.url.split("?")[0],
+                "size": self.size,
+                "completed": sorted(self.completed),
+            }
+            tmp_path = self.state_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_path)
+
+    def finish(self) -> None:
+        """Verify the downloaded size and move the file into place."""
+        size = os.path.getsize(self.partial_path)
+        if size != self.size:
+            raise MacrocosmosError(
+                f"Downloaded {size} bytes for {self.spec.url}, expected {self.size}"
+            )
+        os.replace(self.partial_path, self.spec.path)
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
+
+
+def _check_response(response, download: _Download, start: int, end: int) -> bool:
+    """
+    Check that a response holds the requested range of a file of the expected size.
+
+    Returns:
+        Whether the response holds the whole file instead, as the server ignored the range.
+    """
+    url = download.spec.url
+    if response.status == 206:
+        # Content-Range: bytes <start>-<end>/<size>
+        match = _CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+        if match is None or (int(match.group(1)), int(match.group(2))) != (start, end):
+            raise MacrocosmosError(
+                f"Server returned the wrong range for {url}: "
+                f"{response.headers.get('Content-Range')!r}, expected {start}-{end}"
+            )
+        if match.group(3) != "*" and int(match.group(3)) != download.size:
+            raise MacrocosmosError(
+                f"{url} is {match.group(3)} bytes, expected {download.size}"
+            )
+        return False
+
+    length = response.headers.get("Content-Length")
+    if length is not None and int(length) != download.size:
+        raise MacrocosmosError(f"{url} is {length} bytes, expected {download.size}")
+    return (start, end) != (0, download.size - 1)
+
+
+class Downloader:
+    """
+    Downloads files over HTTP with parallel range requests.
+
+    Files larger than `part_size` are split into byte ranges fetched concurrently, with at
+    most `max_connections` requests in flight across all files. Data is written to a ".part"
+    file next to the destination, with the completed ranges recorded in a ".part.json" file,
+    so an interrupted download resumes where it stopped. The final size is checked against
+    the expected size before the file is moved into place; files already present with that
+    size are not downloaded again.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 8,
+        part_size: int = DEFAULT_PART_SIZE,
+        timeout: float = 60.0,
+        max_retries: int = 3,
+        progress: Optional[Callable[[DownloadProgress], Any]] = None,
+        cache: Optional[DatasetFileCache] = None,
+    ):
+        """
+        Initialize the downloader.
+
+        Args:
+            max_connections: The maximum number of requests in flight. (default: 8)
+            part_size: The size in bytes of the ranges large files are split into.
+                (default: 16 MiB)
+            timeout: The socket timeout of each request, in seconds. (default: 60)
+            max_retries: The retries of a range after a network or server error. (default: 3)
+            progress: Called with a DownloadProgress as data arrives, from worker threads.
+                (default: None)
+            cache: Files with an S3 key are taken from this cache when present, and added
+                to it when downloaded. (default: None)
+        """
+        if max_connections < 1 or part_size < 1:
+            raise ValueError("max_connections and part_size must be >= 1")
+        self.max_connections = max_connections
+        self.part_size = part_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.progress = progress
+        self.cache = cache
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._total_downloaded = 0
+        self._total_bytes = 0
+
+    def cancel(self) -> None:
+        """Stop the downloads in progress; they can be resumed later."""
+        self._cancelled.set()
+
+    def download(self, specs: Iterable[FileSpec]) -> List[str]:
+        """
+        Download files.
+
+        Args:
+            specs: The files to download.
+
+        Returns:
+            The paths of the files, in the order given.
+        """
+        specs = list(specs)
+        self._cancelled.clear()
+
+        # (spec to download, spec of the destination, cache key) of each file to download
+        jobs: List[Tuple[FileSpec, FileSpec, Optional[str]]] = []
+        for spec in specs:
+            if self.cache is None or not spec.key:
+                jobs.append((spec, spec, None))
+                continue
+            key = cache_key(spec.key, spec.last_modified)
+            if self.cache.get(key) is not None:
+                self.cache.materialize(key, spec.path)
+            else:
+                staged = spec._replace(path=self.cache.staging_path(key))
+                jobs.append((staged, spec, key))
+
+        errors = self._download([fetched for fetched, _, _ in jobs])
+
+        if self.cache is not None:
+            for fetched, spec, key in jobs:
+                if key is not None and os.path.exists(fetched.path):
+                    self.cache.put(key, fetched.path, spec.key, spec.last_modified)
+                    self.cache.materialize(key, spec.path)
+            self.cache.save()
+        if errors:
+            raise errors[0]
+        return [spec.path for spec in specs]
+
+    def _download(self, specs: List[FileSpec]) -> List[BaseException]:
+        """Download files, returning the errors of those that failed."""
+        with ThreadPoolExecutor(max_workers=self.max_connections) as executor:
+            downloads = [
+                download
+                for download in executor.map(self._prepare, specs)
+                if download is not None
+            ]
+            self._total_bytes = sum(download.size or 0 for download in downloads)
+            self._total_downloaded = sum(
+                download.bytes_downloaded for download in downloads
+            )
+
+            futures = {
+                executor.submit(self._fetch_range, download, byte_range): download
+                for download in downloads
+                for byte_range in download.pending
+            }
+            finished, _ = wait(futures, return_when=FIRST_EXCEPTION)
+            errors = [future.exception() for future in finished if future.exception()]
+            if errors:
+                self._cancelled.set()
+                wait(futures)
+
+        # Files whose ranges all completed are kept even if others failed
+        for download in downloads:
+            if download.done:
+                download.finish()
+        return errors
+
+    def _prepare(self, spec: FileSpec) -> Optional[_Download]:
+        """Get the size of a file and its resumable state, or None if it is already here."""
+        size, ranged = spec.size, True
+        if size is None:
+            size, ranged = self._probe(spec.url)
+        if (
+            size is not None
+            and os.path.exists(spec.path)
+            and os.path.getsize(spec.path) == size
+        ):
+            return None
+        return _Download(spec, size, ranged, self.part_size)
+
+    def _probe(self, url: str) -> Tuple[Optional[int], bool]:
+        """
+        Get the size of a file, None if the server does not report it, and whether the
+        server accepts range requests.
+        """
+        request = urllib.request.Request(url, method="HEAD")
+        with self._open(request) as response:
+            length = response.headers.get("Content-Length")
+            size = int(length) if length is not None else None
+            ranged = response.headers.get("Accept-Ranges", "").lower() == "bytes"
+        return size, ranged
+
+    def _fetch_range(
+        self, download: _Download, byte_range: Tuple[int, Optional[int]]
+    ) -> None:
+        for attempt in range(self.max_retries + 1):
+            start, end = byte_range
+            written = 0
+            try:
+                # A file of unknown size is streamed whole, in one request
+                headers = {} if end is None else {"Range": f"bytes={start}-{end}"}
+                request = urllib.request.Request(download.spec.url, headers=headers)
+                with self._open(request) as response, open(
+                    download.partial_path, "r+b"
+                ) as f:
+                    if end is None:
+                        length = response.headers.get("Content-Length")
+                        end = int(length) - 1 if length is not None else None
+                        f.truncate(0)
+                    elif _check_response(response, download, start, end):
+                        # The server ignored the range and sent the whole file: one
+                        # request keeps it for every range, the others stop
+                        with download.lock:
+                            if download.fetching_whole_file:
+                                return
+                            download.fetching_whole_file = True
+                        self._report(download, -download.bytes_downloaded)
+                        start, end = byte_range = (0, download.size - 1)
+                    f.seek(start)
+                    while True:
+                        if self._cancelled.is_set():
+                            raise MacrocosmosError("Download cancelled")
+                        size = READ_SIZE
+                        if end is not None:
+                            size = min(size, end - start + 1 - written)
+                        chunk = response.read(size)
+                        if not chunk:
+                            break
+                        f.write(chunk)
+                        written += len(chunk)
+                        self._report(download, len(chunk))
+                if end is None and not written:
+                    # Without a Content-Length, an empty body is not a complete file
+                    raise MacrocosmosError(
+                        f"Server sent no data and no size for {download.spec.url}"
+                    )
+                if end is not None and written != end - start + 1:
+                    raise urllib.error.URLError(
+                        f"connection closed after {written} of {end - start + 1} bytes"
+                    )
+                if download.size is None:
+                    download.size = written
+                download.complete_range(byte_range)
+                return
+            except (urllib.error.URLError, http.client.HTTPException, OSError) as e:
+                # The bytes of the failed attempt are fetched again
+                self._report(download, -written)
+                status = getattr(e, "code", None)
+                retryable = status is None or status in _RETRYABLE_HTTP_STATUSES
+                if not retryable or attempt == self.max_retries:
+                    raise MacrocosmosError(
+                        f"Error downloading {download.spec.url}: {e}"
+                    ) from e
+                time.sleep(min(2**attempt * 0.5, 10.0))
+            except BaseException:
+                self._report(download, -written)
+                raise
+
+    def _open(self, request: urllib.request.Request):
+        return urllib.request.urlopen(request, timeout=self.timeout)
+
+    def _report(self, download: _Download, size: int) -> None:
+        with self._lock:
+            download.bytes_downloaded += size
+            self._total_downloaded += size
+            progress = DownloadProgress(
+                file_name=os.path.basename(download.spec.path),
+                path=download.spec.path,
+                bytes_downloaded=download.bytes_downloaded,
+                file_size=download.size,
+                total_bytes_downloaded=self._total_downloaded,
+                total_bytes=self._total_bytes,
+            )
+        if self.progress is not None and size:
+            self.progress(progress)
+
+
+def download_dataset_files(
+    files: Iterable[Any],
+    directory: str,
+    max_connections: int = 8,
+    part_size: int = DEFAULT_PART_SIZE,
+    progress: Optional[Callable[[DownloadProgress], Any]] = None,
+    cache: Optional[DatasetFileCache] = None,
+) -> List[str]:
+    """
+    Download dataset files.
+
+    See `SyncGravity.download_dataset_files`.
+    """
+    downloader = Downloader(max_connections, part_size, progress=progress, cache=cache)
+    return downloader.download(dataset_file_specs(files, directory))
+
+
+async def download_dataset_files_async(
+    files: Iterable[Any],
+    directory: str,
+    max_connections: int = 8,
+    part_size: int = DEFAULT_PART_SIZE,
+    progress: Optional[Callable[[DownloadProgress], Any]] = None,
+    cache: Optional[DatasetFileCache] = None,
+) -> List[str]:
+    """
+    Download dataset files without blocking the event loop.
+
+    See `AsyncGravity.download_dataset_files`.
+    """
+    downloader = Downloader(max_connections, part_size, progress=progress, cache=cache)
+    specs = dataset_file_specs(files, directory)
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(None, downloader.download, specs)
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        # Stop the worker threads; the partial files are kept for resuming
+        downloader.cancel()
+        try:
+            await future
+        except MacrocosmosError:
+            pass
+        raise
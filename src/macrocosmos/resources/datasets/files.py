@@ -0,0 +1,53 @@
+from typing import Iterator, NamedTuple, Optional
+
+from macrocosmos.generated.gravity.v1 import gravity_pb2
+
+
+class DatasetFileRecord(NamedTuple):
+    """A dataset file of a gravity task, with the crawler and dataset it belongs to."""
+
+    gravity_task_id: str
+    crawler_id: str
+    dataset_id: str
+    file_name: str
+    file_size_bytes: int
+    num_rows: int
+    last_modified: Optional[str]
+    s3_key: str
+    url: str
+    nebula_url: str
+
+
+def iter_dataset_files(
+    response: gravity_pb2.GetGravityTaskDatasetFilesResponse,
+) -> Iterator[DatasetFileRecord]:
+    """
+    Flatten the files of every crawler of a task into one record per file.
+
+    The records can be passed to `download_dataset_files()`, or converted with `_asdict()`
+    for the columnar export helpers.
+
+    Args:
+        response: The response of `GetGravityTaskDatasetFiles` or
+            `GetGravityMarketplaceTaskDatasetFiles`.
+
+    Yields:
+        A DatasetFileRecord per file, crawler by crawler.
+    """
+    for crawler_files in response.crawler_dataset_files:
+        for file in crawler_files.dataset_files:
+            last_modified = None
+            if file.HasField("last_modified"):
+                last_modified = file.last_modified.ToJsonString()
+            yield DatasetFileRecord(
+                gravity_task_id=response.gravity_task_id,
+                crawler_id=crawler_files.crawler_id,
+                dataset_id=file.dataset_id,
+                file_name=file.file_name,
+                file_size_bytes=file.file_size_bytes,
+                num_rows=file.num_rows,
+                last_modified=last_modified,
+                s3_key=file.s3_key,
+                url=file.url,
+                nebula_url=file.nebula_url,
+            )
@@ -0,0 +1,173 @@
+import asyncio
+import time
+from typing import AsyncIterator, Dict, Iterable, Optional, Tuple, Union
+
+from macrocosmos.generated.gravity.v1 import gravity_pb2
+from macrocosmos.resources.watcher import (
+    TERMINAL_STATUSES,
+    _error_backoff,
+    _is_transient,
+)
+from macrocosmos.types import DatasetWaitError, MacrocosmosError
+
+# Weight of the latest observation in the smoothed progress rate of a dataset build.
+RATE_SMOOTHING = 0.5
+
+
+def dataset_progress(dataset: gravity_pb2.Dataset) -> float:
+    """
+    Get the overall progress of a dataset build, from 0 to 1: the completed steps plus the
+    progress of the current step, out of `total_steps`.
+    """
+    if dataset.status == "Completed":
+        return 1.0
+    if not dataset.steps or not dataset.total_steps:
+        return 0.0
+    done = len(dataset.steps) - 1 + dataset.steps[-1].progress
+    return min(max(done / dataset.total_steps, 0.0), 1.0)
+
+
+class _BuildTracker:
+    """Estimates when to poll a dataset build next from the rate of its progress."""
+
+    def __init__(self, interval: float, min_interval: float, max_interval: float):
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.progress: Optional[float] = None
+        self.observed_at: Optional[float] = None
+        self.rate: Optional[float] = None
+
+    def observe(self, progress: float, now: float) -> float:
+        """
+        Record the progress seen at `now`.
+
+        Returns:
+            The seconds until the next poll.
+        """
+        if self.progress is not None and now > self.observed_at:
+            rate = (progress - self.progress) / (now - self.observed_at)
+            if rate > 0:
+                self.rate = (
+                    rate
+                    if self.rate is None
+                    else RATE_SMOOTHING * rate + (1 - RATE_SMOOTHING) * self.rate
+                )
+            elif self.rate is not None:
+                # Stalled: assume it is slower than estimated
+                self.rate /= 2
+        self.progress, self.observed_at = progress, now
+
+        if self.rate:
+            # Poll about halfway to the estimated completion, so polls are rare early on
+            # and frequent near the end
+            delay = (1.0 - progress) / self.rate / 2
+        else:
+            delay = self.interval
+            self.interval *= 1.5
+        return min(max(delay, self.min_interval), self.max_interval)
+
+
+async def iter_completed_datasets(
+    gravity,
+    dataset_ids: Iterable[str],
+    interval: float = 5.0,
+    min_interval: float = 1.0,
+    max_interval: float = 60.0,
+    timeout: Optional[float] = None,
+    max_concurrency: int = 16,
+    return_exceptions: bool = False,
+) -> AsyncIterator[Tuple[str, Union[gravity_pb2.Dataset, DatasetWaitError]]]:
+    """
+    Wait for dataset builds, yielding each dataset as it completes, fails or is cancelled.
+
+    See `AsyncGravity.wait_for_datasets`.
+    """
+    dataset_ids = list(dict.fromkeys(dataset_ids))
+    if not dataset_ids:
+        return
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    semaphore = asyncio.Semaphore(max_concurrency)
+    finished: asyncio.Queue = asyncio.Queue()
+    # The last error of the datasets whose latest poll failed
+    failing: Dict[str, MacrocosmosError] = {}
+
+    async def wait_one(dataset_id: str) -> None:
+        tracker = _BuildTracker(interval, min_interval, max_interval)
+        failures = 0
+        while True:
+            try:
+                async with semaphore:
+                    response = await gravity.GetDataset(dataset_id)
+            except MacrocosmosError as e:
+                if not _is_transient(gravity, e):
+                    failing.pop(dataset_id, None)
+                    raise DatasetWaitError(dataset_id, e) from e
+                # Keep polling this dataset through transient errors, backing off
+                failing[dataset_id] = e
+                failures += 1
+                await asyncio.sleep(
+                    _error_backoff(e, failures, min_interval, max_interval)
+                )
+                continue
+            failing.pop(dataset_id, None)
+            failures = 0
+            dataset = response.dataset
+            if dataset.status in TERMINAL_STATUSES:
+                await finished.put((dataset_id, dataset))
+                return
+            await asyncio.sleep(
+                tracker.observe(dataset_progress(dataset), time.monotonic())
+            )
+
+    def report(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            finished.put_nowait(task.exception())
+
+    tasks = [asyncio.ensure_future(wait_one(dataset_id)) for dataset_id in dataset_ids]
+    for task in tasks:
+        task.add_done_callback(report)
+    try:
+        for _ in dataset_ids:
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            try:
+                if remaining is not None and remaining <= 0:
+                    raise asyncio.TimeoutError
+                item = await asyncio.wait_for(finished.get(), remaining)
+            except asyncio.TimeoutError:
+                _raise_timeout(failing)
+            if isinstance(item, DatasetWaitError) and return_exceptions:
+                yield item.dataset_id, item
+            elif isinstance(item, BaseException):
+                raise item
+            else:
+                yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _raise_timeout(failing: Dict[str, MacrocosmosError]) -> None:
+    if not failing:
+        raise asyncio.TimeoutError("timed out waiting for datasets")
+    # Errors that persisted until the timeout are surfaced with it
+    dataset_id, error = next(iter(failing.items()))
+    raise asyncio.TimeoutError(
+        f"timed out waiting for datasets, polls failing for {', '.join(failing)}"
+    ) from DatasetWaitError(dataset_id, error)
+
+
+async def wait_for_datasets(gravity, dataset_ids: Iterable[str], **kwargs) -> Dict:
+    """
+    Wait for dataset builds to finish.
+
+    See `AsyncGravity.wait_for_datasets`.
+    """
+    dataset_ids = list(dict.fromkeys(dataset_ids))
+    datasets = {
+        dataset_id: dataset
+        async for dataset_id, dataset in iter_completed_datasets(
+            gravity, dataset_ids, **kwargs
+        )
+    }
+    return {dataset_id: datasets[dataset_id] for dataset_id in dataset_ids}
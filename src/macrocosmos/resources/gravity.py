@@ -1,12 +1,38 @@
-from typing import Dict, List, Union
+import warnings
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
-import grpc
-
-from macrocosmos import __package_name__, __version__
 from macrocosmos.generated.gravity.v1 import gravity_p2p, gravity_pb2, gravity_pb2_grpc
-from macrocosmos.types import MacrocosmosError
 from macrocosmos.resources._client import BaseClient
-from macrocosmos.resources._utils import run_sync_threadsafe
+from macrocosmos.resources._request import make_async_request, make_sync_request
+from macrocosmos.resources.crawler_history import CrawlerHistory
+from macrocosmos.resources.datasets.cache import DatasetFileCache
+from macrocosmos.resources.datasets.download import (
+    DEFAULT_PART_SIZE,
+    DownloadProgress,
+    download_dataset_files,
+    download_dataset_files_async,
+)
+from macrocosmos.resources.datasets.files import (
+    DatasetFileRecord,
+    iter_dataset_files,
+)
+from macrocosmos.resources.datasets.wait import (
+    iter_completed_datasets,
+    wait_for_datasets,
+)
+from macrocosmos.resources.topics import default_topic_index
+from macrocosmos.resources.watcher import GravityWatcher
+from macrocosmos.types import DatasetWaitError
 
 
 # Allowed topic prefixes by platform for client-side validation convenience.
@@ -20,6 +46,10 @@ def _validate_topic_prefix_if_applicable(platform: str, topic: str) -> None:
     """
     Validate the topic prefix if applicable.
 
+    While the process-wide topic index is warm for the platform, it suggests topics for
+    invalid ones, and well-formed topics missing from it are handled according to its
+    `unknown_topics` policy.
+
     Args:
         platform: The platform of the topic.
         topic: The topic to validate.
@@ -27,10 +57,217 @@ def _validate_topic_prefix_if_applicable(platform: str, topic: str) -> None:
     allowed = _ALLOWED_TOPIC_PREFIXES.get(platform.lower())
     if not allowed:
         return
-    for prefix in allowed:
-        if topic.startswith(prefix):
+
+    index = default_topic_index()
+    warm = index.is_warm(platform)
+    if any(topic.startswith(prefix) for prefix in allowed):
+        if (
+            not warm
+            or index.unknown_topics == "allow"
+            or index.contains(platform, topic)
+        ):
+            return
+        message = f"unknown topic: {topic!r} is not in the {platform} topic index"
+        message += _topic_suggestions(index, platform, [topic])
+        if index.unknown_topics == "warn":
+            warnings.warn(message, stacklevel=4)
             return
-    raise ValueError(f"invalid topic: must start with one of: {', '.join(allowed)}")
+        raise ValueError(message)
+
+    message = f"invalid topic: must start with one of: {', '.join(allowed)}"
+    if warm:
+        message += _topic_suggestions(
+            index, platform, [prefix + topic for prefix in allowed]
+        )
+    raise ValueError(message)
+
+
+def _topic_suggestions(index, platform: str, candidates: List[str]) -> str:
+    """Get a "did you mean" hint from the topic index, or an empty string."""
+    # Exact matches first, then the largest topics starting with a candidate
+    suggestions = [
+        info.label
+        for candidate in candidates
+        for info in [index.get(platform, candidate)]
+        if info is not None
+    ]
+    for candidate in candidates:
+        for info in index.complete(platform, candidate, limit=3):
+            if info.label not in suggestions:
+                suggestions.append(info.label)
+    if not suggestions:
+        return ""
+    return f" (did you mean: {', '.join(suggestions[:3])}?)"
+
+
+# Request builders shared by the asynchronous and synchronous resources, so that both
+# validate and build requests identically.
+
+
+def _notification_requests_to_proto(
+    notification_requests: List[Union[gravity_p2p.NotificationRequest, Dict]],
+) -> List[gravity_pb2.NotificationRequest]:
+    """
+    Convert notification requests to protobuf messages.
+
+    Args:
+        notification_requests: The details of the notifications to be sent.
+
+    Returns:
+        The list of NotificationRequest messages.
+    """
+    proto_notification_requests = []
+    if notification_requests:
+        for notification in notification_requests:
+            if isinstance(notification, gravity_p2p.NotificationRequest):
+                proto_notification_requests.append(
+                    gravity_pb2.NotificationRequest(**notification.model_dump())
+                )
+            elif isinstance(notification, dict):
+                proto_notification_requests.append(
+                    gravity_pb2.NotificationRequest(**notification)
+                )
+            else:
+                raise TypeError(
+                    f"Invalid type for notification request: {type(notification)}"
+                )
+    return proto_notification_requests
+
+
+def _get_gravity_tasks_request(
+    gravity_task_id: str, include_crawlers: bool
+) -> gravity_pb2.GetGravityTasksRequest:
+    return gravity_pb2.GetGravityTasksRequest(
+        gravity_task_id=gravity_task_id,
+        include_crawlers=include_crawlers,
+    )
+
+
+def _get_crawler_request(crawler_id: str) -> gravity_pb2.GetCrawlerRequest:
+    if not crawler_id:
+        raise AttributeError("crawler_id is a required parameter")
+
+    return gravity_pb2.GetCrawlerRequest(crawler_id=crawler_id)
+
+
+def _create_gravity_task_request(
+    gravity_tasks: List[Union[gravity_p2p.GravityTask, Dict]],
+    name: str,
+    notification_requests: List[Union[gravity_p2p.NotificationRequest, Dict]],
+    gravity_task_id: str,
+) -> gravity_pb2.CreateGravityTaskRequest:
+    proto_gravity_tasks = []
+    if gravity_tasks:
+        for task in gravity_tasks:
+            if isinstance(task, gravity_p2p.GravityTask):
+                if task.topic:
+                    _validate_topic_prefix_if_applicable(task.platform, task.topic)
+                proto_gravity_tasks.append(gravity_pb2.GravityTask(**task.model_dump()))
+            elif isinstance(task, dict):
+                if task.get("topic"):
+                    _validate_topic_prefix_if_applicable(
+                        task.get("platform"), task.get("topic")
+                    )
+                proto_gravity_tasks.append(gravity_pb2.GravityTask(**task))
+            else:
+                raise TypeError(f"Invalid type for gravity task: {type(task)}")
+    else:
+        raise AttributeError("gravity_tasks is a required parameter")
+
+    return gravity_pb2.CreateGravityTaskRequest(
+        gravity_tasks=proto_gravity_tasks,
+        name=name,
+        notification_requests=_notification_requests_to_proto(notification_requests),
+        gravity_task_id=gravity_task_id,
+    )
+
+
+def _build_dataset_request(
+    crawler_id: str,
+    max_rows: int,
+    notification_requests: List[Union[gravity_p2p.NotificationRequest, Dict]],
+) -> gravity_pb2.BuildDatasetRequest:
+    if not crawler_id:
+        raise AttributeError("crawler_id is a required parameter")
+
+    return gravity_pb2.BuildDatasetRequest(
+        crawler_id=crawler_id,
+        max_rows=max_rows,
+        notification_requests=_notification_requests_to_proto(notification_requests),
+    )
+
+
+def _build_all_datasets_request(
+    gravity_task_id: str,
+    build_crawlers_config: List[Union[gravity_p2p.BuildDatasetRequest, Dict]],
+) -> gravity_pb2.BuildAllDatasetsRequest:
+    if not gravity_task_id:
+        raise AttributeError("gravity_task_id is a required parameter")
+    if not build_crawlers_config:
+        raise AttributeError("build_crawlers_config is a required parameter")
+
+    proto_build_crawlers_config = []
+    for config in build_crawlers_config:
+        if isinstance(config, gravity_p2p.BuildDatasetRequest):
+            proto_build_crawlers_config.append(
+                gravity_pb2.BuildDatasetRequest(**config.model_dump())
+            )
+        elif isinstance(config, dict):
+            proto_build_crawlers_config.append(
+                gravity_pb2.BuildDatasetRequest(**config)
+            )
+        else:
+            raise TypeError(
+                f"Invalid type for build_crawlers_config item: {type(config)}"
+            )
+
+    return gravity_pb2.BuildAllDatasetsRequest(
+        gravity_task_id=gravity_task_id,
+        build_crawlers_config=proto_build_crawlers_config,
+    )
+
+
+def _get_dataset_request(dataset_id: str) -> gravity_pb2.GetDatasetRequest:
+    if not dataset_id:
+        raise AttributeError("dataset_id is a required parameter")
+
+    return gravity_pb2.GetDatasetRequest(dataset_id=dataset_id)
+
+
+def _cancel_gravity_task_request(
+    gravity_task_id: str,
+) -> gravity_pb2.CancelGravityTaskRequest:
+    if not gravity_task_id:
+        raise AttributeError("gravity_task_id is a required parameter")
+
+    return gravity_pb2.CancelGravityTaskRequest(gravity_task_id=gravity_task_id)
+
+
+def _cancel_dataset_request(dataset_id: str) -> gravity_pb2.CancelDatasetRequest:
+    if not dataset_id:
+        raise AttributeError("dataset_id is a required parameter")
+
+    return gravity_pb2.CancelDatasetRequest(dataset_id=dataset_id)
+
+
+def _get_crawler_history_request(
+    gravity_task_id: str,
+) -> gravity_pb2.GetCrawlerHistoryRequest:
+    if not gravity_task_id:
+        raise AttributeError("gravity_task_id is a required parameter")
+
+    return gravity_pb2.GetCrawlerHistoryRequest(gravity_task_id=gravity_task_id)
+
+
+def _get_gravity_task_dataset_files_request(
+    gravity_task_id: str,
+) -> gravity_pb2.GetGravityTaskDatasetFilesRequest:
+    if not gravity_task_id:
+        raise AttributeError("gravity_task_id is a required parameter")
+
+    return gravity_pb2.GetGravityTaskDatasetFilesRequest(
+        gravity_task_id=gravity_task_id
+    )
 
 
 class AsyncGravity:
@@ -60,10 +297,7 @@ class AsyncGravity:
         Returns:
             A response containing the gravity tasks.
         """
-        request = gravity_pb2.GetGravityTasksRequest(
-            gravity_task_id=gravity_task_id,
-            include_crawlers=include_crawlers,
-        )
+        request = _get_gravity_tasks_request(gravity_task_id, include_crawlers)
 
         return await self._make_request("GetGravityTasks", request)
 
@@ -80,10 +314,7 @@ class AsyncGravity:
         Returns:
             A response containing the crawler details.
         """
-        if not crawler_id:
-            raise AttributeError("crawler_id is a required parameter")
-
-        request = gravity_pb2.GetCrawlerRequest(crawler_id=crawler_id)
+        request = _get_crawler_request(crawler_id)
 
         return await self._make_request("GetCrawler", request)
 
@@ -108,47 +339,8 @@ class AsyncGravity:
         Returns:
             A response containing the ID of the created gravity task.
         """
-        proto_gravity_tasks = []
-        if gravity_tasks:
-            for task in gravity_tasks:
-                if isinstance(task, gravity_p2p.GravityTask):
-                    if task.topic:
-                        _validate_topic_prefix_if_applicable(task.platform, task.topic)
-                    proto_gravity_tasks.append(
-                        gravity_pb2.GravityTask(**task.model_dump())
-                    )
-                elif isinstance(task, dict):
-                    if task.get("topic"):
-                        _validate_topic_prefix_if_applicable(
-                            task.get("platform"), task.get("topic")
-                        )
-                    proto_gravity_tasks.append(gravity_pb2.GravityTask(**task))
-                else:
-                    raise TypeError(f"Invalid type for gravity task: {type(task)}")
-        else:
-            raise AttributeError("gravity_tasks is a required parameter")
-
-        proto_notification_requests = []
-        if notification_requests:
-            for notification in notification_requests:
-                if isinstance(notification, gravity_p2p.NotificationRequest):
-                    proto_notification_requests.append(
-                        gravity_pb2.NotificationRequest(**notification.model_dump())
-                    )
-                elif isinstance(notification, dict):
-                    proto_notification_requests.append(
-                        gravity_pb2.NotificationRequest(**notification)
-                    )
-                else:
-                    raise TypeError(
-                        f"Invalid type for notification request: {type(notification)}"
-                    )
-
-        request = gravity_pb2.CreateGravityTaskRequest(
-            gravity_tasks=proto_gravity_tasks,
-            name=name,
-            notification_requests=proto_notification_requests,
-            gravity_task_id=gravity_task_id,
+        request = _create_gravity_task_request(
+            gravity_tasks, name, notification_requests, gravity_task_id
         )
 
         return await self._make_request("CreateGravityTask", request)
@@ -171,30 +363,7 @@ class AsyncGravity:
         Returns:
             A response containing the dataset that was built.
         """
-        if not crawler_id:
-            raise AttributeError("crawler_id is a required parameter")
-
-        proto_notification_requests = []
-        if notification_requests:
-            for notification in notification_requests:
-                if isinstance(notification, gravity_p2p.NotificationRequest):
-                    proto_notification_requests.append(
-                        gravity_pb2.NotificationRequest(**notification.model_dump())
-                    )
-                elif isinstance(notification, dict):
-                    proto_notification_requests.append(
-                        gravity_pb2.NotificationRequest(**notification)
-                    )
-                else:
-                    raise TypeError(
-                        f"Invalid type for notification request: {type(notification)}"
-                    )
-
-        request = gravity_pb2.BuildDatasetRequest(
-            crawler_id=crawler_id,
-            max_rows=max_rows,
-            notification_requests=proto_notification_requests,
-        )
+        request = _build_dataset_request(crawler_id, max_rows, notification_requests)
 
         return await self._make_request("BuildDataset", request)
 
@@ -212,30 +381,7 @@ class AsyncGravity:
         Returns:
             A BuildAllDatasetsResponse object containing the gravity task id and datasets.
         """
-        if not gravity_task_id:
-            raise AttributeError("gravity_task_id is a required parameter")
-        if not build_crawlers_config:
-            raise AttributeError("build_crawlers_config is a required parameter")
-
-        proto_build_crawlers_config = []
-        for config in build_crawlers_config:
-            if isinstance(config, gravity_p2p.BuildDatasetRequest):
-                proto_build_crawlers_config.append(
-                    gravity_pb2.BuildDatasetRequest(**config.model_dump())
-                )
-            elif isinstance(config, dict):
-                proto_build_crawlers_config.append(
-                    gravity_pb2.BuildDatasetRequest(**config)
-                )
-            else:
-                raise TypeError(
-                    f"Invalid type for build_crawlers_config item: {type(config)}"
-                )
-
-        request = gravity_pb2.BuildAllDatasetsRequest(
-            gravity_task_id=gravity_task_id,
-            build_crawlers_config=proto_build_crawlers_config,
-        )
+        request = _build_all_datasets_request(gravity_task_id, build_crawlers_config)
 
         return await self._make_request("BuildAllDatasets", request)
 
@@ -252,14 +398,105 @@ class AsyncGravity:
         Returns:
             A response containing the dataset status.
         """
-        if not dataset_id:
-            raise AttributeError("dataset_id is a required parameter")
+        request = _get_dataset_request(dataset_id)
+
+        return await self._make_request("GetDataset", request)
+
+    async def GetGravityTaskDatasetFiles(
+        self,
+        gravity_task_id: str,
+    ) -> gravity_pb2.GetGravityTaskDatasetFilesResponse:
+        """
+        Get the dataset files of every crawler of a gravity task in one call.
+
+        Args:
+            gravity_task_id: The ID of the gravity task.
+
+        Returns:
+            A response containing the dataset files by crawler.
+        """
+        request = _get_gravity_task_dataset_files_request(gravity_task_id)
+
+        return await self._make_request("GetGravityTaskDatasetFiles", request)
+
+    async def GetGravityMarketplaceTaskDatasetFiles(
+        self,
+        gravity_task_id: str,
+    ) -> gravity_pb2.GetGravityTaskDatasetFilesResponse:
+        """
+        Get the dataset files of every crawler of a marketplace gravity task in one call.
+
+        Args:
+            gravity_task_id: The ID of the marketplace gravity task.
 
-        request = gravity_pb2.GetDatasetRequest(
-            dataset_id=dataset_id,
+        Returns:
+            A response containing the dataset files by crawler.
+        """
+        request = _get_gravity_task_dataset_files_request(gravity_task_id)
+
+        return await self._make_request(
+            "GetGravityMarketplaceTaskDatasetFiles", request
         )
 
-        return await self._make_request("GetDataset", request)
+    async def list_task_dataset_files(
+        self,
+        gravity_task_id: str,
+        marketplace: bool = False,
+    ) -> List[DatasetFileRecord]:
+        """
+        List the dataset files of a gravity task as flat records, with one round trip.
+
+        The records can be passed straight to `download_dataset_files()`.
+
+        Args:
+            gravity_task_id: The ID of the gravity task.
+            marketplace: Whether the task is a marketplace task. (default: False)
+
+        Returns:
+            A DatasetFileRecord per file, crawler by crawler.
+        """
+        if marketplace:
+            response = await self.GetGravityMarketplaceTaskDatasetFiles(gravity_task_id)
+        else:
+            response = await self.GetGravityTaskDatasetFiles(gravity_task_id)
+        return list(iter_dataset_files(response))
+
+    async def GetCrawlerHistory(
+        self,
+        gravity_task_id: str,
+    ) -> gravity_pb2.GetCrawlerHistoryResponse:
+        """
+        Get the collection history of every crawler of a gravity task.
+
+        Args:
+            gravity_task_id: The ID of the gravity task.
+
+        Returns:
+            A response containing the criteria and history entries of each crawler.
+        """
+        request = _get_crawler_history_request(gravity_task_id)
+
+        return await self._make_request("GetCrawlerHistory", request)
+
+    async def get_crawler_history(
+        self,
+        gravity_task_id: str,
+        cumulative: bool = True,
+    ) -> CrawlerHistory:
+        """
+        Get the collection history of every crawler of a gravity task as NumPy arrays, for
+        vectorized rates, moving averages and time-to-target estimates.
+
+        Args:
+            gravity_task_id: The ID of the gravity task.
+            cumulative: Whether each entry holds the totals collected so far, rather than the
+                amounts collected since the previous entry. (default: True)
+
+        Returns:
+            The history of every crawler of the task.
+        """
+        response = await self.GetCrawlerHistory(gravity_task_id)
+        return CrawlerHistory.from_response(response, cumulative=cumulative)
 
     async def CancelGravityTask(
         self,
@@ -274,12 +511,7 @@ class AsyncGravity:
         Returns:
             A response containing the cancellation status.
         """
-        if not gravity_task_id:
-            raise AttributeError("gravity_task_id is a required parameter")
-
-        request = gravity_pb2.CancelGravityTaskRequest(
-            gravity_task_id=gravity_task_id,
-        )
+        request = _cancel_gravity_task_request(gravity_task_id)
 
         return await self._make_request("CancelGravityTask", request)
 
@@ -296,14 +528,171 @@ class AsyncGravity:
         Returns:
             A response containing the cancellation status.
         """
-        if not dataset_id:
-            raise AttributeError("dataset_id is a required parameter")
+        request = _cancel_dataset_request(dataset_id)
 
-        request = gravity_pb2.CancelDatasetRequest(
-            dataset_id=dataset_id,
+        return await self._make_request("CancelDataset", request)
+
+    def watch(
+        self,
+        task_ids: Optional[Iterable[str]] = None,
+        interval: float = 10.0,
+        adaptive: bool = True,
+        min_interval: float = 2.0,
+        max_interval: float = 60.0,
+        stop_when_done: bool = True,
+    ) -> GravityWatcher:
+        """
+        Watch gravity tasks and their crawlers for changes, with one `GetGravityTasks` call per
+        poll instead of a `GetCrawler` call per crawler.
+
+        Args:
+            task_ids: The IDs of the gravity tasks to watch. (default: None, every task of the user)
+            interval: The initial seconds between polls. (default: 10)
+            adaptive: Whether to poll more often while things change and less often while they
+                don't. (default: True)
+            min_interval: The shortest interval when adaptive. (default: 2)
+            max_interval: The longest interval when adaptive, or when backing off after
+                transient errors. (default: 60)
+            stop_when_done: Whether to stop once every watched task has completed, failed or
+                been cancelled. (default: True)
+
+        Returns:
+            A watcher, to iterate over for change events or to `run()` with callbacks.
+        """
+        return GravityWatcher(
+            self,
+            task_ids=task_ids,
+            interval=interval,
+            adaptive=adaptive,
+            min_interval=min_interval,
+            max_interval=max_interval,
+            stop_when_done=stop_when_done,
         )
 
-        return await self._make_request("CancelDataset", request)
+    async def wait_for_datasets(
+        self,
+        dataset_ids: Iterable[str],
+        interval: float = 5.0,
+        min_interval: float = 1.0,
+        max_interval: float = 60.0,
+        timeout: Optional[float] = None,
+        max_concurrency: int = 16,
+        return_exceptions: bool = False,
+    ) -> Dict[str, Union[gravity_pb2.Dataset, DatasetWaitError]]:
+        """
+        Wait for dataset builds (from `BuildDataset` or `BuildAllDatasets`) to finish.
+
+        The datasets are polled concurrently, each on its own schedule: the progress rate of its
+        build steps gives an estimated completion time, and it is polled about halfway there, so
+        polls are rare early on and frequent near the end. Finished datasets are not polled again.
+        A dataset whose poll fails with a retryable error (per the client's retry policy, e.g.
+        UNAVAILABLE) keeps being polled with backoff; other errors fail only that dataset.
+
+        Args:
+            dataset_ids: The IDs of the datasets.
+            interval: The seconds between polls until a dataset's progress rate is known.
+                (default: 5)
+            min_interval: The shortest time between polls of a dataset. (default: 1)
+            max_interval: The longest time between polls of a dataset. (default: 60)
+            timeout: Seconds after which to give up with `asyncio.TimeoutError`, chained to the
+                last error of any dataset whose polls were still failing. (default: None)
+            max_concurrency: The maximum number of `GetDataset` calls in flight. (default: 16)
+            return_exceptions: Return a `DatasetWaitError` in place of a dataset that could not
+                be waited for, and keep waiting for the others, rather than raising it.
+                (default: False)
+
+        Returns:
+            The datasets by ID, in the order given, with a status of "Completed", "Failed" or
+            "Cancelled".
+
+        Raises:
+            DatasetWaitError: If polling a dataset fails with a non-retryable error, and
+                `return_exceptions` is False.
+        """
+        return await wait_for_datasets(
+            self,
+            dataset_ids,
+            interval=interval,
+            min_interval=min_interval,
+            max_interval=max_interval,
+            timeout=timeout,
+            max_concurrency=max_concurrency,
+            return_exceptions=return_exceptions,
+        )
+
+    def iter_completed_datasets(
+        self,
+        dataset_ids: Iterable[str],
+        interval: float = 5.0,
+        min_interval: float = 1.0,
+        max_interval: float = 60.0,
+        timeout: Optional[float] = None,
+        max_concurrency: int = 16,
+        return_exceptions: bool = False,
+    ) -> AsyncIterator[Tuple[str, Union[gravity_pb2.Dataset, DatasetWaitError]]]:
+        """
+        Wait for dataset builds like `wait_for_datasets`, but yield each dataset as soon as it
+        finishes.
+
+        Args:
+            dataset_ids: The IDs of the datasets.
+            interval: The seconds between polls until a dataset's progress rate is known.
+                (default: 5)
+            min_interval: The shortest time between polls of a dataset. (default: 1)
+            max_interval: The longest time between polls of a dataset. (default: 60)
+            timeout: Seconds after which to give up with `asyncio.TimeoutError`. (default: None)
+            max_concurrency: The maximum number of `GetDataset` calls in flight. (default: 16)
+            return_exceptions: Yield a `DatasetWaitError` in place of a dataset that could not
+                be waited for, rather than raising it. (default: False)
+
+        Yields:
+            The ID and the dataset, in the order they finish.
+        """
+        return iter_completed_datasets(
+            self,
+            dataset_ids,
+            interval=interval,
+            min_interval=min_interval,
+            max_interval=max_interval,
+            timeout=timeout,
+            max_concurrency=max_concurrency,
+            return_exceptions=return_exceptions,
+        )
+
+    async def download_dataset_files(
+        self,
+        files: Iterable[Any],
+        directory: str,
+        max_connections: int = 8,
+        part_size: int = DEFAULT_PART_SIZE,
+        progress: Optional[Callable[[DownloadProgress], Any]] = None,
+        cache: Optional[DatasetFileCache] = None,
+    ) -> List[str]:
+        """
+        Download dataset files, e.g. the `files` of a completed `Dataset`, concurrently.
+
+        Files larger than `part_size` are split into byte ranges that are fetched in parallel.
+        Interrupted downloads resume from their ".part" files, each file's size is checked
+        against its `file_size_bytes`, and files already downloaded are skipped.
+
+        Args:
+            files: `DatasetFile` or `DatasetFileWithId` messages (or dicts with the same
+                fields), or `Dataset` messages or `GetDatasetResponse`s whose files to download.
+            directory: The output directory. Files with a `dataset_id` are saved in a
+                subdirectory named after it.
+            max_connections: The maximum number of requests in flight. (default: 8)
+            part_size: The size in bytes of the ranges of large files. (default: 16 MiB)
+            progress: Called with a `DownloadProgress` as data arrives, from worker threads.
+                (default: None)
+            cache: A `DatasetFileCache` to take unchanged files from instead of downloading
+                them, and to add downloaded files to. (default: None)
+
+        Returns:
+            The paths of the downloaded files, in the order given.
+        """
+        return await download_dataset_files_async(
+            files, directory, max_connections, part_size, progress, cache
+        )
 
     async def _make_request(self, method_name, request):
         """
@@ -316,40 +705,9 @@ class AsyncGravity:
         Returns:
             The response from the service.
         """
-        metadata = [
-            ("x-source", self._client.app_name),
-            ("x-client-id", __package_name__),
-            ("x-client-version", __version__),
-            ("authorization", f"Bearer {self._client.api_key}"),
-        ]
-
-        compression = grpc.Compression.Gzip if self._client.compress else None
-
-        retries = 0
-        last_error = None
-        while retries <= self._client.max_retries:
-            channel = None
-            try:
-                channel = self._client.get_async_channel()
-                stub = gravity_pb2_grpc.GravityServiceStub(channel)
-                method = getattr(stub, method_name)
-                response = await method(
-                    request,
-                    metadata=metadata,
-                    timeout=self._client.timeout,
-                    compression=compression,
-                )
-                return response
-            except grpc.RpcError as e:
-                last_error = MacrocosmosError(f"RPC error: {e.code()}: {e.details()}")
-                retries += 1
-            except Exception as e:
-                raise MacrocosmosError(f"Error calling {method_name}: {e}")
-            finally:
-                if channel:
-                    await channel.close()
-
-        raise last_error
+        return await make_async_request(
+            self._client, gravity_pb2_grpc.GravityServiceStub, method_name, request
+        )
 
 
 class SyncGravity:
@@ -363,7 +721,6 @@ class SyncGravity:
             client: The client to use for the resource.
         """
         self._client = client
-        self._async_gravity = AsyncGravity(client)
 
     def GetGravityTasks(
         self,
@@ -380,12 +737,26 @@ class SyncGravity:
         Returns:
             A response containing the gravity tasks.
         """
-        return run_sync_threadsafe(
-            self._async_gravity.GetGravityTasks(
-                gravity_task_id=gravity_task_id,
-                include_crawlers=include_crawlers,
-            )
-        )
+        request = _get_gravity_tasks_request(gravity_task_id, include_crawlers)
+
+        return self._make_request("GetGravityTasks", request)
+
+    def GetCrawler(
+        self,
+        crawler_id: str,
+    ) -> gravity_pb2.GetCrawlerResponse:
+        """
+        Get a single crawler by its ID synchronously.
+
+        Args:
+            crawler_id: The ID of the crawler to get.
+
+        Returns:
+            A response containing the crawler details.
+        """
+        request = _get_crawler_request(crawler_id)
+
+        return self._make_request("GetCrawler", request)
 
     def CreateGravityTask(
         self,
@@ -408,15 +779,12 @@ class SyncGravity:
         Returns:
             A response containing the ID of the created gravity task.
         """
-        return run_sync_threadsafe(
-            self._async_gravity.CreateGravityTask(
-                gravity_tasks=gravity_tasks,
-                name=name,
-                notification_requests=notification_requests,
-                gravity_task_id=gravity_task_id,
-            )
+        request = _create_gravity_task_request(
+            gravity_tasks, name, notification_requests, gravity_task_id
         )
 
+        return self._make_request("CreateGravityTask", request)
+
     def BuildDataset(
         self,
         crawler_id: str,
@@ -436,13 +804,9 @@ class SyncGravity:
         Returns:
             A response containing the dataset that was built.
         """
-        return run_sync_threadsafe(
-            self._async_gravity.BuildDataset(
-                crawler_id=crawler_id,
-                max_rows=max_rows,
-                notification_requests=notification_requests,
-            )
-        )
+        request = _build_dataset_request(crawler_id, max_rows, notification_requests)
+
+        return self._make_request("BuildDataset", request)
 
     def BuildAllDatasets(
         self,
@@ -459,12 +823,9 @@ class SyncGravity:
         Returns:
             A BuildAllDatasetsResponse object containing the gravity task id and datasets.
         """
-        return run_sync_threadsafe(
-            self._async_gravity.BuildAllDatasets(
-                gravity_task_id=gravity_task_id,
-                build_crawlers_config=build_crawlers_config,
-            )
-        )
+        request = _build_all_datasets_request(gravity_task_id, build_crawlers_config)
+
+        return self._make_request("BuildAllDatasets", request)
 
     def GetDataset(
         self,
@@ -479,11 +840,103 @@ class SyncGravity:
         Returns:
             A response containing the dataset status.
         """
-        return run_sync_threadsafe(
-            self._async_gravity.GetDataset(
-                dataset_id=dataset_id,
-            )
-        )
+        request = _get_dataset_request(dataset_id)
+
+        return self._make_request("GetDataset", request)
+
+    def GetGravityTaskDatasetFiles(
+        self,
+        gravity_task_id: str,
+    ) -> gravity_pb2.GetGravityTaskDatasetFilesResponse:
+        """
+        Get the dataset files of every crawler of a gravity task in one call synchronously.
+
+        Args:
+            gravity_task_id: The ID of the gravity task.
+
+        Returns:
+            A response containing the dataset files by crawler.
+        """
+        request = _get_gravity_task_dataset_files_request(gravity_task_id)
+
+        return self._make_request("GetGravityTaskDatasetFiles", request)
+
+    def GetGravityMarketplaceTaskDatasetFiles(
+        self,
+        gravity_task_id: str,
+    ) -> gravity_pb2.GetGravityTaskDatasetFilesResponse:
+        """
+        Get the dataset files of every crawler of a marketplace gravity task in one call synchronously.
+
+        Args:
+            gravity_task_id: The ID of the marketplace gravity task.
+
+        Returns:
+            A response containing the dataset files by crawler.
+        """
+        request = _get_gravity_task_dataset_files_request(gravity_task_id)
+
+        return self._make_request("GetGravityMarketplaceTaskDatasetFiles", request)
+
+    def list_task_dataset_files(
+        self,
+        gravity_task_id: str,
+        marketplace: bool = False,
+    ) -> List[DatasetFileRecord]:
+        """
+        List the dataset files of a gravity task as flat records, with one round trip.
+
+        The records can be passed straight to `download_dataset_files()`.
+
+        Args:
+            gravity_task_id: The ID of the gravity task.
+            marketplace: Whether the task is a marketplace task. (default: False)
+
+        Returns:
+            A DatasetFileRecord per file, crawler by crawler.
+        """
+        if marketplace:
+            response = self.GetGravityMarketplaceTaskDatasetFiles(gravity_task_id)
+        else:
+            response = self.GetGravityTaskDatasetFiles(gravity_task_id)
+        return list(iter_dataset_files(response))
+
+    def GetCrawlerHistory(
+        self,
+        gravity_task_id: str,
+    ) -> gravity_pb2.GetCrawlerHistoryResponse:
+        """
+        Get the collection history of every crawler of a gravity task synchronously.
+
+        Args:
+            gravity_task_id: The ID of the gravity task.
+
+        Returns:
+            A response containing the criteria and history entries of each crawler.
+        """
+        request = _get_crawler_history_request(gravity_task_id)
+
+        return self._make_request("GetCrawlerHistory", request)
+
+    def get_crawler_history(
+        self,
+        gravity_task_id: str,
+        cumulative: bool = True,
+    ) -> CrawlerHistory:
+        """
+        Get the collection history of every crawler of a gravity task as NumPy arrays, for
+        vectorized rates, moving averages and time-to-target estimates.
+
+        Args:
+            gravity_task_id: The ID of the gravity task.
+            cumulative: Whether each entry holds the totals collected so far, rather than the
+                amounts collected since the previous entry. (default: True)
+
+        Returns:
+            The history of every crawler of the task.
+        """
+        response = self.GetCrawlerHistory(gravity_task_id)
+        return CrawlerHistory.from_response(response, cumulative=cumulative)
 
     def CancelGravityTask(
         self,
@@ -498,11 +951,9 @@ class SyncGravity:
         Returns:
             A response containing the cancellation status.
         """
-        return run_sync_threadsafe(
-            self._async_gravity.CancelGravityTask(
-                gravity_task_id=gravity_task_id,
-            )
-        )
+        request = _cancel_gravity_task_request(gravity_task_id)
+
+        return self._make_request("CancelGravityTask", request)
 
     def CancelDataset(
         self,
@@ -511,8 +962,56 @@ class SyncGravity:
         """
         Cancel a dataset build synchronously.
         """
-        return run_sync_threadsafe(
-            self._async_gravity.CancelDataset(
-                dataset_id=dataset_id,
-            )
+        request = _cancel_dataset_request(dataset_id)
+
+        return self._make_request("CancelDataset", request)
+
+    def download_dataset_files(
+        self,
+        files: Iterable[Any],
+        directory: str,
+        max_connections: int = 8,
+        part_size: int = DEFAULT_PART_SIZE,
+        progress: Optional[Callable[[DownloadProgress], Any]] = None,
+        cache: Optional[DatasetFileCache] = None,
+    ) -> List[str]:
+        """
+        Download dataset files, e.g. the `files` of a completed `Dataset`, concurrently.
+
+        Files larger than `part_size` are split into byte ranges that are fetched in parallel.
+        Interrupted downloads resume from their ".part" files, each file's size is checked
+        against its `file_size_bytes`, and files already downloaded are skipped.
+
+        Args:
+            files: `DatasetFile` or `DatasetFileWithId` messages (or dicts with the same
+                fields), or `Dataset` messages or `GetDatasetResponse`s whose files to download.
+            directory: The output directory. Files with a `dataset_id` are saved in a
+                subdirectory named after it.
+            max_connections: The maximum number of requests in flight. (default: 8)
+            part_size: The size in bytes of the ranges of large files. (default: 16 MiB)
+            progress: Called with a `DownloadProgress` as data arrives, from worker threads.
+                (default: None)
+            cache: A `DatasetFileCache` to take unchanged files from instead of downloading
+                them, and to add downloaded files to. (default: None)
+
+        Returns:
+            The paths of the downloaded files, in the order given.
+        """
+        return download_dataset_files(
+            files, directory, max_connections, part_size, progress, cache
+        )
+
+    def _make_request(self, method_name, request):
+        """
+        Make a synchronous request to the Gravity service.
+
+        Args:
+            method_name: The name of the method to call.
+            request: The request message.
+
+        Returns:
+            The response from the service.
+        """
+        return make_sync_request(
+            self._client, gravity_pb2_grpc.GravityServiceStub, method_name, request
         )
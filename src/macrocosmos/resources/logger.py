@@ -28,7 +28,6 @@ from macrocosmos.resources.logging.upload_worker import UploadWorker
 from macrocosmos.resources.logging.file_monitor import FileMonitor
 from macrocosmos.resources.logging.console_handler import ConsoleCapture
 from macrocosmos.resources.logging.request import make_async_request
-from macrocosmos.resources._utils import run_sync_threadsafe
 
 logger = logging.getLogger(__name__)
 
@@ -514,7 +513,7 @@ class Logger:
         Returns:
             The run ID.
         """
-        return run_sync_threadsafe(
+        return self._client.run_sync(
             self._async_logger.init(
                 project=project,
                 entity=entity,
@@ -534,13 +533,13 @@ class Logger:
         Args:
             data: The data to log.
         """
-        run_sync_threadsafe(self._async_logger.log(data=data))
+        self._client.run_sync(self._async_logger.log(data=data))
 
     def finish(self) -> None:
         """
         Finish the logging run and cleanup resources synchronously.
         """
-        run_sync_threadsafe(self._async_logger.finish())
+        self._client.run_sync(self._async_logger.finish())
 
     @property
     def run(self) -> Optional[Run]:
@@ -0,0 +1 @@
+"""Helpers for working with SN13 on-demand data results."""
@@ -0,0 +1,370 @@
+import json
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from google.protobuf import struct_pb2
+
+from macrocosmos.resources.ondemand.lazy import value_to_python
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Columns that lead the schema of each source, when present in the rows. Any other fields
+# follow in alphabetical order, as Struct fields have no defined order. Nested objects are
+# flattened into dotted column names, e.g. "user.username".
+SOURCE_LEADING_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "x": ("uri", "datetime", "source", "label", "content"),
+    "reddit": ("id", "url", "datetime", "source", "label", "title", "body"),
+    "youtube": ("video_id", "url", "datetime", "source", "title"),
+}
+
+COLUMN_SEPARATOR = "."
+
+# Column types of an inferred schema.
+NULL = "null"
+STRING = "string"
+INT64 = "int64"
+FLOAT64 = "float64"
+BOOL = "bool"
+STRING_LIST = "list<string>"
+
+# Integral numbers above this are not exactly representable as the doubles of a Struct.
+_MAX_SAFE_INTEGER = 2**53
+
+
+class ColumnarSchema:
+    """The column names and types inferred from a set of on-demand data rows."""
+
+    def __init__(self, source: Optional[str], columns: List[Tuple[str, str]]):
+        """
+        Initialize the schema.
+
+        Args:
+            source: The normalized data source of the rows ("x", "reddit", "youtube"), if known.
+            columns: The (name, type) pairs of the columns, in order.
+        """
+        self.source = source
+        self.columns = columns
+
+    @property
+    def names(self) -> List[str]:
+        """Get the column names."""
+        return [name for name, _ in self.columns]
+
+    def __repr__(self) -> str:
+        return f"ColumnarSchema(source={self.source!r}, columns={self.columns!r})"
+
+
+class _Column:
+    """The values of one column and the number of values of each `Value` kind in it."""
+
+    __slots__ = ("values", "kinds", "row_kind", "row_literal")
+
+    def __init__(self, rows_before: int):
+        self.values: List[Any] = [None] * rows_before
+        self.kinds: Dict[str, int] = {}
+        # The kind of the value of the current row, and whether it came from a literal
+        # dotted key rather than a nested object
+        self.row_kind = NULL
+        self.row_literal = False
+
+
+class _ColumnBuilder:
+    """
+    Collects the values of flattened rows into per-column lists in a single pass, reading
+    `Struct` rows directly so that no intermediate dict is built per row.
+    """
+
+    def __init__(self):
+        self.columns: Dict[str, _Column] = {}
+        self.rows = 0
+        self.first_source: Optional[str] = None
+
+    def add_struct(self, struct: struct_pb2.Struct) -> None:
+        self._add_struct_fields(struct, "")
+        self._end_row()
+
+    def add_dict(self, row: Mapping[str, Any]) -> None:
+        self._add_dict_fields(row, "")
+        self._end_row()
+
+    def _add_struct_fields(self, struct: struct_pb2.Struct, prefix: str) -> None:
+        for key, value in struct.fields.items():
+            kind = value.WhichOneof("kind")
+            if kind == "struct_value":
+                self._add_struct_fields(
+                    value.struct_value, prefix + key + COLUMN_SEPARATOR
+                )
+            elif kind == "string_value":
+                self._set(prefix, key, STRING, value.string_value)
+            elif kind == "number_value":
+                self._set(prefix, key, FLOAT64, value.number_value)
+            elif kind == "bool_value":
+                self._set(prefix, key, BOOL, value.bool_value)
+            elif kind == "list_value":
+                self._set(prefix, key, STRING_LIST, value_to_python(value))
+            else:
+                self._set(prefix, key, NULL, None)
+
+    def _add_dict_fields(self, row: Mapping[str, Any], prefix: str) -> None:
+        for key, value in row.items():
+            if isinstance(value, Mapping):
+                self._add_dict_fields(value, prefix + key + COLUMN_SEPARATOR)
+            elif isinstance(value, str):
+                self._set(prefix, key, STRING, value)
+            elif isinstance(value, bool):
+                self._set(prefix, key, BOOL, value)
+            elif isinstance(value, (int, float)):
+                self._set(prefix, key, FLOAT64, value)
+            elif isinstance(value, (list, tuple)):
+                self._set(prefix, key, STRING_LIST, list(value))
+            elif value is None:
+                self._set(prefix, key, NULL, None)
+            else:
+                self._set(prefix, key, STRING, str(value))
+
+    def _set(self, prefix: str, key: str, kind: str, value: Any) -> None:
+        name = prefix + key
+        literal = COLUMN_SEPARATOR in key
+        column = self.columns.get(name)
+        if column is None:
+            column = self.columns[name] = _Column(self.rows)
+        if len(column.values) > self.rows:
+            # A nested object and a literal dotted key, e.g. {"user": {"name": ...}} and
+            # {"user.name": ...}, flatten to the same column: keep the nested value
+            if literal or not column.row_literal:
+                return
+            column.kinds[column.row_kind] -= 1
+            if not column.kinds[column.row_kind]:
+                del column.kinds[column.row_kind]
+            column.values[-1] = value
+        else:
+            column.values.append(value)
+        column.kinds[kind] = column.kinds.get(kind, 0) + 1
+        column.row_kind, column.row_literal = kind, literal
+        if name == "source" and self.first_source is None and kind == STRING:
+            self.first_source = value
+
+    def _end_row(self) -> None:
+        self.rows += 1
+        for column in self.columns.values():
+            if len(column.values) < self.rows:
+                column.values.append(None)
+
+    def schema(self, source: Optional[str]) -> ColumnarSchema:
+        source = _normalize_source(source or self.first_source)
+        leading = [
+            name
+            for name in SOURCE_LEADING_COLUMNS.get(source, ())
+            if name in self.columns
+        ]
+        names = leading + sorted(name for name in self.columns if name not in leading)
+        return ColumnarSchema(
+            source, [(name, _column_type(self.columns[name])) for name in names]
+        )
+
+
+def _normalize_source(source: Optional[str]) -> Optional[str]:
+    if not source:
+        return None
+    source = source.lower()
+    return "x" if source == "twitter" else source
+
+
+def _column_type(column: _Column) -> str:
+    kinds = column.kinds.keys() - {NULL}
+    if not kinds:
+        return NULL
+    if len(kinds) > 1:
+        return STRING
+
+    kind = next(iter(kinds))
+    if kind == FLOAT64:
+        integral = all(
+            value is None
+            or (float(value).is_integer() and abs(value) < _MAX_SAFE_INTEGER)
+            for value in column.values
+        )
+        return INT64 if integral else FLOAT64
+    if kind == STRING_LIST:
+        is_strings = all(
+            value is None or all(isinstance(item, str) for item in value)
+            for value in column.values
+        )
+        return STRING_LIST if is_strings else STRING
+    return kind
+
+
+def _column_values(column: _Column, column_type: str) -> List[Any]:
+    """Get the values of a column coerced to its inferred type."""
+    values = column.values
+    if column_type == INT64:
+        return [None if value is None else int(value) for value in values]
+    if column_type == STRING and column.kinds.keys() - {STRING, NULL}:
+        # Mixed kinds are exported as strings, with non-string values JSON encoded
+        return [
+            value if value is None or isinstance(value, str) else json.dumps(value)
+            for value in values
+        ]
+    return values
+
+
+def _rows(data) -> Iterable:
+    """Get the rows of an OnDemandData result, as `Struct` messages where available."""
+    raw = getattr(data, "raw", None)
+    if raw is not None:
+        # LazyOnDemandDataResponse or LazyRows
+        data = raw
+    if isinstance(data, Mapping):
+        return data.get("data", [])
+    if hasattr(data, "DESCRIPTOR") and hasattr(data, "data"):
+        # OnDemandDataResponse
+        return data.data
+    return data
+
+
+def _build(data, source: Optional[str]) -> Tuple[ColumnarSchema, _ColumnBuilder]:
+    builder = _ColumnBuilder()
+    for row in _rows(data):
+        if isinstance(row, struct_pb2.Struct):
+            builder.add_struct(row)
+        else:
+            builder.add_dict(row)
+    return builder.schema(source), builder
+
+
+def infer_schema(data, source: Optional[str] = None) -> ColumnarSchema:
+    """
+    Infer the columnar schema of on-demand data rows.
+
+    Args:
+        data: An OnDemandData result: the response dict, a LazyOnDemandDataResponse, an
+            `OnDemandDataResponse` message, or a list of rows (`Struct` messages or dicts).
+        source: The data source of the rows ("X", "Reddit" or "YouTube"). Taken from the
+            `source` field of the rows if not given. (default: None)
+
+    Returns:
+        The inferred schema.
+    """
+    schema, _ = _build(data, source)
+    return schema
+
+
+def to_arrow(data, source: Optional[str] = None) -> "pa.Table":
+    """
+    Convert on-demand data rows to a PyArrow table, one column per (flattened) field.
+
+    `Struct` rows are read directly, without converting them to dicts first, so pass the
+    response of `OnDemandData(..., lazy=True)` for the lowest memory use.
+
+    Args:
+        data: An OnDemandData result: the response dict, a LazyOnDemandDataResponse, an
+            `OnDemandDataResponse` message, or a list of rows (`Struct` messages or dicts).
+        source: The data source of the rows ("X", "Reddit" or "YouTube"). Taken from the
+            `source` field of the rows if not given. (default: None)
+
+    Returns:
+        A `pyarrow.Table` with the inferred schema.
+    """
+    _require_pyarrow()
+    schema, builder = _build(data, source)
+    return _arrow_table(schema, builder)
+
+
+def to_parquet(
+    data, path: str, source: Optional[str] = None, compression: str = "zstd"
+) -> ColumnarSchema:
+    """
+    Write on-demand data rows to a Parquet file.
+
+    Args:
+        data: An OnDemandData result, as for `to_arrow`.
+        path: The path of the file to write.
+        source: The data source of the rows, as for `to_arrow`. (default: None)
+        compression: The Parquet compression codec. (default: "zstd")
+
+    Returns:
+        The schema of the written file.
+    """
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    schema, builder = _build(data, source)
+    pq.write_table(_arrow_table(schema, builder), path, compression=compression)
+    return schema
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError(
+            "pyarrow is required for Arrow and Parquet export: "
+            "pip install 'macrocosmos[arrow]'"
+        )
+
+
+def _arrow_table(schema: ColumnarSchema, builder: _ColumnBuilder) -> "pa.Table":
+    arrow_types = {
+        NULL: pa.null(),
+        STRING: pa.string(),
+        INT64: pa.int64(),
+        FLOAT64: pa.float64(),
+        BOOL: pa.bool_(),
+        STRING_LIST: pa.list_(pa.string()),
+    }
+    arrays = [
+        pa.array(
+            _column_values(builder.columns[name], column_type),
+            type=arrow_types[column_type],
+        )
+        for name, column_type in schema.columns
+    ]
+    metadata = {"source": schema.source} if schema.source else None
+    return pa.Table.from_arrays(arrays, names=schema.names, metadata=metadata)
+
+
+def to_numpy(data, source: Optional[str] = None) -> Dict[str, "np.ndarray"]:
+    """
+    Convert on-demand data rows to a dict of NumPy arrays, one per (flattened) field, for use
+    when PyArrow is not installed.
+
+    Numeric columns are `int64`, or `float64` with NaN for missing values; boolean columns are
+    `bool` unless values are missing; all other columns are object arrays.
+
+    Args:
+        data: An OnDemandData result, as for `to_arrow`.
+        source: The data source of the rows, as for `to_arrow`. (default: None)
+
+    Returns:
+        The column arrays, in schema order.
+    """
+    if np is None:
+        raise ImportError(
+            "numpy is required for NumPy export: pip install 'macrocosmos[numpy]'"
+        )
+
+    schema, builder = _build(data, source)
+    arrays = {}
+    for name, column_type in schema.columns:
+        values = _column_values(builder.columns[name], column_type)
+        has_missing = any(value is None for value in values)
+        if column_type == INT64 and not has_missing:
+            arrays[name] = np.array(values, dtype=np.int64)
+        elif column_type in (INT64, FLOAT64):
+            arrays[name] = np.array(
+                [np.nan if value is None else value for value in values],
+                dtype=np.float64,
+            )
+        elif column_type == BOOL and not has_missing:
+            arrays[name] = np.array(values, dtype=bool)
+        else:
+            array = np.empty(len(values), dtype=object)
+            for index, value in enumerate(values):
+                array[index] = value
+            arrays[name] = array
+    return arrays
@@ -0,0 +1,334 @@
+import hashlib
+import math
+import os
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, List, Optional
+
+from macrocosmos.resources.ondemand.rows import row_key
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Format version of saved de-duplicator state.
+STATE_VERSION = 1
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError(
+            "numpy is required for de-duplication: pip install 'macrocosmos[numpy]'"
+        )
+
+
+def key_hash(key: str) -> int:
+    """Get the 64-bit hash of a post key, as used by the de-duplicators."""
+    return int.from_bytes(
+        hashlib.blake2b(key.encode(), digest_size=8).digest(), "little"
+    )
+
+
+def _rows(data) -> List[Dict[str, Any]]:
+    """Get the rows of an OnDemandData result, or the rows passed in."""
+    if isinstance(data, Mapping):
+        return list(data.get("data", []))
+    return list(data)
+
+
+class Deduplicator:
+    """
+    Drops SN13 posts that were already seen, keyed on the post URI/ID (see `row_key`), across
+    any number of queries. Subclasses decide how the seen keys are stored.
+    """
+
+    mode = ""
+
+    def __init__(self):
+        _require_numpy()
+        self._seen = 0
+        self._dropped = 0
+
+    def filter(self, data) -> List[Dict[str, Any]]:
+        """
+        Get the posts that were not seen before, in order, and mark them as seen. A post that
+        occurs twice in `data` is kept once.
+
+        Args:
+            data: The posts, or an OnDemandData response (dict or lazy) to take them from.
+
+        Returns:
+            The new posts.
+        """
+        rows = _rows(data)
+        if not rows:
+            return []
+        hashes = np.fromiter(
+            (key_hash(row_key(row)) for row in rows), dtype=np.uint64, count=len(rows)
+        )
+
+        # Keep the first occurrence of each key within the batch
+        first = np.zeros(len(rows), dtype=bool)
+        first[np.unique(hashes, return_index=True)[1]] = True
+        new = first & ~self._contains(hashes)
+        self._add(hashes[new])
+
+        kept = int(new.sum())
+        self._seen += kept
+        self._dropped += len(rows) - kept
+        return [row for row, is_new in zip(rows, new) if is_new]
+
+    def filter_response(self, response) -> Dict[str, Any]:
+        """
+        Get a copy of an OnDemandData response with only the posts that were not seen before.
+
+        Args:
+            response: The response, as a dict or lazy response.
+
+        Returns:
+            The response as a dict, with the filtered `data`.
+        """
+        filtered = dict(response)
+        filtered["data"] = self.filter(response)
+        return filtered
+
+    def add(self, data) -> None:
+        """Mark posts as seen, without filtering them."""
+        self.filter(data)
+
+    def __contains__(self, row_or_key) -> bool:
+        key = row_or_key if isinstance(row_or_key, str) else row_key(row_or_key)
+        return bool(self._contains(np.array([key_hash(key)], dtype=np.uint64))[0])
+
+    def __len__(self) -> int:
+        return self._seen
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the de-duplicator counters for monitoring.
+
+        Returns:
+            A dictionary with the `mode`, the number of distinct posts `seen`, the number of
+            duplicates `dropped` and the `memory_bytes` used by the state.
+        """
+        return {
+            "mode": self.mode,
+            "seen": self._seen,
+            "dropped": self._dropped,
+            "memory_bytes": self._memory_bytes(),
+        }
+
+    def save(self, path: str) -> None:
+        """
+        Save the state to a file, to be loaded with `load_deduplicator()`.
+
+        Args:
+            path: The path of the file (a NumPy .npz archive).
+        """
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                version=STATE_VERSION,
+                mode=self.mode,
+                counters=np.array([self._seen, self._dropped], dtype=np.int64),
+                **self._state(),
+            )
+
+    def _contains(self, hashes: "np.ndarray") -> "np.ndarray":
+        raise NotImplementedError
+
+    def _add(self, hashes: "np.ndarray") -> None:
+        raise NotImplementedError
+
+    def _memory_bytes(self) -> int:
+        raise NotImplementedError
+
+    def _state(self) -> Dict[str, "np.ndarray"]:
+        raise NotImplementedError
+
+
+class ExactDeduplicator(Deduplicator):
+    """
+    Exact de-duplication on 64-bit key hashes, kept as sorted NumPy arrays: 8 bytes per
+    distinct post instead of a dict entry and key string per post.
+
+    New hashes are added as sorted runs that are merged when a run grows as large as the one
+    before it, so adding stays cheap as the state grows.
+    """
+
+    mode = "exact"
+
+    def __init__(self):
+        super().__init__()
+        self._runs: List["np.ndarray"] = []
+
+    def _contains(self, hashes: "np.ndarray") -> "np.ndarray":
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self._runs:
+            positions = np.searchsorted(run, hashes)
+            positions[positions == len(run)] = 0
+            found |= run[positions] == hashes
+        return found
+
+    def _add(self, hashes: "np.ndarray") -> None:
+        if not len(hashes):
+            return
+        self._runs.append(np.sort(hashes))
+        while len(self._runs) > 1 and len(self._runs[-2]) <= 2 * len(self._runs[-1]):
+            last = self._runs.pop()
+            self._runs[-1] = np.sort(np.concatenate((self._runs[-1], last)))
+
+    def _memory_bytes(self) -> int:
+        return sum(run.nbytes for run in self._runs)
+
+    def _state(self) -> Dict[str, "np.ndarray"]:
+        hashes = (
+            np.sort(np.concatenate(self._runs))
+            if self._runs
+            else np.empty(0, dtype=np.uint64)
+        )
+        return {"hashes": hashes}
+
+    @classmethod
+    def _from_state(cls, state) -> "ExactDeduplicator":
+        deduplicator = cls()
+        if len(state["hashes"]):
+            deduplicator._runs = [state["hashes"].astype(np.uint64)]
+        return deduplicator
+
+
+class BloomDeduplicator(Deduplicator):
+    """
+    Probabilistic de-duplication with a Bloom filter of fixed size. A new post is wrongly
+    dropped as a duplicate with a probability of at most `error_rate` while fewer than
+    `capacity` posts have been seen; duplicates are never kept.
+    """
+
+    mode = "bloom"
+
+    def __init__(self, capacity: int = 10_000_000, error_rate: float = 0.001):
+        """
+        Initialize the Bloom filter.
+
+        Args:
+            capacity: The number of distinct posts the filter is sized for. (default: 10M)
+            error_rate: The false-positive rate at capacity. (default: 0.001)
+        """
+        super().__init__()
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.num_bits = max(bits, 8)
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = np.zeros((self.num_bits + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, hashes: "np.ndarray") -> "np.ndarray":
+        # Double hashing: position i is h1 + i * h2, with h1 and h2 the halves of the hash
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        steps = np.arange(self.num_hashes, dtype=np.uint64)
+        return (h1[:, None] + steps[None, :] * h2[:, None]) % np.uint64(self.num_bits)
+
+    def _contains(self, hashes: "np.ndarray") -> "np.ndarray":
+        positions = self._positions(hashes)
+        bytes_ = self._bits[positions >> np.uint64(3)]
+        masks = (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8)).astype(
+            np.uint8
+        )
+        return np.all(bytes_ & masks, axis=1)
+
+    def _add(self, hashes: "np.ndarray") -> None:
+        if not len(hashes):
+            return
+        positions = self._positions(hashes).ravel()
+        masks = (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8)).astype(
+            np.uint8
+        )
+        np.bitwise_or.at(self._bits, positions >> np.uint64(3), masks)
+
+    def _memory_bytes(self) -> int:
+        return self._bits.nbytes
+
+    def _state(self) -> Dict[str, "np.ndarray"]:
+        return {
+            "bits": self._bits,
+            "params": np.array([self.capacity, self.error_rate], dtype=np.float64),
+        }
+
+    @classmethod
+    def _from_state(cls, state) -> "BloomDeduplicator":
+        capacity, error_rate = state["params"]
+        deduplicator = cls(int(capacity), float(error_rate))
+        deduplicator._bits = state["bits"].astype(np.uint8)
+        return deduplicator
+
+
+def create_deduplicator(mode: str = "exact", **kwargs) -> Deduplicator:
+    """
+    Create a de-duplicator.
+
+    Args:
+        mode: "exact" (ExactDeduplicator) or "bloom" (BloomDeduplicator). (default: "exact")
+        **kwargs: Options of the Bloom filter: `capacity` and `error_rate`.
+    """
+    if mode == ExactDeduplicator.mode:
+        return ExactDeduplicator(**kwargs)
+    if mode == BloomDeduplicator.mode:
+        return BloomDeduplicator(**kwargs)
+    raise ValueError(f"invalid mode: {mode!r}, must be 'exact' or 'bloom'")
+
+
+def load_deduplicator(path: str) -> Deduplicator:
+    """
+    Load a de-duplicator saved with `Deduplicator.save()`.
+
+    Args:
+        path: The path of the saved state.
+    """
+    _require_numpy()
+    with np.load(path, allow_pickle=False) as state:
+        if int(state["version"]) != STATE_VERSION:
+            raise ValueError(f"unsupported de-duplicator state version in {path}")
+        mode = str(state["mode"])
+        classes = {cls.mode: cls for cls in (ExactDeduplicator, BloomDeduplicator)}
+        if mode not in classes:
+            raise ValueError(f"invalid de-duplicator mode in {path}: {mode!r}")
+        deduplicator = classes[mode]._from_state(state)
+        deduplicator._seen, deduplicator._dropped = (
+            int(value) for value in state["counters"]
+        )
+    return deduplicator
+
+
+def open_deduplicator(
+    path: Optional[str] = None, mode: str = "exact", **kwargs
+) -> Deduplicator:
+    """
+    Load a saved de-duplicator if `path` exists, or create a new one.
+
+    Args:
+        path: The path of the saved state. (default: None, always create a new one)
+        mode: The mode of a new de-duplicator, as for `create_deduplicator`.
+        **kwargs: The options of a new de-duplicator, as for `create_deduplicator`.
+    """
+    if path and os.path.exists(path):
+        return load_deduplicator(path)
+    return create_deduplicator(mode, **kwargs)
+
+
+def iter_new_rows(
+    deduplicator: Deduplicator, responses: Iterable
+) -> Iterable[Dict[str, Any]]:
+    """
+    Yield the posts of several OnDemandData responses that were not seen before.
+
+    Args:
+        deduplicator: The de-duplicator.
+        responses: The responses, as dicts or lazy responses.
+    """
+    for response in responses:
+        yield from deduplicator.filter(response)
@@ -0,0 +1,395 @@
+import asyncio
+import functools
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from collections.abc import Sequence
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Union,
+)
+
+from macrocosmos.generated.sn13.v1 import sn13_validator_pb2
+
+# Job states.
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+
+JOB_STATES = (PENDING, IN_FLIGHT, DONE, FAILED)
+
+# Upper bound of the backoff before a failed job is retried, in seconds.
+MAX_RETRY_BACKOFF = 300.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    spec TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    available_at REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, id);
+"""
+
+
+class HarvestJob(NamedTuple):
+    """An `OnDemandData` request in a harvest queue."""
+
+    id: int
+    spec: Dict[str, Any]
+    state: str
+    attempts: int
+    result: Optional[str]
+    error: Optional[str]
+
+
+def _spec_dict(
+    spec: Union[Dict[str, Any], sn13_validator_pb2.OnDemandDataRequest],
+) -> Dict[str, Any]:
+    if isinstance(spec, sn13_validator_pb2.OnDemandDataRequest):
+        # The set fields, which are named as the OnDemandData arguments
+        return {
+            field.name: list(value)
+            if isinstance(value, Sequence) and not isinstance(value, str)
+            else value
+            for field, value in spec.ListFields()
+        }
+    return dict(spec)
+
+
+class HarvestQueue:
+    """
+    A durable queue of `OnDemandData` request specs in a SQLite database, for bulk harvests
+    that must survive crashes and restarts.
+
+    Each job is pending, in flight, done or failed, with its number of attempts and a pointer
+    to its result. A job that failed can be held back until a later time before it is
+    claimed again. Jobs that were in flight when the process stopped are pending again when
+    the queue is reopened, so a restarted harvest resumes where it stopped and never fetches
+    completed jobs again. Identical specs are only queued once.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open a queue, creating its database if missing.
+
+        Args:
+            path: The path of the SQLite database, or ":memory:".
+        """
+        self.path = os.path.expanduser(path) if path != ":memory:" else path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None
+        )
+        if self.path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(jobs)")}
+        if "available_at" not in columns:
+            # Queues created before failed jobs could be held back
+            self._db.execute(
+                "ALTER TABLE jobs ADD COLUMN available_at REAL NOT NULL DEFAULT 0"
+            )
+        self.requeue_in_flight()
+
+    def enqueue(
+        self,
+        specs: Iterable[Union[Dict[str, Any], sn13_validator_pb2.OnDemandDataRequest]],
+    ) -> int:
+        """
+        Add request specs to the queue, skipping specs that are already queued.
+
+        Args:
+            specs: The specs, each either a dict of `OnDemandData` keyword arguments or an
+                `OnDemandDataRequest` message.
+
+        Returns:
+            The number of jobs added.
+        """
+        now = time.time()
+        rows = []
+        for spec in specs:
+            spec = _spec_dict(spec)
+            rows.append(
+                (json.dumps(spec, sort_keys=True), json.dumps(spec), PENDING, now)
+            )
+        with self._lock, self._transaction():
+            before = self._db.total_changes
+            self._db.executemany(
+                "INSERT OR IGNORE INTO jobs (key, spec, state, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            return self._db.total_changes - before
+
+    def claim(self, count: int = 1) -> List[HarvestJob]:
+        """
+        Take pending jobs that are due, oldest first, and mark them in flight.
+
+        Args:
+            count: The maximum number of jobs to take. (default: 1)
+
+        Returns:
+            The jobs, with their attempt counted.
+        """
+        with self._lock, self._transaction():
+            ids = [
+                row[0]
+                for row in self._db.execute(
+                    "SELECT id FROM jobs WHERE state = ? AND available_at <= ? "
+                    "ORDER BY id LIMIT ?",
+                    (PENDING, time.time(), count),
+                )
+            ]
+            if not ids:
+                return []
+            placeholders = ",".join("?" * len(ids))
+            self._db.execute(
+                f"UPDATE jobs SET state = ?, attempts = attempts + 1, updated_at = ? "
+                f"WHERE id IN ({placeholders})",
+                (IN_FLIGHT, time.time(), *ids),
+            )
+            return self._select(f"id IN ({placeholders}) ORDER BY id", ids)
+
+    def complete(self, job_id: int, result: Optional[str] = None) -> None:
+        """
+        Mark a job done.
+
+        Args:
+            job_id: The ID of the job.
+            result: A pointer to the result, e.g. the path of the file it was written to.
+        """
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET state = ?, result = ?, error = NULL, updated_at = ? "
+                "WHERE id = ?",
+                (DONE, result, time.time(), job_id),
+            )
+
+    def fail(
+        self, job_id: int, error: str, retry: bool = True, delay: float = 0.0
+    ) -> None:
+        """
+        Record a failed attempt of a job.
+
+        Args:
+            job_id: The ID of the job.
+            error: The error message.
+            retry: Whether to make the job pending again, or mark it failed. (default: True)
+            delay: Seconds before a retried job can be claimed again. (default: 0)
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET state = ?, error = ?, updated_at = ?, available_at = ? "
+                "WHERE id = ?",
+                (PENDING if retry else FAILED, error, now, now + delay, job_id),
+            )
+
+    def next_available(self) -> Optional[float]:
+        """
+        Get the time at which the next pending job can be claimed.
+
+        Returns:
+            The time in seconds since the epoch, or None if no job is pending.
+        """
+        with self._lock:
+            (available_at,) = self._db.execute(
+                "SELECT MIN(available_at) FROM jobs WHERE state = ?", (PENDING,)
+            ).fetchone()
+        return available_at
+
+    def requeue_in_flight(self) -> int:
+        """
+        Make the jobs in flight pending again, e.g. after a crash. Called when the queue is
+        opened.
+
+        Returns:
+            The number of jobs made pending.
+        """
+        return self._set_state(IN_FLIGHT, PENDING)
+
+    def retry_failed(self) -> int:
+        """
+        Make the failed jobs pending again and due now, with their attempts reset.
+
+        Returns:
+            The number of jobs made pending.
+        """
+        return self._set_state(FAILED, PENDING, reset_attempts=True)
+
+    def counts(self) -> Dict[str, int]:
+        """Get the number of jobs in each state."""
+        counts = dict.fromkeys(JOB_STATES, 0)
+        with self._lock:
+            for state, count in self._db.execute(
+                "SELECT state, COUNT(*) FROM jobs GROUP BY state"
+            ):
+                counts[state] = count
+        return counts
+
+    def jobs(self, state: Optional[str] = None) -> Iterator[HarvestJob]:
+        """
+        Get the jobs, in queue order.
+
+        Args:
+            state: Only get the jobs in this state. (default: None, all jobs)
+        """
+        with self._lock:
+            if state is None:
+                jobs = self._select("1 ORDER BY id", [])
+            else:
+                jobs = self._select("state = ? ORDER BY id", [state])
+        return iter(jobs)
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _set_state(self, old: str, new: str, reset_attempts: bool = False) -> int:
+        attempts = ", attempts = 0, available_at = 0" if reset_attempts else ""
+        with self._lock:
+            cursor = self._db.execute(
+                f"UPDATE jobs SET state = ?, updated_at = ?{attempts} WHERE state = ?",
+                (new, time.time(), old),
+            )
+            return cursor.rowcount
+
+    def _select(self, where: str, params: List[Any]) -> List[HarvestJob]:
+        return [
+            HarvestJob(job_id, json.loads(spec), state, attempts, result, error)
+            for job_id, spec, state, attempts, result, error in self._db.execute(
+                f"SELECT id, spec, state, attempts, result, error FROM jobs WHERE {where}",
+                params,
+            )
+        ]
+
+    def _transaction(self):
+        return _Transaction(self._db)
+
+
+class _Transaction:
+    """An immediate transaction, committed on success and rolled back on error."""
+
+    def __init__(self, db: sqlite3.Connection):
+        self._db = db
+
+    def __enter__(self):
+        self._db.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._db.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+def write_result_file(directory: str, job: HarvestJob, response: Dict[str, Any]) -> str:
+    """
+    Write the response of a job to `<directory>/<job id>.json` atomically.
+
+    Returns:
+        The path of the file.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{job.id:08d}.json")
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(response, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return path
+
+
+async def drain_harvest_queue(
+    sn13,
+    queue: HarvestQueue,
+    results_dir: Optional[str] = None,
+    handler: Optional[
+        Callable[[HarvestJob, Dict[str, Any]], Union[Optional[str], Awaitable]]
+    ] = None,
+    max_concurrency: int = 8,
+    max_attempts: int = 3,
+    retry_backoff: float = 1.0,
+) -> Dict[str, int]:
+    """
+    Run the pending jobs of a harvest queue until none are left.
+
+    See `AsyncSn13.drain_harvest_queue`.
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be >= 1")
+    loop = asyncio.get_running_loop()
+
+    def in_thread(func, *args) -> Awaitable:
+        # SQLite and file writes block, so they run off the event loop
+        return loop.run_in_executor(None, functools.partial(func, *args))
+
+    if handler is None:
+        if results_dir is None:
+            raise ValueError("either results_dir or handler is required")
+
+        def handler(job, response):
+            return in_thread(write_result_file, results_dir, job, response)
+
+    async def worker() -> None:
+        while True:
+            jobs = await in_thread(queue.claim)
+            if not jobs:
+                available_at = await in_thread(queue.next_available)
+                if available_at is None:
+                    return
+                # Only jobs backing off are left
+                await asyncio.sleep(max(available_at - time.time(), 0.0))
+                continue
+            job = jobs[0]
+            try:
+                response = await sn13.OnDemandData(**job.spec)
+                result = handler(job, response)
+                if asyncio.isfuture(result) or asyncio.iscoroutine(result):
+                    result = await result
+            except asyncio.CancelledError:
+                queue.fail(job.id, "cancelled")
+                raise
+            except Exception as e:
+                # Exponential backoff with jitter, so an outage does not use up every
+                # job's attempts at once
+                delay = min(retry_backoff * 2 ** (job.attempts - 1), MAX_RETRY_BACKOFF)
+                await in_thread(
+                    queue.fail,
+                    job.id,
+                    str(e),
+                    job.attempts < max_attempts,
+                    delay * random.uniform(0.5, 1.0),
+                )
+                continue
+            await in_thread(queue.complete, job.id, result)
+
+    await asyncio.gather(*(worker() for _ in range(max_concurrency)))
+    return queue.counts()
@@ -0,0 +1,104 @@
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+# Fields that identify a post, in order of preference. X posts also carry `tweet.id`.
+ROW_KEY_FIELDS = ("uri", "url", "id", "video_id")
+ROW_DATETIME_FIELD = "datetime"
+
+# The API queries the last 24 hours when no date range is given.
+DEFAULT_WINDOW = timedelta(hours=24)
+
+
+def row_key(row: Dict[str, Any]) -> str:
+    """
+    Get the key identifying the post of an on-demand data row, used to de-duplicate rows.
+
+    Args:
+        row: A row of the `data` list of an `OnDemandData` response.
+
+    Returns:
+        The post URI or ID, or a canonical JSON dump of the row if it has neither.
+    """
+    for field in ROW_KEY_FIELDS:
+        value = row.get(field)
+        if value:
+            return str(value)
+    tweet = row.get("tweet")
+    if isinstance(tweet, dict) and tweet.get("id"):
+        return str(tweet["id"])
+    return json.dumps(row, sort_keys=True, default=str)
+
+
+def parse_datetime(value: str) -> datetime:
+    """
+    Parse an ISO 8601 date or datetime string as used by the API into an aware datetime.
+
+    Args:
+        value: e.g. "2024-01-01", "2024-01-01T00:00:00Z" or "2024-01-01T00:00:00+00:00".
+
+    Returns:
+        The datetime, in UTC if the string has no offset.
+    """
+    parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def format_datetime(value: datetime) -> str:
+    """
+    Format a datetime as an ISO 8601 UTC string accepted by the API.
+    """
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def row_datetime(row: Dict[str, Any]) -> Optional[datetime]:
+    """
+    Get the post datetime of an on-demand data row, if it has a parseable one.
+    """
+    value = row.get(ROW_DATETIME_FIELD)
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        return parse_datetime(value)
+    except ValueError:
+        return None
+
+
+def resolve_window(
+    start_date: Optional[str], end_date: Optional[str]
+) -> Tuple[datetime, datetime]:
+    """
+    Resolve an optional date range the way the API does: the end defaults to now and the
+    start to 24 hours before the end.
+
+    Returns:
+        The (start, end) datetimes.
+    """
+    end = parse_datetime(end_date) if end_date else datetime.now(timezone.utc)
+    start = parse_datetime(start_date) if start_date else end - DEFAULT_WINDOW
+    if start >= end:
+        raise ValueError("start_date must be before end_date")
+    return start, end
+
+
+def split_window(
+    start: datetime, end: datetime, parts: int
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Split a time window into equal, contiguous sub-windows.
+
+    Args:
+        start: The start of the window.
+        end: The end of the window.
+        parts: The number of sub-windows.
+
+    Returns:
+        The (start, end) of each sub-window, in chronological order.
+    """
+    if parts < 1:
+        raise ValueError("parts must be >= 1")
+    step = (end - start) / parts
+    bounds = [start + step * i for i in range(parts)] + [end]
+    return list(zip(bounds[:-1], bounds[1:]))
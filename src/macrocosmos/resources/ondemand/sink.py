@@ -0,0 +1,383 @@
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from google.protobuf import struct_pb2
+
+from macrocosmos.resources.ondemand import columnar
+from macrocosmos.resources.ondemand.lazy import struct_to_dict
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+MANIFEST_NAME = "manifest.json"
+
+SEGMENT_FORMATS = ("jsonl", "parquet")
+
+# Suffix of the segment being written; it is renamed when the segment is complete.
+PARTIAL_SUFFIX = ".part"
+
+
+class SegmentSink:
+    """
+    Appends the posts of OnDemandData results to rotating segment files in a directory, so
+    long harvests keep a flat memory profile: at most `buffer_rows` posts are held in memory
+    before they are written out.
+
+    Segments are written under a ".part" name and renamed once complete. `manifest.json`
+    lists the completed segments with their row counts and sizes, and is rewritten atomically
+    whenever a segment is completed. Opening a sink on a directory with a manifest continues
+    the numbering of its segments.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        format: str = "jsonl",
+        segment_rows: int = 1_000_000,
+        segment_bytes: Optional[int] = None,
+        segment_seconds: Optional[float] = None,
+        buffer_rows: int = 10_000,
+        compression: Optional[str] = None,
+        source: Optional[str] = None,
+        prefix: str = "part",
+    ):
+        """
+        Initialize the sink.
+
+        Args:
+            directory: The directory of the segments and manifest. It is created if missing.
+            format: "jsonl" (one JSON post per line) or "parquet" (requires
+                macrocosmos[arrow]). (default: "jsonl")
+            segment_rows: The number of posts after which a segment is completed.
+                (default: 1M)
+            segment_bytes: The size in bytes after which a segment is completed, measured
+                before compression. (default: None, no size limit)
+            segment_seconds: The age in seconds after which a segment is completed, counted
+                from its first post and checked on each write. (default: None, no age limit)
+            buffer_rows: The maximum number of posts held in memory before they are written.
+                For Parquet, this is also the row group size. (default: 10k)
+            compression: "gzip" for JSONL; a Parquet codec, e.g. "zstd" or "snappy", for
+                Parquet. (default: None, uncompressed)
+            source: The data source of the posts, for the Parquet column order.
+                (default: None, taken from the posts)
+            prefix: The start of the segment file names. (default: "part")
+        """
+        if format not in SEGMENT_FORMATS:
+            raise ValueError(
+                f"invalid format: {format!r}, must be 'jsonl' or 'parquet'"
+            )
+        if format == "jsonl" and compression not in (None, "gzip"):
+            raise ValueError("JSONL segments support only 'gzip' compression")
+        if format == "parquet":
+            columnar._require_pyarrow()
+        if segment_rows < 1 or buffer_rows < 1:
+            raise ValueError("segment_rows and buffer_rows must be >= 1")
+        if segment_seconds is not None and segment_seconds <= 0:
+            raise ValueError("segment_seconds must be > 0")
+
+        self.directory = os.path.expanduser(directory)
+        self.format = format
+        self.segment_rows = segment_rows
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.buffer_rows = buffer_rows
+        self.compression = compression
+        self.source = source
+        self.prefix = prefix
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._buffer: List[Any] = []
+        self._segments: List[Dict[str, Any]] = self._load_manifest()
+        self._segment: Optional[_Segment] = None
+        # When the first post of the current segment was written
+        self._started: Optional[float] = None
+        self._closed = False
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.directory, MANIFEST_NAME)
+
+    @property
+    def segments(self) -> List[Dict[str, Any]]:
+        """Get the manifest entries of the completed segments."""
+        return list(self._segments)
+
+    def write(self, data) -> int:
+        """
+        Append posts to the sink.
+
+        Args:
+            data: An OnDemandData result: the response dict, a LazyOnDemandDataResponse, an
+                `OnDemandDataResponse` message, or a list of posts.
+
+        Returns:
+            The number of posts appended.
+        """
+        count = 0
+        with self._lock:
+            if self._closed:
+                raise ValueError("write to a closed sink")
+            for row in columnar._rows(data):
+                if self._started is None:
+                    self._started = time.monotonic()
+                self._buffer.append(row)
+                count += 1
+                if len(self._buffer) >= self.buffer_rows:
+                    self._flush()
+            if (
+                self.segment_seconds is not None
+                and self._started is not None
+                and time.monotonic() - self._started >= self.segment_seconds
+            ):
+                self._flush()
+                self._complete_segment()
+        return count
+
+    def flush(self) -> None:
+        """Write the buffered posts to the current segment."""
+        with self._lock:
+            self._flush()
+
+    def rotate(self) -> None:
+        """Write the buffered posts and complete the current segment."""
+        with self._lock:
+            self._flush()
+            self._complete_segment()
+
+    def close(self) -> List[Dict[str, Any]]:
+        """
+        Write the buffered posts, complete the current segment and write the manifest.
+
+        Returns:
+            The manifest entries of all completed segments.
+        """
+        with self._lock:
+            if not self._closed:
+                self._flush()
+                self._complete_segment()
+                self._write_manifest()
+                self._closed = True
+        return self.segments
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _flush(self) -> None:
+        rows, self._buffer = self._buffer, []
+        while rows:
+            if self._segment is None:
+                self._segment = self._open_segment()
+                if self._started is None:
+                    self._started = time.monotonic()
+            room = self.segment_rows - self._segment.rows
+            rows_written = self._segment.write(rows[:room])
+            rows = rows[rows_written:]
+            if (
+                not rows_written
+                or self._segment.rows >= self.segment_rows
+                or (
+                    self.segment_bytes is not None
+                    and self._segment.bytes >= self.segment_bytes
+                )
+            ):
+                self._complete_segment()
+
+    def _open_segment(self) -> "_Segment":
+        index = self._segments[-1]["index"] + 1 if self._segments else 0
+        extension = self.format
+        if self.format == "jsonl" and self.compression == "gzip":
+            extension += ".gz"
+        name = f"{self.prefix}-{index:05d}.{extension}"
+        path = os.path.join(self.directory, name)
+        if self.format == "jsonl":
+            return _JsonlSegment(index, path, self.compression)
+        return _ParquetSegment(index, path, self.compression, self.source)
+
+    def _complete_segment(self) -> None:
+        segment, self._segment = self._segment, None
+        self._started = None
+        if segment is None:
+            return
+        segment.close()
+        if not segment.rows:
+            if os.path.exists(segment.partial_path):
+                os.remove(segment.partial_path)
+            return
+        os.replace(segment.partial_path, segment.path)
+        self._segments.append(
+            {
+                "index": segment.index,
+                "path": os.path.basename(segment.path),
+                "format": self.format,
+                "compression": self.compression,
+                "rows": segment.rows,
+                "file_size_bytes": os.path.getsize(segment.path),
+                "completed_at": time.time(),
+            }
+        )
+        self._write_manifest()
+
+    def _load_manifest(self) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.manifest_path):
+            return []
+        with open(self.manifest_path) as f:
+            return json.load(f).get("segments", [])
+
+    def _write_manifest(self) -> None:
+        manifest = {
+            "rows": sum(segment["rows"] for segment in self._segments),
+            "segments": self._segments,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(tmp_path, self.manifest_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+class _Segment:
+    """A segment file being written."""
+
+    def __init__(self, index: int, path: str):
+        self.index = index
+        self.path = path
+        self.partial_path = path + PARTIAL_SUFFIX
+        self.rows = 0
+        self.bytes = 0
+
+    def write(self, rows: List[Any]) -> int:
+        """Write rows, returning how many were written."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+
+class _JsonlSegment(_Segment):
+    def __init__(self, index: int, path: str, compression: Optional[str]):
+        super().__init__(index, path)
+        if compression == "gzip":
+            self._file = gzip.open(self.partial_path, "wb")
+        else:
+            self._file = open(self.partial_path, "wb")
+
+    def write(self, rows: List[Any]) -> int:
+        lines = b"".join(
+            json.dumps(
+                struct_to_dict(row) if isinstance(row, struct_pb2.Struct) else row,
+                ensure_ascii=False,
+            ).encode()
+            + b"\n"
+            for row in rows
+        )
+        self._file.write(lines)
+        self.rows += len(rows)
+        self.bytes += len(lines)
+        return len(rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ParquetSegment(_Segment):
+    """
+    A Parquet segment, with one row group per flush. Its schema is that of the first rows
+    written, and later rows are cast to it: missing columns are filled with nulls, integers
+    and floats are converted into each other where no value changes, and values in string
+    columns are JSON encoded as for mixed columns. Rows the schema can't hold without losing
+    values, i.e. with a new non-null column or an incompatible type, end the segment early
+    and are written to the next one.
+    """
+
+    def __init__(
+        self, index: int, path: str, compression: Optional[str], source: Optional[str]
+    ):
+        super().__init__(index, path)
+        self._compression = compression or "none"
+        self._source = source
+        self._writer = None
+
+    def write(self, rows: List[Any]) -> int:
+        import pyarrow.parquet as pq
+
+        schema, builder = columnar._build(rows, self._source)
+        table = columnar._arrow_table(schema, builder)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(
+                self.partial_path, table.schema, compression=self._compression
+            )
+        else:
+            table = _conform(table, self._writer.schema)
+            if table is None:
+                # Rows that don't fit the schema of the segment go to the next one
+                return 0
+        self._writer.write_table(table)
+        self.rows += table.num_rows
+        self.bytes += table.nbytes
+        return table.num_rows
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _conform(table: "pa.Table", schema: "pa.Schema") -> Optional["pa.Table"]:
+    """
+    Cast a table to the schema of a segment.
+
+    Returns:
+        The cast table, or None if it has values the schema can't hold.
+    """
+    for name in table.column_names:
+        if name not in schema.names and table.column(name).null_count < table.num_rows:
+            return None
+    arrays = []
+    for field in schema:
+        if field.name not in table.column_names:
+            arrays.append(pa.nulls(table.num_rows, field.type))
+            continue
+        column = _cast_column(table.column(field.name), field.type)
+        if column is None:
+            return None
+        arrays.append(column)
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _cast_column(column: "pa.ChunkedArray", type: "pa.DataType"):
+    if column.type == type:
+        return column
+    if pa.types.is_null(column.type) or column.null_count == len(column):
+        return pa.nulls(len(column), type)
+    if _is_number(column.type) and _is_number(type):
+        try:
+            # A safe cast fails on floats with a fraction, rather than truncating them
+            return column.cast(type, safe=True)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            return None
+    if pa.types.is_string(type):
+        return pa.array(
+            [
+                value if value is None or isinstance(value, str) else json.dumps(value)
+                for value in column.to_pylist()
+            ],
+            type=type,
+        )
+    return None
+
+
+def _is_number(type: "pa.DataType") -> bool:
+    return pa.types.is_integer(type) or pa.types.is_floating(type)
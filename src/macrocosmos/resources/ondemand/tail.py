@@ -0,0 +1,252 @@
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from macrocosmos.resources.ondemand.rows import (
+    format_datetime,
+    parse_datetime,
+    row_datetime,
+    row_key,
+)
+from macrocosmos.types import MacrocosmosError
+
+logger = logging.getLogger(__name__)
+
+
+def query_key(
+    source: str,
+    usernames: Optional[List[str]] = None,
+    keywords: Optional[List[str]] = None,
+    keyword_mode: Optional[str] = None,
+) -> str:
+    """
+    Get the key identifying a followed query in a watermark store.
+
+    Returns:
+        A canonical JSON encoding of the query.
+    """
+    return json.dumps(
+        {
+            "source": source.lower(),
+            "usernames": sorted(usernames or []),
+            "keywords": sorted(keywords or []),
+            "keyword_mode": keyword_mode,
+        },
+        sort_keys=True,
+    )
+
+
+class Watermark:
+    """
+    The newest post seen for a query: its datetime and the keys of every post seen with
+    exactly that datetime, so that posts sharing the boundary second are not yielded twice.
+    """
+
+    def __init__(self, timestamp: datetime, keys: Optional[List[str]] = None):
+        """
+        Initialize the watermark.
+
+        Args:
+            timestamp: The datetime of the newest post seen.
+            keys: The keys of the posts seen with that datetime.
+        """
+        self.timestamp = timestamp
+        self.keys = set(keys or [])
+
+    def is_new(self, timestamp: datetime, key: str) -> bool:
+        """Check whether a post is after the watermark."""
+        return timestamp > self.timestamp or (
+            timestamp == self.timestamp and key not in self.keys
+        )
+
+    def advance(self, timestamp: datetime, key: str) -> None:
+        """Move the watermark to a post, which must not be older than the watermark."""
+        if timestamp > self.timestamp:
+            self.timestamp = timestamp
+            self.keys = set()
+        self.keys.add(key)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "datetime": self.timestamp.astimezone(timezone.utc).isoformat(),
+            "keys": sorted(self.keys),
+        }
+
+    @classmethod
+    def from_dict(cls, value: Dict[str, Any]) -> "Watermark":
+        return cls(parse_datetime(value["datetime"]), value.get("keys", []))
+
+    def __repr__(self) -> str:
+        return f"Watermark(timestamp={self.timestamp.isoformat()!r}, keys={len(self.keys)})"
+
+
+class WatermarkStore:
+    """
+    The watermarks of followed queries, optionally persisted to a JSON state file so that
+    a restarted process continues where it stopped.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize the store, loading the state file if it exists.
+
+        Args:
+            path: The path of the state file. (default: None, watermarks are kept in memory)
+        """
+        self.path = os.path.expanduser(path) if path else None
+        self._lock = threading.Lock()
+        self._watermarks: Dict[str, Watermark] = {}
+        if self.path and os.path.exists(self.path):
+            with open(self.path) as f:
+                state = json.load(f)
+            self._watermarks = {
+                key: Watermark.from_dict(value)
+                for key, value in state.get("watermarks", {}).items()
+            }
+
+    def get(self, key: str) -> Optional[Watermark]:
+        """Get the watermark of a query, if it has one."""
+        return self._watermarks.get(key)
+
+    def set(self, key: str, watermark: Watermark) -> None:
+        """Set the watermark of a query. Call `save()` to persist it."""
+        self._watermarks[key] = watermark
+
+    def save(self) -> None:
+        """Write the watermarks to the state file atomically, if the store has one."""
+        if not self.path:
+            return
+        with self._lock:
+            state = {
+                "watermarks": {
+                    key: watermark.to_dict()
+                    for key, watermark in self._watermarks.items()
+                }
+            }
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(state, f, indent=2)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+
+
+def _new_rows(
+    rows: List[Dict[str, Any]], watermark: Optional[Watermark]
+) -> List[Tuple[datetime, str, Dict[str, Any]]]:
+    """Get the rows after the watermark, oldest first, with their datetime and key."""
+    new_rows = []
+    for row in rows:
+        timestamp = row_datetime(row)
+        if timestamp is None:
+            continue
+        key = row_key(row)
+        if watermark is None or watermark.is_new(timestamp, key):
+            new_rows.append((timestamp, key, row))
+    new_rows.sort(key=lambda item: item[0])
+    return new_rows
+
+
+async def tail_on_demand_data(
+    sn13,
+    source: str,
+    usernames: Optional[List[str]] = None,
+    keywords: Optional[List[str]] = None,
+    keyword_mode: Optional[str] = None,
+    limit: int = 100,
+    interval: float = 60.0,
+    start_date: Optional[str] = None,
+    state: Optional[WatermarkStore] = None,
+    max_polls: Optional[int] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Follow an on-demand data query, yielding only posts newer than the newest post seen.
+
+    See `AsyncSn13.tail_on_demand_data`.
+    """
+    if interval < 0:
+        raise ValueError("interval must be >= 0")
+
+    state = state if state is not None else WatermarkStore()
+    key = query_key(source, usernames, keywords, keyword_mode)
+    watermark = state.get(key)
+
+    polls = 0
+    delay = interval
+    try:
+        while max_polls is None or polls < max_polls:
+            if polls:
+                await asyncio.sleep(delay)
+            polls += 1
+            delay = interval
+
+            end_date = format_datetime(datetime.now(timezone.utc))
+            if watermark is not None:
+                # The API filters by whole seconds, inclusive, so posts sharing the
+                # watermark second come back and are filtered by key
+                window_start = format_datetime(watermark.timestamp)
+            else:
+                window_start = start_date
+
+            if window_start is not None:
+                ahead = parse_datetime(window_start) - parse_datetime(end_date)
+                if ahead.total_seconds() >= 0:
+                    # The watermark is in the current second, or ahead of the local clock:
+                    # nothing newer can be queried until the clock passes it
+                    delay = max(interval, ahead.total_seconds() + 1)
+                    continue
+
+            try:
+                # Windows that hit the limit are split so that a long gap (e.g. after a
+                # restart) is caught up on instead of truncated
+                response = await sn13.OnDemandDataSharded(
+                    source=source,
+                    usernames=usernames,
+                    keywords=keywords,
+                    start_date=window_start,
+                    end_date=end_date,
+                    limit=limit,
+                    keyword_mode=keyword_mode,
+                    shards=1,
+                    adaptive=True,
+                    min_shard_seconds=60,
+                )
+            except MacrocosmosError as e:
+                # Every sub-window failed: the same window is queried on the next poll
+                logger.warning(
+                    "Polling %s failed, retrying in %ss: %s", source, delay, e
+                )
+                continue
+
+            # Don't move the watermark past a sub-window that failed; it is queried again
+            # on the next poll
+            failed_since = min(
+                (
+                    parse_datetime(shard["start_date"])
+                    for shard in response["meta"]["failed_shards"]
+                ),
+                default=None,
+            )
+
+            for timestamp, row_id, row in _new_rows(response["data"], watermark):
+                if failed_since is not None and timestamp >= failed_since:
+                    break
+                # Advance before yielding: the consumer has the row even if it stops here
+                if watermark is None:
+                    watermark = Watermark(timestamp)
+                    state.set(key, watermark)
+                watermark.advance(timestamp, row_id)
+                yield row
+
+            state.save()
+    finally:
+        state.save()
@@ -1,13 +1,135 @@
-from typing import List, Optional, Any
-from google.protobuf.json_format import MessageToDict
+import asyncio
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Union,
+)
 
-import grpc
-
-from macrocosmos import __package_name__, __version__
 from macrocosmos.generated.sn13.v1 import sn13_validator_pb2, sn13_validator_pb2_grpc
 from macrocosmos.resources._client import BaseClient
+from macrocosmos.resources._request import make_async_request, make_sync_request
+from macrocosmos.resources._stream import StreamGenerator
+from macrocosmos.resources.ondemand.dedup import Deduplicator
+from macrocosmos.resources.ondemand.jobs import (
+    HarvestJob,
+    HarvestQueue,
+    drain_harvest_queue,
+)
+from macrocosmos.resources.ondemand.lazy import (
+    LazyOnDemandDataResponse,
+    response_to_dict,
+    struct_to_dict,
+)
+from macrocosmos.resources.ondemand.rows import (
+    format_datetime,
+    resolve_window,
+    row_key,
+    split_window,
+)
+from macrocosmos.resources.ondemand.tail import WatermarkStore, tail_on_demand_data
+from macrocosmos.resources.topics import (
+    DEFAULT_TOPIC_SOURCES,
+    TopicIndex,
+    default_topic_index,
+)
 from macrocosmos.types import MacrocosmosError
-from macrocosmos.resources._utils import run_sync_threadsafe
+
+# Number of rows decoded between yields to the event loop by `iter_on_demand_data`.
+ROWS_PER_YIELD = 64
+
+
+# Request and response helpers shared by the asynchronous and synchronous resources, so
+# that both build requests and convert responses identically.
+
+
+def _on_demand_data_request(
+    source: str,
+    usernames: Optional[List[str]],
+    keywords: Optional[List[str]],
+    start_date: Optional[str],
+    end_date: Optional[str],
+    limit: int,
+    keyword_mode: Optional[str],
+    url: Optional[str],
+) -> sn13_validator_pb2.OnDemandDataRequest:
+    return sn13_validator_pb2.OnDemandDataRequest(
+        source=source,
+        usernames=usernames or [],
+        keywords=keywords or [],
+        start_date=start_date,
+        end_date=end_date,
+        limit=limit,
+        keyword_mode=keyword_mode,
+        url=url,
+    )
+
+
+def _convert_response(
+    response, lazy: bool = False
+) -> Union[dict[str, Any], LazyOnDemandDataResponse]:
+    # The data and meta fields are google.protobuf.Struct types. response_to_dict gives the
+    # same result as MessageToDict(response, preserving_proto_field_name=True), about 1.5x
+    # faster; a lazy response converts only the rows that are read.
+    if lazy:
+        return LazyOnDemandDataResponse(response)
+    return response_to_dict(response)
+
+
+class OnDemandDataResult:
+    """The outcome of one request of an `OnDemandDataMany` batch."""
+
+    def __init__(
+        self,
+        index: int,
+        request: Union[Dict[str, Any], sn13_validator_pb2.OnDemandDataRequest],
+        response: Optional[dict[str, Any]] = None,
+        error: Optional[Exception] = None,
+    ):
+        """
+        Initialize the result.
+
+        Args:
+            index: The position of the request in the batch.
+            request: The request spec as it was passed in.
+            response: The response, if the request succeeded.
+            error: The error raised by the request, if it failed.
+        """
+        self.index = index
+        self.request = request
+        self.response = response
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        """Whether the request succeeded."""
+        return self.error is None
+
+    def __repr__(self) -> str:
+        outcome = f"error={self.error!r}" if self.error else "ok"
+        return f"OnDemandDataResult(index={self.index}, {outcome})"
+
+
+class _RequestPacer:
+    """Spaces out request starts to at most `rate` per second."""
+
+    def __init__(self, rate: float):
+        if rate <= 0:
+            raise ValueError("rate_limit must be > 0")
+        self._interval = 1 / rate
+        self._next_start = 0.0
+
+    async def wait(self) -> None:
+        now = asyncio.get_running_loop().time()
+        start = max(now, self._next_start)
+        self._next_start = start + self._interval
+        if start > now:
+            await asyncio.sleep(start - now)
 
 
 class AsyncSn13:
@@ -32,7 +154,8 @@ class AsyncSn13:
         limit: int = 100,
         keyword_mode: Optional[str] = None,
         url: Optional[str] = None,
-    ) -> dict[str, Any]:
+        lazy: bool = False,
+    ) -> Union[dict[str, Any], LazyOnDemandDataResponse]:
         """
         Retrieves on-demand data from the SN13 API service asynchronously, based on the provided parameters.
 
@@ -46,16 +169,18 @@ class AsyncSn13:
             keyword_mode (str): Defines how keywords should be used in selecting response posts (optional):
                 "all" (posts must include all keywords) or "any" (posts can include any combination of keywords)
             url (str): Single URL for URL search mode (X or YouTube)
+            lazy (bool): Return a LazyOnDemandDataResponse that converts rows only when they are
+                accessed instead of a dict, for large responses (default: False)
         Returns:
             dict:
                 - status (str): The request status
                 - data (List[dict]): The data object returned by the miners
                 - meta (dict): Additional metadata about the request
         """
-        request = sn13_validator_pb2.OnDemandDataRequest(
+        request = _on_demand_data_request(
             source=source,
-            usernames=usernames or [],
-            keywords=keywords or [],
+            usernames=usernames,
+            keywords=keywords,
             start_date=start_date,
             end_date=end_date,
             limit=limit,
@@ -63,56 +188,455 @@ class AsyncSn13:
             url=url,
         )
 
-        return await self._make_request("OnDemandData", request)
+        return await self._make_request("OnDemandData", request, lazy=lazy)
 
-    async def _make_request(self, method_name, request):
+    async def OnDemandDataMany(
+        self,
+        requests: List[Union[Dict[str, Any], sn13_validator_pb2.OnDemandDataRequest]],
+        max_concurrency: int = 8,
+        rate_limit: Optional[float] = None,
+        ordered: bool = False,
+        deduplicator: Optional[Deduplicator] = None,
+    ) -> AsyncIterator[OnDemandDataResult]:
         """
-        Make a request to the SN13 service.
+        Run many on-demand data requests concurrently and yield their results as they complete.
+
+        A failing request does not fail the batch: its error is captured on its result.
 
         Args:
-            method_name: The name of the method to call.
-            request: The request message.
+            requests: The request specs, each either a dict of `OnDemandData` keyword
+                arguments or an `OnDemandDataRequest` message.
+            max_concurrency: The maximum number of requests in flight at once. (default: 8)
+            rate_limit: The maximum number of requests started per second. (default: None)
+            ordered: Yield results in input order instead of completion order. (default: False)
+            deduplicator: Drops posts it has already seen, in this batch or before, from the
+                responses. (default: None)
 
-        Returns:
-            The response from the service.
+        Yields:
+            An OnDemandDataResult per request, with either `response` or `error` set.
         """
-        metadata = [
-            ("x-source", self._client.app_name),
-            ("x-client-id", __package_name__),
-            ("x-client-version", __version__),
-            ("authorization", f"Bearer {self._client.api_key}"),
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+        pacer = _RequestPacer(rate_limit) if rate_limit else None
+
+        async def run_one(index: int, spec) -> OnDemandDataResult:
+            async with semaphore:
+                if pacer:
+                    await pacer.wait()
+                try:
+                    if isinstance(spec, sn13_validator_pb2.OnDemandDataRequest):
+                        response = await self._make_request("OnDemandData", spec)
+                    else:
+                        response = await self.OnDemandData(**spec)
+                except Exception as e:
+                    return OnDemandDataResult(index, spec, error=e)
+                return OnDemandDataResult(index, spec, response=response)
+
+        tasks = [
+            asyncio.ensure_future(run_one(index, spec))
+            for index, spec in enumerate(requests)
         ]
+        try:
+            for next_result in tasks if ordered else asyncio.as_completed(tasks):
+                result = await next_result
+                if deduplicator is not None and result.ok:
+                    # Filtered here rather than in run_one, so posts are kept in yield order
+                    result.response = deduplicator.filter_response(result.response)
+                yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def OnDemandDataSharded(
+        self,
+        source: str,
+        usernames: Optional[List[str]] = None,
+        keywords: Optional[List[str]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        limit: int = 100,
+        keyword_mode: Optional[str] = None,
+        shards: int = 4,
+        adaptive: bool = False,
+        min_shard_seconds: float = 3600,
+        max_concurrency: int = 8,
+        deduplicator: Optional[Deduplicator] = None,
+    ) -> dict[str, Any]:
+        """
+        Retrieves on-demand data for a large date range by splitting it into sub-windows that are
+        queried concurrently, then merging the results into one response without duplicates.
+
+        Args:
+            source (str): The data source (X or Reddit)
+            usernames (List[str]): List of usernames to fetch data from
+            keywords (List[str]): List of keywords to search for
+            start_date (str): Start of the range. ISO 8601 formatted date string (default: 24h before end_date)
+            end_date (str): End of the range. ISO 8601 formatted date string (default: now)
+            limit (int): Maximum number of results per sub-window
+            keyword_mode (str): "all" or "any", as for `OnDemandData` (optional)
+            shards (int): Number of equal sub-windows to split the range into (default: 4)
+            adaptive (bool): Whether to split sub-windows that hit `limit` in two and query the halves,
+                recursively, so dense periods are covered (default: False)
+            min_shard_seconds (float): Sub-windows shorter than twice this are not split further (default: 3600)
+            max_concurrency (int): Maximum number of sub-window requests in flight at once (default: 8)
+            deduplicator (Deduplicator): Also drops the posts it has seen in earlier queries, and
+                records the new ones (optional)
+        Returns:
+            dict:
+                - status (str): "success", or "partial" if some sub-windows failed
+                - data (List[dict]): The merged posts, de-duplicated by post URI/ID, in sub-window order
+                - meta (dict): The number of `shards` queried, `duplicates_removed`, any `failed_shards`
+                  and, with a deduplicator, the number of posts `previously_seen`
+        """
+        start, end = resolve_window(start_date, end_date)
+        windows = split_window(start, end, shards)
+
+        rows: Dict[str, Dict[str, Any]] = {}
+        duplicates = 0
+        queried = 0
+        failed_shards = []
+        first_error: Optional[Exception] = None
+
+        while windows:
+            requests = [
+                _on_demand_data_request(
+                    source=source,
+                    usernames=usernames,
+                    keywords=keywords,
+                    start_date=format_datetime(window_start),
+                    end_date=format_datetime(window_end),
+                    limit=limit,
+                    keyword_mode=keyword_mode,
+                    url=None,
+                )
+                for window_start, window_end in windows
+            ]
+            queried += len(requests)
+
+            split_windows = []
+            async for result in self.OnDemandDataMany(
+                requests, max_concurrency=max_concurrency, ordered=True
+            ):
+                window_start, window_end = windows[result.index]
+                if not result.ok:
+                    first_error = first_error or result.error
+                    failed_shards.append(
+                        {
+                            "start_date": format_datetime(window_start),
+                            "end_date": format_datetime(window_end),
+                            "error": str(result.error),
+                        }
+                    )
+                    continue
+
+                data = result.response.get("data", [])
+                for row in data:
+                    key = row_key(row)
+                    if key in rows:
+                        duplicates += 1
+                    else:
+                        rows[key] = row
+
+                if (
+                    adaptive
+                    and len(data) >= limit
+                    and (window_end - window_start).total_seconds()
+                    >= 2 * min_shard_seconds
+                ):
+                    split_windows.extend(split_window(window_start, window_end, 2))
+
+            windows = split_windows
+
+        if first_error is not None and len(failed_shards) == queried:
+            if isinstance(first_error, MacrocosmosError):
+                raise first_error
+            raise MacrocosmosError(f"Error calling OnDemandData: {first_error}")
+
+        data = list(rows.values())
+        meta = {
+            "shards": queried,
+            "duplicates_removed": duplicates,
+            "failed_shards": failed_shards,
+        }
+        if deduplicator is not None:
+            new_data = deduplicator.filter(data)
+            meta["previously_seen"] = len(data) - len(new_data)
+            data = new_data
+
+        return {
+            "status": "partial" if failed_shards else "success",
+            "data": data,
+            "meta": meta,
+        }
+
+    async def ListTopics(self, source: str) -> sn13_validator_pb2.ListTopicsResponse:
+        """
+        List the top topics of a source asynchronously.
 
-        compression = grpc.Compression.Gzip if self._client.compress else None
+        Args:
+            source (str): The data source (X or Reddit)
+        Returns:
+            ListTopicsResponse: The topics, each with its `label_value` and `content_size_bytes`
+        """
+        request = sn13_validator_pb2.ListTopicsRequest(source=source)
+        return await make_async_request(
+            self._client, sn13_validator_pb2_grpc.Sn13ServiceStub, "ListTopics", request
+        )
+
+    async def ValidateRedditTopic(
+        self, topic: str
+    ) -> sn13_validator_pb2.ValidateRedditTopicResponse:
+        """
+        Check whether a subreddit exists, and whether it is NSFW or quarantined, asynchronously.
 
-        retries = 0
-        last_error = None
-        while retries <= self._client.max_retries:
-            channel = None
+        Args:
+            topic (str): The subreddit, e.g. "r/MachineLearning"
+        Returns:
+            ValidateRedditTopicResponse: Whether the topic `exists`, and its `over18` and `quarantine` flags
+        """
+        request = sn13_validator_pb2.ValidateRedditTopicRequest(topic=topic)
+        return await make_async_request(
+            self._client,
+            sn13_validator_pb2_grpc.Sn13ServiceStub,
+            "ValidateRedditTopic",
+            request,
+        )
+
+    async def refresh_topic_index(
+        self,
+        sources: Iterable[str] = DEFAULT_TOPIC_SOURCES,
+        index: Optional[TopicIndex] = None,
+        force: bool = False,
+    ) -> TopicIndex:
+        """
+        Loads the topics of each source into a local topic index with `ListTopics`, for lookups,
+        autocomplete and size estimates without a round trip. Sources whose topics are still warm
+        are skipped unless `force` is set.
+
+        Args:
+            sources (List[str]): The sources to index (default: X and Reddit)
+            index (TopicIndex): The index to fill (default: the process-wide index, which is also
+                used to validate Gravity task topics)
+            force (bool): Reload sources whose topics are still warm (default: False)
+        Returns:
+            TopicIndex: The index
+        """
+        index = index if index is not None else default_topic_index()
+        stale = [source for source in sources if force or not index.is_warm(source)]
+        responses = await asyncio.gather(*(self.ListTopics(source) for source in stale))
+        for source, response in zip(stale, responses):
+            index.load(source, response.details)
+        return index
+
+    async def maintain_topic_index(
+        self,
+        sources: Iterable[str] = DEFAULT_TOPIC_SOURCES,
+        index: Optional[TopicIndex] = None,
+        interval: Optional[float] = None,
+    ) -> None:
+        """
+        Keeps a topic index warm by refreshing it periodically, until cancelled. Run it as a
+        background task, e.g. `asyncio.create_task(client.sn13.maintain_topic_index())`.
+
+        A failed refresh is retried at the next interval; the index keeps its previous topics.
+
+        Args:
+            sources (List[str]): The sources to index (default: X and Reddit)
+            index (TopicIndex): The index to fill (default: the process-wide index)
+            interval (float): Seconds between refreshes (default: half of the index's max_age)
+        """
+        index = index if index is not None else default_topic_index()
+        sources = list(sources)
+        while True:
             try:
-                channel = self._client.get_async_channel()
-                stub = sn13_validator_pb2_grpc.Sn13ServiceStub(channel)
-                method = getattr(stub, method_name)
-                response = await method(
-                    request,
-                    metadata=metadata,
-                    timeout=self._client.timeout,
-                    compression=compression,
+                await self.refresh_topic_index(sources, index, force=True)
+            except MacrocosmosError:
+                pass
+            await asyncio.sleep(interval if interval is not None else index.max_age / 2)
+
+    def iter_on_demand_data(
+        self,
+        source: str,
+        usernames: Optional[List[str]] = None,
+        keywords: Optional[List[str]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        limit: int = 100,
+        keyword_mode: Optional[str] = None,
+        url: Optional[str] = None,
+    ) -> StreamGenerator[Dict[str, Any]]:
+        """
+        Retrieves on-demand data like `OnDemandData`, but yields the posts one at a time, each
+        decoded only when it is reached, instead of returning one dict of every post.
+
+        Consumers can process or write posts while later ones are still undecoded, and the
+        memory of the fully converted response is never needed. Decoding yields to the event
+        loop regularly, so other tasks keep running.
+
+        Args:
+            source (str): The data source (X or Reddit)
+            usernames (List[str]): List of usernames to fetch data from
+            keywords (List[str]): List of keywords to search for
+            start_date (str): Date from which we want to start fetching data. ISO 8601 formatted date string (e.g. "2024-01-01T00:00:00Z")
+            end_date (str): Date up to which we want to fetch data. ISO 8601 formatted date string (e.g. "2024-01-01T00:00:00Z")
+            limit (int): Maximum number of results to return
+            keyword_mode (str): "all" or "any", as for `OnDemandData` (optional)
+            url (str): Single URL for URL search mode (X or YouTube)
+        Yields:
+            dict: Each post, as in the `data` of an `OnDemandData` response
+        """
+        request = _on_demand_data_request(
+            source=source,
+            usernames=usernames,
+            keywords=keywords,
+            start_date=start_date,
+            end_date=end_date,
+            limit=limit,
+            keyword_mode=keyword_mode,
+            url=url,
+        )
+        # The call uses the client's pooled channel, so the stream has no channel to close
+        return StreamGenerator(self._iter_rows(request))
+
+    async def _iter_rows(
+        self, request: sn13_validator_pb2.OnDemandDataRequest
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Make an OnDemandData request and decode its rows one at a time."""
+        response = await make_async_request(
+            self._client,
+            sn13_validator_pb2_grpc.Sn13ServiceStub,
+            "OnDemandData",
+            request,
+        )
+        for index, struct in enumerate(response.data):
+            if index and index % ROWS_PER_YIELD == 0:
+                await asyncio.sleep(0)
+            yield struct_to_dict(struct)
+
+    def tail_on_demand_data(
+        self,
+        source: str,
+        usernames: Optional[List[str]] = None,
+        keywords: Optional[List[str]] = None,
+        keyword_mode: Optional[str] = None,
+        limit: int = 100,
+        interval: float = 60.0,
+        start_date: Optional[str] = None,
+        state: Union[WatermarkStore, str, None] = None,
+        max_polls: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Follows a query, polling for new posts and yielding only those newer than the newest post
+        seen so far (the watermark), oldest first.
+
+        Each poll only asks for data after the watermark. The watermark of each query is kept in
+        `state`; with a state file, a restarted process continues where it stopped. Posts without
+        a datetime are skipped. A poll that fails is logged and its window is queried again on the
+        next poll; the watermark never moves past a sub-window that failed.
+
+        Args:
+            source (str): The data source (X or Reddit)
+            usernames (List[str]): List of usernames to fetch data from
+            keywords (List[str]): List of keywords to search for
+            keyword_mode (str): "all" or "any", as for `OnDemandData` (optional)
+            limit (int): Maximum number of results per request. Polls that hit it are split into
+                smaller windows, as with `OnDemandDataSharded(adaptive=True)`
+            interval (float): Seconds to wait between polls (default: 60)
+            start_date (str): Where to start when the query has no watermark yet. ISO 8601
+                formatted date string (default: 24h before the first poll)
+            state (WatermarkStore | str): The watermark store, or the path of its state file
+                (default: watermarks are kept in memory only)
+            max_polls (int): Stop after this many polls (default: follow until the consumer stops)
+        Yields:
+            dict: Each new post, as in the `data` of an `OnDemandData` response
+        """
+        if not isinstance(state, WatermarkStore):
+            state = WatermarkStore(state)
+        return tail_on_demand_data(
+            self,
+            source=source,
+            usernames=usernames,
+            keywords=keywords,
+            keyword_mode=keyword_mode,
+            limit=limit,
+            interval=interval,
+            start_date=start_date,
+            state=state,
+            max_polls=max_polls,
+        )
+
+    async def drain_harvest_queue(
+        self,
+        queue: Union[HarvestQueue, str],
+        results_dir: Optional[str] = None,
+        handler: Optional[
+            Callable[[HarvestJob, Dict[str, Any]], Union[Optional[str], Awaitable]]
+        ] = None,
+        max_concurrency: int = 8,
+        max_attempts: int = 3,
+        retry_backoff: float = 1.0,
+    ) -> Dict[str, int]:
+        """
+        Runs the pending jobs of a durable harvest queue concurrently until none are left.
+
+        Each job's response is passed to `handler`, or written to `results_dir`, and the job is
+        marked done with the returned result pointer. A failed job is retried, after an
+        exponential backoff, until it has made `max_attempts` attempts. If the process stops,
+        running this again on the same queue resumes where it stopped, without fetching completed
+        jobs again. Queue updates and result files are written in a thread; a synchronous
+        `handler` runs on the event loop, so make it a coroutine function if it blocks.
+
+        Args:
+            queue (HarvestQueue | str): The queue, or the path of its SQLite database
+            results_dir (str): Directory to write each response to, as `<job id>.json` (optional)
+            handler (Callable): Called with each job and its response; returns the result
+                pointer to record, and may be a coroutine function (optional)
+            max_concurrency (int): Maximum number of requests in flight at once (default: 8)
+            max_attempts (int): Attempts after which a job is marked failed (default: 3)
+            retry_backoff (float): Seconds before the first retry of a job, doubling with each
+                attempt up to 5 minutes (default: 1)
+        Returns:
+            dict: The number of jobs in each state ("pending", "in_flight", "done", "failed")
+        """
+        if not isinstance(queue, HarvestQueue):
+            with HarvestQueue(queue) as opened:
+                return await drain_harvest_queue(
+                    self,
+                    opened,
+                    results_dir,
+                    handler,
+                    max_concurrency,
+                    max_attempts,
+                    retry_backoff,
                 )
-                # MessageToDict removes verbosity due to data and meta fields being google.protobuf.Struct types
-                return MessageToDict(
-                    response, preserving_proto_field_name=True
-                )  # preserving_proto_field_name=True removes lowerCamelCase formatting
-            except grpc.RpcError as e:
-                last_error = MacrocosmosError(f"RPC error: {e.code()}: {e.details()}")
-                retries += 1
-            except Exception as e:
-                raise MacrocosmosError(f"Error calling {method_name}: {e}")
-            finally:
-                if channel:
-                    await channel.close()
-
-        raise last_error
+        return await drain_harvest_queue(
+            self,
+            queue,
+            results_dir,
+            handler,
+            max_concurrency,
+            max_attempts,
+            retry_backoff,
+        )
+
+    async def _make_request(self, method_name, request, lazy: bool = False):
+        """
+        Make a request to the SN13 service.
+
+        Args:
+            method_name: The name of the method to call.
+            request: The request message.
+            lazy: Whether to return a lazy view of the response instead of a dict.
+
+        Returns:
+            The response from the service.
+        """
+        response = await make_async_request(
+            self._client, sn13_validator_pb2_grpc.Sn13ServiceStub, method_name, request
+        )
+        return _convert_response(response, lazy)
 
 
 class SyncSn13:
@@ -126,7 +650,6 @@ class SyncSn13:
             client: The client to use for the resource.
         """
         self._client = client
-        self._async_sn13 = AsyncSn13(client)
 
     def OnDemandData(
         self,
@@ -138,7 +661,8 @@ class SyncSn13:
         limit: int = 100,
         keyword_mode: Optional[str] = None,
         url: Optional[str] = None,
-    ) -> dict[str, Any]:
+        lazy: bool = False,
+    ) -> Union[dict[str, Any], LazyOnDemandDataResponse]:
         """
         Retrieves on-demand data from the SN13 API service synchronously, based on the provided parameters.
 
@@ -152,21 +676,96 @@ class SyncSn13:
             keyword_mode (str): Defines how keywords should be used in selecting response posts (optional):
                 "all" (posts must include all keywords) or "any" (posts can include any combination of keywords)
             url (str): Single URL for URL search mode (X or YouTube)
+            lazy (bool): Return a LazyOnDemandDataResponse that converts rows only when they are
+                accessed instead of a dict, for large responses (default: False)
         Returns:
             dict:
                 - status (str): The request status
                 - data (List[dict]): The data object returned by the miners
                 - meta (dict): Additional metadata about the request
         """
-        return run_sync_threadsafe(
-            self._async_sn13.OnDemandData(
-                source=source,
-                usernames=usernames or [],
-                keywords=keywords or [],
-                start_date=start_date,
-                end_date=end_date,
-                limit=limit,
-                keyword_mode=keyword_mode,
-                url=url,
-            )
+        request = _on_demand_data_request(
+            source=source,
+            usernames=usernames,
+            keywords=keywords,
+            start_date=start_date,
+            end_date=end_date,
+            limit=limit,
+            keyword_mode=keyword_mode,
+            url=url,
+        )
+
+        return self._make_request("OnDemandData", request, lazy=lazy)
+
+    def ListTopics(self, source: str) -> sn13_validator_pb2.ListTopicsResponse:
+        """
+        List the top topics of a source synchronously.
+
+        Args:
+            source (str): The data source (X or Reddit)
+        Returns:
+            ListTopicsResponse: The topics, each with its `label_value` and `content_size_bytes`
+        """
+        request = sn13_validator_pb2.ListTopicsRequest(source=source)
+        return make_sync_request(
+            self._client, sn13_validator_pb2_grpc.Sn13ServiceStub, "ListTopics", request
+        )
+
+    def ValidateRedditTopic(
+        self, topic: str
+    ) -> sn13_validator_pb2.ValidateRedditTopicResponse:
+        """
+        Check whether a subreddit exists, and whether it is NSFW or quarantined, synchronously.
+
+        Args:
+            topic (str): The subreddit, e.g. "r/MachineLearning"
+        Returns:
+            ValidateRedditTopicResponse: Whether the topic `exists`, and its `over18` and `quarantine` flags
+        """
+        request = sn13_validator_pb2.ValidateRedditTopicRequest(topic=topic)
+        return make_sync_request(
+            self._client,
+            sn13_validator_pb2_grpc.Sn13ServiceStub,
+            "ValidateRedditTopic",
+            request,
+        )
+
+    def refresh_topic_index(
+        self,
+        sources: Iterable[str] = DEFAULT_TOPIC_SOURCES,
+        index: Optional[TopicIndex] = None,
+        force: bool = False,
+    ) -> TopicIndex:
+        """
+        Loads the topics of each source into a local topic index with `ListTopics`. See
+        `AsyncSn13.refresh_topic_index`.
+
+        Args:
+            sources (List[str]): The sources to index (default: X and Reddit)
+            index (TopicIndex): The index to fill (default: the process-wide index)
+            force (bool): Reload sources whose topics are still warm (default: False)
+        Returns:
+            TopicIndex: The index
+        """
+        index = index if index is not None else default_topic_index()
+        for source in sources:
+            if force or not index.is_warm(source):
+                index.load(source, self.ListTopics(source).details)
+        return index
+
+    def _make_request(self, method_name, request, lazy: bool = False):
+        """
+        Make a synchronous request to the SN13 service.
+
+        Args:
+            method_name: The name of the method to call.
+            request: The request message.
+            lazy: Whether to return a lazy view of the response instead of a dict.
+
+        Returns:
+            The response from the service.
+        """
+        response = make_sync_request(
+            self._client, sn13_validator_pb2_grpc.Sn13ServiceStub, method_name, request
         )
+        return _convert_response(response, lazy)
@@ -0,0 +1,214 @@
+import heapq
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+# How long a loaded topic list is considered current, in seconds.
+DEFAULT_TOPIC_INDEX_MAX_AGE = 3600.0
+
+# The sources whose topics are indexed by default.
+DEFAULT_TOPIC_SOURCES = ("x", "reddit")
+
+# Number of largest topics kept at each trie node, so completions up to this limit do not
+# walk the subtree.
+COMPLETION_CACHE_SIZE = 10
+
+# What validation does with a well-formed topic missing from a warm index.
+UNKNOWN_TOPIC_POLICIES = ("allow", "warn", "reject")
+
+
+class TopicInfo(NamedTuple):
+    """A topic from `ListTopics`, with the size of the data collected for it."""
+
+    label: str
+    content_size_bytes: int
+    adj_content_size_bytes: int
+
+
+class _TrieNode:
+    __slots__ = ("children", "topic", "largest")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.topic: Optional[TopicInfo] = None
+        # The largest topics of the subtree, largest first
+        self.largest: List[TopicInfo] = []
+
+
+class _SourceTopics:
+    """The topics of one source: a prefix trie plus an exact lookup table."""
+
+    def __init__(self, topics: Iterable[TopicInfo]):
+        self.root = _TrieNode()
+        self.by_label: Dict[str, TopicInfo] = {}
+        for topic in topics:
+            key = _normalize(topic.label)
+            self.by_label[key] = topic
+            node = self.root
+            for char in key:
+                child = node.children.get(char)
+                if child is None:
+                    child = node.children[char] = _TrieNode()
+                node = child
+            node.topic = topic
+        self._rank(self.root)
+        self.loaded_at = time.monotonic()
+
+    @staticmethod
+    def _rank(root: _TrieNode) -> None:
+        """Fill the largest topics of every node, children before their parent."""
+        nodes = []
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            stack.extend(node.children.values())
+        for node in reversed(nodes):
+            candidates = [node.topic] if node.topic is not None else []
+            for child in node.children.values():
+                candidates.extend(child.largest)
+            node.largest = heapq.nlargest(
+                COMPLETION_CACHE_SIZE, candidates, key=_content_size
+            )
+
+    def complete(self, prefix: str, limit: int) -> List[TopicInfo]:
+        node = self.root
+        for char in _normalize(prefix):
+            node = node.children.get(char)
+            if node is None:
+                return []
+        if limit <= COMPLETION_CACHE_SIZE:
+            return node.largest[:limit]
+
+        topics = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.topic is not None:
+                topics.append(node.topic)
+            stack.extend(node.children.values())
+        return heapq.nlargest(limit, topics, key=_content_size)
+
+
+def _content_size(topic: TopicInfo) -> int:
+    return topic.content_size_bytes
+
+
+def _normalize(label: str) -> str:
+    # Hashtags and subreddit names are case-insensitive
+    return label.strip().lower()
+
+
+class TopicIndex:
+    """
+    A local index of the SN13 topics returned by `ListTopics`, per source, for lookups,
+    autocomplete and data size estimates without a round trip.
+
+    Lookups are case-insensitive. The index is filled by `AsyncSn13.refresh_topic_index()`
+    (or its synchronous counterpart) and is warm for a source while its topics are younger
+    than `max_age`. Completions up to 10 topics are read from the trie node of the prefix,
+    without walking the topics below it.
+
+    `ListTopics` only returns the top topics, so a topic missing from the index may still be
+    valid. `unknown_topics` sets what Gravity task validation does with a well-formed topic
+    that is missing from a warm index: "allow" it, so the index only feeds the suggestions
+    for malformed topics, "warn" or "reject" it.
+    """
+
+    def __init__(
+        self,
+        max_age: float = DEFAULT_TOPIC_INDEX_MAX_AGE,
+        unknown_topics: str = "allow",
+    ):
+        """
+        Initialize an empty topic index.
+
+        Args:
+            max_age: Seconds after which the topics of a source are stale. (default: 3600)
+            unknown_topics: "allow", "warn" or "reject" well-formed topics missing from a
+                warm index when validating Gravity tasks. (default: "allow")
+        """
+        if unknown_topics not in UNKNOWN_TOPIC_POLICIES:
+            raise ValueError(
+                f"invalid unknown_topics: {unknown_topics!r}, "
+                f"must be one of {UNKNOWN_TOPIC_POLICIES}"
+            )
+        self.max_age = max_age
+        self.unknown_topics = unknown_topics
+        self._lock = threading.Lock()
+        self._sources: Dict[str, _SourceTopics] = {}
+
+    def load(self, source: str, details: Iterable) -> None:
+        """
+        Replace the topics of a source.
+
+        Args:
+            source: The data source, e.g. "X" or "Reddit".
+            details: The `details` of a `ListTopicsResponse`, or TopicInfo tuples.
+        """
+        topics = _SourceTopics(
+            TopicInfo(
+                detail.label_value,
+                detail.content_size_bytes,
+                detail.adj_content_size_bytes,
+            )
+            if not isinstance(detail, TopicInfo)
+            else detail
+            for detail in details
+        )
+        with self._lock:
+            self._sources[source.lower()] = topics
+
+    def is_warm(self, source: str) -> bool:
+        """Check whether the topics of a source are loaded and not stale."""
+        topics = self._sources.get(source.lower())
+        return topics is not None and time.monotonic() - topics.loaded_at < self.max_age
+
+    def get(self, source: str, topic: str) -> Optional[TopicInfo]:
+        """
+        Look up a topic.
+
+        Returns:
+            The topic, or None if it is not in the index.
+        """
+        topics = self._sources.get(source.lower())
+        if topics is None:
+            return None
+        return topics.by_label.get(_normalize(topic))
+
+    def contains(self, source: str, topic: str) -> bool:
+        """Check whether a topic is in the index."""
+        return self.get(source, topic) is not None
+
+    def content_size(self, source: str, topic: str) -> Optional[int]:
+        """Get the content size in bytes of a topic, or None if it is not in the index."""
+        info = self.get(source, topic)
+        return info.content_size_bytes if info is not None else None
+
+    def complete(self, source: str, prefix: str, limit: int = 10) -> List[TopicInfo]:
+        """
+        Get the topics starting with a prefix, largest first.
+
+        Args:
+            source: The data source, e.g. "X" or "Reddit".
+            prefix: The start of the topic, e.g. "r/mach".
+            limit: The maximum number of topics to return. (default: 10)
+        """
+        topics = self._sources.get(source.lower())
+        if topics is None:
+            return []
+        return topics.complete(prefix, limit)
+
+    def __len__(self) -> int:
+        return sum(len(topics.by_label) for topics in self._sources.values())
+
+
+_default_topic_index = TopicIndex()
+
+
+def default_topic_index() -> TopicIndex:
+    """
+    Get the process-wide topic index, which is refreshed by default by the SN13 resources
+    and consulted when validating Gravity task topics.
+    """
+    return _default_topic_index
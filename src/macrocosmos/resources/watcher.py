@@ -0,0 +1,366 @@
+import asyncio
+import random
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+
+from macrocosmos.generated.gravity.v1 import gravity_pb2
+from macrocosmos.types import CircuitOpenError, MacrocosmosError
+
+# Statuses after which a task or crawler no longer changes.
+TERMINAL_STATUSES = frozenset({"Completed", "Cancelled", "Failed"})
+
+
+def _is_transient(gravity, error: MacrocosmosError) -> bool:
+    """Check whether a failed poll is worth repeating, per the client's retry policy."""
+    if isinstance(error, CircuitOpenError):
+        return True
+    return error.code in gravity._client.retry_policy.retryable_status_codes
+
+
+def _error_backoff(
+    error: MacrocosmosError, failures: int, min_interval: float, max_interval: float
+) -> float:
+    """Get the seconds to wait before polling again after `failures` failed polls."""
+    delay = min(min_interval * 2 ** (failures - 1), max_interval)
+    # Jitter, so pollers started together do not retry together after an outage
+    delay *= random.uniform(0.5, 1.0)
+    if isinstance(error, CircuitOpenError):
+        delay = max(delay, error.retry_after)
+    return delay
+
+
+class TaskStatusChanged(NamedTuple):
+    """A task changed status. `old_status` is None when the task is first seen."""
+
+    task_id: str
+    old_status: Optional[str]
+    new_status: str
+    task: gravity_pb2.GravityTaskState
+
+
+class CrawlerStatusChanged(NamedTuple):
+    """A crawler changed status. `old_status` is None when the crawler is first seen."""
+
+    task_id: str
+    crawler_id: str
+    old_status: Optional[str]
+    new_status: str
+    crawler: gravity_pb2.Crawler
+
+
+class CrawlerRecordsChanged(NamedTuple):
+    """A crawler collected records or bytes since the previous poll."""
+
+    task_id: str
+    crawler_id: str
+    records_delta: int
+    bytes_delta: int
+    records_collected: int
+    bytes_collected: int
+    crawler: gravity_pb2.Crawler
+
+
+class CrawlerReposAdded(NamedTuple):
+    """A crawler published its data to new Hugging Face repos."""
+
+    task_id: str
+    crawler_id: str
+    repos: List[gravity_pb2.HfRepo]
+    crawler: gravity_pb2.Crawler
+
+
+WatcherEvent = Union[
+    TaskStatusChanged, CrawlerStatusChanged, CrawlerRecordsChanged, CrawlerReposAdded
+]
+
+
+class _CrawlerSnapshot(NamedTuple):
+    status: str
+    records_collected: int
+    bytes_collected: int
+    repo_names: frozenset
+
+
+def _crawler_snapshot(crawler: gravity_pb2.Crawler) -> _CrawlerSnapshot:
+    return _CrawlerSnapshot(
+        crawler.state.status,
+        crawler.state.records_collected,
+        crawler.state.bytes_collected,
+        frozenset(repo.repo_name for repo in crawler.state.repos),
+    )
+
+
+def diff_tasks(
+    previous: Dict[str, Any],
+    tasks: Iterable[gravity_pb2.GravityTaskState],
+) -> Tuple[List[WatcherEvent], Dict[str, Any]]:
+    """
+    Compare tasks with their previous snapshot.
+
+    Args:
+        previous: The snapshot returned by the previous call, or an empty dict.
+        tasks: The current task states, with their crawlers.
+
+    Returns:
+        The change events and the new snapshot.
+    """
+    events: List[WatcherEvent] = []
+    snapshot: Dict[str, Any] = {}
+    for task in tasks:
+        task_id = task.gravity_task_id
+        old_status, old_crawlers = previous.get(task_id, (None, {}))
+        if task.status != old_status:
+            events.append(TaskStatusChanged(task_id, old_status, task.status, task))
+
+        crawlers = {}
+        for crawler in task.crawler_workflows:
+            crawler_id = crawler.crawler_id
+            current = crawlers[crawler_id] = _crawler_snapshot(crawler)
+            old = old_crawlers.get(crawler_id)
+            if old is None or current.status != old.status:
+                events.append(
+                    CrawlerStatusChanged(
+                        task_id,
+                        crawler_id,
+                        old.status if old else None,
+                        current.status,
+                        crawler,
+                    )
+                )
+            if old is None:
+                continue
+            records_delta = current.records_collected - old.records_collected
+            bytes_delta = current.bytes_collected - old.bytes_collected
+            if records_delta or bytes_delta:
+                events.append(
+                    CrawlerRecordsChanged(
+                        task_id,
+                        crawler_id,
+                        records_delta,
+                        bytes_delta,
+                        current.records_collected,
+                        current.bytes_collected,
+                        crawler,
+                    )
+                )
+            new_repos = current.repo_names - old.repo_names
+            if new_repos:
+                events.append(
+                    CrawlerReposAdded(
+                        task_id,
+                        crawler_id,
+                        [
+                            repo
+                            for repo in crawler.state.repos
+                            if repo.repo_name in new_repos
+                        ],
+                        crawler,
+                    )
+                )
+        snapshot[task_id] = (task.status, crawlers)
+    return events, snapshot
+
+
+class GravityWatcher:
+    """
+    Watches Gravity tasks and their crawlers with one `GetGravityTasks(include_crawlers=True)`
+    call per poll, however many crawlers there are, and emits typed events for what changed
+    since the previous poll: `TaskStatusChanged`, `CrawlerStatusChanged`,
+    `CrawlerRecordsChanged` and `CrawlerReposAdded`.
+
+    Events are delivered by iterating over the watcher, or to callbacks registered with
+    `on()` while `run()` is running. With `adaptive`, the poll interval is halved after a
+    poll with changes and grows by half after a quiet poll, within `min_interval` and
+    `max_interval`.
+
+    A poll that fails with a transient error, such as UNAVAILABLE after the client's
+    retries or an open circuit, is repeated with exponential backoff up to `max_interval`,
+    and the events are computed against the last successful poll. Other errors are raised.
+    """
+
+    def __init__(
+        self,
+        gravity,
+        task_ids: Optional[Iterable[str]] = None,
+        interval: float = 10.0,
+        adaptive: bool = True,
+        min_interval: float = 2.0,
+        max_interval: float = 60.0,
+        stop_when_done: bool = True,
+    ):
+        """
+        Initialize the watcher.
+
+        Args:
+            gravity: The AsyncGravity resource to poll with.
+            task_ids: The IDs of the tasks to watch; an empty list watches nothing until
+                `track()` is called. (default: None, every task of the user)
+            interval: The initial seconds between polls. (default: 10)
+            adaptive: Whether to adapt the interval to the rate of changes. (default: True)
+            min_interval: The shortest interval when adaptive. (default: 2)
+            max_interval: The longest interval when adaptive, or when backing off after
+                transient errors. (default: 60)
+            stop_when_done: Whether to stop once every watched task has a terminal
+                status. (default: True)
+        """
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("intervals must satisfy 0 < min_interval <= max_interval")
+        self._gravity = gravity
+        self.task_ids: Optional[Set[str]] = (
+            set(task_ids) if task_ids is not None else None
+        )
+        self.interval = interval
+        self.adaptive = adaptive
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.stop_when_done = stop_when_done
+
+        self._snapshot: Dict[str, Any] = {}
+        self._callbacks: List[Tuple[Optional[Type], Callable]] = []
+        self._stopped = False
+        self._polls = 0
+        self._events = 0
+        self._errors = 0
+        self._last_poll: Optional[float] = None
+        self.last_error: Optional[MacrocosmosError] = None
+
+    def on(
+        self, callback: Callable[[WatcherEvent], Any], event_type: Optional[Type] = None
+    ) -> None:
+        """
+        Register a callback for the events delivered by `run()`.
+
+        Args:
+            callback: Called with each event; may be a coroutine function.
+            event_type: Only call it for events of this type. (default: None, all events)
+        """
+        self._callbacks.append((event_type, callback))
+
+    def track(self, task_id: str) -> None:
+        """Start watching a task."""
+        if self.task_ids is None:
+            self.task_ids = set()
+        self.task_ids.add(task_id)
+
+    def untrack(self, task_id: str) -> None:
+        """Stop watching a task."""
+        if self.task_ids is not None:
+            self.task_ids.discard(task_id)
+        self._snapshot.pop(task_id, None)
+
+    def stop(self) -> None:
+        """Stop iterating, or stop `run()`, after the current poll."""
+        self._stopped = True
+
+    @property
+    def done(self) -> bool:
+        """Whether every watched task seen so far has a terminal status."""
+        return bool(self._snapshot) and all(
+            status in TERMINAL_STATUSES for status, _ in self._snapshot.values()
+        )
+
+    async def poll(self) -> List[WatcherEvent]:
+        """
+        Poll the tasks once.
+
+        Returns:
+            The events since the previous poll.
+
+        Raises:
+            MacrocosmosError: If `GetGravityTasks` fails; the snapshot is kept.
+        """
+        if self.task_ids is not None and not self.task_ids:
+            # Nothing to watch: an empty filter must not fetch every task
+            return []
+        if len(self.task_ids or ()) == 1:
+            # A single task is fetched by ID; several are filtered from the user's tasks
+            (task_id,) = self.task_ids
+            response = await self._gravity.GetGravityTasks(
+                gravity_task_id=task_id, include_crawlers=True
+            )
+        else:
+            response = await self._gravity.GetGravityTasks(include_crawlers=True)
+
+        tasks = [
+            task
+            for task in response.gravity_task_states
+            if self.task_ids is None or task.gravity_task_id in self.task_ids
+        ]
+        events, self._snapshot = diff_tasks(self._snapshot, tasks)
+        self._polls += 1
+        self._events += len(events)
+        self._last_poll = time.time()
+
+        if self.adaptive:
+            if events:
+                self.interval = max(self.min_interval, self.interval / 2)
+            else:
+                self.interval = min(self.max_interval, self.interval * 1.5)
+        return events
+
+    def __aiter__(self) -> AsyncIterator[WatcherEvent]:
+        return self._iter_events()
+
+    async def _iter_events(self) -> AsyncIterator[WatcherEvent]:
+        self._stopped = False
+        failures = 0
+        while not self._stopped:
+            try:
+                events = await self.poll()
+            except MacrocosmosError as e:
+                if not _is_transient(self._gravity, e):
+                    raise
+                failures += 1
+                self._errors += 1
+                self.last_error = e
+                await asyncio.sleep(
+                    _error_backoff(e, failures, self.interval, self.max_interval)
+                )
+                continue
+            failures = 0
+            for event in events:
+                yield event
+            if self._stopped or (self.stop_when_done and self.done):
+                return
+            await asyncio.sleep(self.interval)
+
+    async def run(self) -> None:
+        """Poll and call the registered callbacks until stopped or done."""
+        async for event in self:
+            for event_type, callback in self._callbacks:
+                if event_type is None or isinstance(event, event_type):
+                    result = callback(event)
+                    if asyncio.iscoroutine(result):
+                        await result
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the watcher counters for monitoring.
+
+        Returns:
+            A dictionary with the number of `polls`, of `events` emitted, of transient
+            `errors` survived, of `tasks` and `crawlers` watched, the current `interval` and
+            the time of the `last_poll`.
+        """
+        return {
+            "polls": self._polls,
+            "events": self._events,
+            "errors": self._errors,
+            "tasks": len(self._snapshot),
+            "crawlers": sum(len(crawlers) for _, crawlers in self._snapshot.values()),
+            "interval": self.interval,
+            "last_poll": self._last_poll,
+        }
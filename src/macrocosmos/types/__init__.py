@@ -1,5 +1,7 @@
-from ._exceptions import MacrocosmosError
+from ._exceptions import CircuitOpenError, DatasetWaitError, MacrocosmosError
 
 __all__ = [
     "MacrocosmosError",
+    "CircuitOpenError",
+    "DatasetWaitError",
 ]
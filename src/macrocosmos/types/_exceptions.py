@@ -1,4 +1,54 @@
+from typing import Optional
+
+import grpc
+
+
 class MacrocosmosError(Exception):
     """Base exception for Macrocosmos errors."""
 
-    pass
+    def __init__(self, *args, code: Optional[grpc.StatusCode] = None):
+        """
+        Initialize the error.
+
+        Args:
+            code: The status code of the failed RPC, for errors returned by the API.
+        """
+        super().__init__(*args)
+        self.code = code
+
+
+class CircuitOpenError(MacrocosmosError):
+    """Raised without calling the API while the circuit breaker of a service is open."""
+
+    def __init__(self, service: str, retry_after: float):
+        """
+        Initialize the error.
+
+        Args:
+            service: The name of the service whose circuit is open.
+            retry_after: Seconds until the circuit lets a trial call through.
+        """
+        super().__init__(
+            f"Circuit breaker for {service} is open; failing fast (retry in {retry_after:.1f}s)"
+        )
+        self.service = service
+        self.retry_after = retry_after
+
+
+class DatasetWaitError(MacrocosmosError):
+    """Raised when waiting for a dataset fails, with the error as its cause."""
+
+    def __init__(self, dataset_id: str, error: Exception):
+        """
+        Initialize the error.
+
+        Args:
+            dataset_id: The ID of the dataset that could not be waited for.
+            error: The error of the last `GetDataset` call.
+        """
+        super().__init__(
+            f"Waiting for dataset {dataset_id} failed: {error}",
+            code=getattr(error, "code", None),
+        )
+        self.dataset_id = dataset_id
+        self.error = error
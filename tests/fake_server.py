@@ -0,0 +1,117 @@
+import asyncio
+import contextlib
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+
+import grpc
+from google.protobuf import struct_pb2
+
+from macrocosmos.generated.gravity.v1 import gravity_pb2, gravity_pb2_grpc
+from macrocosmos.generated.sn13.v1 import sn13_validator_pb2, sn13_validator_pb2_grpc
+
+
+class FakeGravityService(gravity_pb2_grpc.GravityServiceServicer):
+    """
+    An in-process Gravity service that answers after `delay`, with `error` if it is set.
+
+    `GetGravityTasks` first fails with each status code of `errors` in turn, then returns
+    `tasks`, or a running task with the requested ID if `tasks` is None. Errors carry
+    `trailing_metadata`.
+
+    `GetDataset` answers with the next item of the dataset's entry in `datasets`: a status
+    code to fail with, or the status of the dataset. The last item is repeated.
+    """
+
+    def __init__(self):
+        self.error: Optional[grpc.StatusCode] = None
+        self.errors: List[grpc.StatusCode] = []
+        self.trailing_metadata: Tuple[Tuple[str, str], ...] = ()
+        self.tasks: Optional[List[gravity_pb2.GravityTaskState]] = None
+        self.delay = 0.0
+        self.calls = 0
+        self.datasets: Dict[str, List[Union[grpc.StatusCode, str]]] = {}
+
+    async def GetGravityTasks(self, request, context):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        error = self.errors.pop(0) if self.errors else self.error
+        if error is not None:
+            context.set_trailing_metadata(self.trailing_metadata)
+            await context.abort(error, "injected by the fake server")
+        if self.tasks is not None:
+            return gravity_pb2.GetGravityTasksResponse(gravity_task_states=self.tasks)
+        return gravity_pb2.GetGravityTasksResponse(
+            gravity_task_states=[
+                gravity_pb2.GravityTaskState(
+                    gravity_task_id=request.gravity_task_id, status="Running"
+                )
+            ]
+        )
+
+    async def GetDataset(self, request, context):
+        self.calls += 1
+        script = self.datasets[request.dataset_id]
+        item = script.pop(0) if len(script) > 1 else script[0]
+        if isinstance(item, grpc.StatusCode):
+            await context.abort(item, "injected by the fake server")
+        return gravity_pb2.GetDatasetResponse(
+            dataset=gravity_pb2.Dataset(status=item, total_steps=1)
+        )
+
+
+class FakeSn13Service(sn13_validator_pb2_grpc.Sn13ServiceServicer):
+    """
+    An in-process SN13 service. `OnDemandData` answers with the posts returned by the
+    `handler` coroutine, or fails with the status code it returns instead. The default
+    handler returns one post per request, keyed on its start date.
+
+    Each request is recorded in `requests` with its arrival time in `started`, and the most
+    requests handled at once in `max_in_flight`.
+    """
+
+    def __init__(self):
+        self.handler = self.one_post
+        self.requests: List[sn13_validator_pb2.OnDemandDataRequest] = []
+        self.started: List[float] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @staticmethod
+    async def one_post(request) -> List[dict]:
+        return [{"uri": f"post/{request.start_date}"}]
+
+    async def OnDemandData(self, request, context):
+        self.requests.append(request)
+        self.started.append(time.monotonic())
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            result = await self.handler(request)
+        finally:
+            self.in_flight -= 1
+        if isinstance(result, grpc.StatusCode):
+            await context.abort(result, "injected by the fake server")
+        posts = []
+        for post in result:
+            struct = struct_pb2.Struct()
+            struct.update(post)
+            posts.append(struct)
+        return sn13_validator_pb2.OnDemandDataResponse(status="success", data=posts)
+
+
+@contextlib.asynccontextmanager
+async def serve(
+    servicer: Union[FakeGravityService, FakeSn13Service],
+) -> AsyncIterator[str]:
+    """Serve a fake service on a free local port, yielding its address."""
+    server = grpc.aio.server()
+    if isinstance(servicer, FakeSn13Service):
+        sn13_validator_pb2_grpc.add_Sn13ServiceServicer_to_server(servicer, server)
+    else:
+        gravity_pb2_grpc.add_GravityServiceServicer_to_server(servicer, server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    await server.start()
+    try:
+        yield f"127.0.0.1:{port}"
+    finally:
+        await server.stop(None)
@@ -0,0 +1,52 @@
+import pytest
+
+from macrocosmos.generated.gravity.v1 import gravity_pb2
+from macrocosmos.resources._cache import ResponseCache
+
+NAMESPACE = "test"
+
+
+def cache_response(cache, service, method_name, request, response):
+    key = cache.key(NAMESPACE, service, method_name, request)
+    cache.set(key, response)
+    return key
+
+
+def test_uncached_read_does_not_invalidate_other_reads():
+    cache = ResponseCache(ttl={"OnDemandData": 0})
+    request = gravity_pb2.GetDatasetRequest(dataset_id="dataset")
+    key = cache_response(
+        cache, "Sn13Service", "ListTopics", request, gravity_pb2.GetDatasetResponse()
+    )
+    assert cache.key(NAMESPACE, "Sn13Service", "OnDemandData", request) is None
+
+    cache.on_success("Sn13Service", "OnDemandData")
+    cache.on_success("GravityService", "GetMarketplaceDatasets")
+
+    assert cache.get(key) is not None
+
+
+def test_mutating_call_invalidates_its_service():
+    cache = ResponseCache()
+    request = gravity_pb2.GetDatasetRequest(dataset_id="dataset")
+    gravity_key = cache_response(
+        cache, "GravityService", "GetDataset", request, gravity_pb2.GetDatasetResponse()
+    )
+    billing_key = cache_response(
+        cache, "BillingService", "GetUsage", request, gravity_pb2.GetDatasetResponse()
+    )
+
+    cache.on_success("GravityService", "CancelDataset")
+
+    assert cache.get(gravity_key) is None
+    assert cache.get(billing_key) is not None
+
+
+def test_ttls_are_keyed_by_service_and_method():
+    cache = ResponseCache(ttl={("GravityService", "GetDataset"): 0, "GetCrawler": 1})
+
+    assert not cache.is_cacheable("GravityService", "GetDataset")
+    assert cache.ttls[("GravityService", "GetCrawler")] == 1
+    assert not cache.is_cacheable("BillingService", "GetDataset")
+    with pytest.raises(ValueError):
+        ResponseCache(ttl={"NotAMethod": 5})
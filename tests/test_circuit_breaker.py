@@ -0,0 +1,101 @@
+import asyncio
+
+import grpc
+import pytest
+
+import macrocosmos as mc
+from macrocosmos.resources._circuit_breaker import CircuitState
+from macrocosmos.types import CircuitOpenError, MacrocosmosError
+
+from fake_server import FakeGravityService, serve
+
+FAILURE_THRESHOLD = 3
+RECOVERY_TIMEOUT = 0.2
+
+
+def run_with_client(test):
+    """Run `test(client, service)` against a fresh fake server and client."""
+
+    async def main():
+        service = FakeGravityService()
+        async with serve(service) as address:
+            async with mc.AsyncGravityClient(
+                api_key="test",
+                base_url=address,
+                secure=False,
+                circuit_breaker=mc.CircuitBreakerConfig(
+                    failure_threshold=FAILURE_THRESHOLD,
+                    recovery_timeout=RECOVERY_TIMEOUT,
+                ),
+            ) as client:
+                await test(client, service)
+
+    asyncio.run(main())
+
+
+async def open_circuit(client, service):
+    service.error = grpc.StatusCode.UNAVAILABLE
+    for _ in range(FAILURE_THRESHOLD):
+        with pytest.raises(MacrocosmosError, match="UNAVAILABLE"):
+            await client.gravity.GetGravityTasks(gravity_task_id="task")
+    return client.circuit_breakers["GravityService"]
+
+
+def test_unavailable_opens_circuit_and_fails_fast():
+    async def test(client, service):
+        breaker = await open_circuit(client, service)
+        assert breaker.state == CircuitState.OPEN
+        assert service.calls == FAILURE_THRESHOLD
+
+        with pytest.raises(CircuitOpenError) as error:
+            await client.gravity.GetGravityTasks(gravity_task_id="task")
+        assert error.value.service == "GravityService"
+        assert service.calls == FAILURE_THRESHOLD
+        assert breaker.stats()["rejected_calls"] == 1
+
+    run_with_client(test)
+
+
+def test_half_open_trial_success_closes_circuit():
+    async def test(client, service):
+        breaker = await open_circuit(client, service)
+        service.error = None
+        await asyncio.sleep(RECOVERY_TIMEOUT)
+        assert breaker.state == CircuitState.HALF_OPEN
+
+        response = await client.gravity.GetGravityTasks(gravity_task_id="task")
+        assert response.gravity_task_states[0].gravity_task_id == "task"
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.stats()["consecutive_failures"] == 0
+
+    run_with_client(test)
+
+
+def test_half_open_trial_failure_reopens_circuit():
+    async def test(client, service):
+        breaker = await open_circuit(client, service)
+        await asyncio.sleep(RECOVERY_TIMEOUT)
+
+        with pytest.raises(MacrocosmosError, match="UNAVAILABLE"):
+            await client.gravity.GetGravityTasks(gravity_task_id="task")
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.stats()["times_opened"] == 2
+
+        calls = service.calls
+        with pytest.raises(CircuitOpenError):
+            await client.gravity.GetGravityTasks(gravity_task_id="task")
+        assert service.calls == calls
+
+    run_with_client(test)
+
+
+def test_errors_from_a_healthy_service_keep_circuit_closed():
+    async def test(client, service):
+        service.error = grpc.StatusCode.INVALID_ARGUMENT
+        for _ in range(FAILURE_THRESHOLD + 1):
+            with pytest.raises(MacrocosmosError, match="INVALID_ARGUMENT"):
+                await client.gravity.GetGravityTasks(gravity_task_id="task")
+        assert client.circuit_breakers["GravityService"].state == CircuitState.CLOSED
+        assert service.calls == FAILURE_THRESHOLD + 1
+
+    run_with_client(test)
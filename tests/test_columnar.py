@@ -0,0 +1,42 @@
+import pytest
+from google.protobuf import struct_pb2
+
+from macrocosmos.resources.ondemand.columnar import infer_schema, to_arrow
+
+pa = pytest.importorskip("pyarrow")
+
+COLLIDING_ROWS = [
+    {"user": {"name": "nested"}, "user.name": 5},
+    {"user.name": "literal", "user": {"name": "nested"}},
+    {"user.name": "literal only"},
+    {"other": 1},
+]
+
+
+def to_structs(rows):
+    structs = []
+    for row in rows:
+        struct = struct_pb2.Struct()
+        struct.update(row)
+        structs.append(struct)
+    return structs
+
+
+@pytest.mark.parametrize("convert", [list, to_structs])
+def test_nested_value_wins_over_literal_dotted_key(convert):
+    table = to_arrow(convert(COLLIDING_ROWS))
+
+    assert table.num_rows == len(COLLIDING_ROWS)
+    assert table.schema.field("user.name").type == pa.string()
+    assert table.column("user.name").to_pylist() == [
+        "nested",
+        "nested",
+        "literal only",
+        None,
+    ]
+
+
+def test_dropped_literal_value_does_not_affect_column_type():
+    schema = infer_schema([{"user": {"id": "a"}, "user.id": 1}])
+
+    assert schema.columns == [("user.id", "string")]
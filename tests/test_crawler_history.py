@@ -0,0 +1,182 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from macrocosmos.generated.gravity.v1 import gravity_pb2
+from macrocosmos.resources.crawler_history import CrawlerHistory, _segmented_cumsum
+
+# Entries per crawler, including crawlers with no and a single entry
+LENGTHS = {"a": 12, "empty": 0, "single": 1, "b": 7, "stalled": 5}
+
+
+def synthetic_history(seed=0):
+    """Get {crawler_id: [(seconds, nanos, records, bytes)]}, shuffled within crawlers."""
+    rng = random.Random(seed)
+    history = {}
+    for crawler_id, length in LENGTHS.items():
+        seconds, records, bytes_ = 1_700_000_000, 0, 0
+        entries = []
+        for _ in range(length):
+            # Repeated timestamps and idle intervals make some rates NaN or 0
+            seconds += rng.choice([0, 60, 300, 3600])
+            if crawler_id != "stalled":
+                records += rng.randrange(1000)
+                bytes_ += rng.randrange(10**6)
+            entries.append((seconds, rng.choice([0, 500_000_000]), records, bytes_))
+        rng.shuffle(entries)
+        history[crawler_id] = entries
+    return history
+
+
+def to_response(history):
+    return gravity_pb2.GetCrawlerHistoryResponse(
+        crawlers=[
+            {
+                "crawler_id": crawler_id,
+                "crawler_history": [
+                    {
+                        "ingest_dt": {"seconds": seconds, "nanos": nanos},
+                        "records_collected": records,
+                        "bytes_collected": bytes_,
+                    }
+                    for seconds, nanos, records, bytes_ in entries
+                ],
+            }
+            for crawler_id, entries in history.items()
+        ]
+    )
+
+
+def sorted_columns(entries, column):
+    """Get the times and values of one crawler's entries, in time order."""
+    entries = sorted(entries, key=lambda entry: entry[0] + entry[1] * 1e-9)
+    times = [seconds + nanos * 1e-9 for seconds, nanos, _, _ in entries]
+    values = [entry[2 if column == "records" else 3] for entry in entries]
+    return times, values
+
+
+def loop_rates(times, values, window):
+    rates = []
+    for i in range(len(values)):
+        lag = max(i - window, 0)
+        elapsed = times[i] - times[lag]
+        rates.append((values[i] - values[lag]) / elapsed if elapsed > 0 else math.nan)
+    return rates
+
+
+def loop_moving_average(values, window):
+    averages = []
+    for i in range(len(values)):
+        present = [
+            v for v in values[max(i + 1 - window, 0) : i + 1] if not math.isnan(v)
+        ]
+        averages.append(sum(present) / len(present) if present else math.nan)
+    return averages
+
+
+def loop_time_to_target(times, values, target, window):
+    latest = values[-1] if values else 0
+    rate = loop_rates(times, values, window)[-1] if values else math.nan
+    remaining = target - latest
+    if remaining <= 0:
+        return 0.0
+    if math.isnan(rate) or math.isnan(remaining):
+        return math.nan
+    return remaining / rate if rate > 0 else math.inf
+
+
+def assert_same(actual, expected):
+    np.testing.assert_allclose(actual, np.array(expected, dtype=np.float64), rtol=1e-9)
+
+
+@pytest.fixture
+def history():
+    return synthetic_history()
+
+
+def test_entries_are_sorted_by_time_within_each_crawler(history):
+    crawlers = CrawlerHistory.from_response(to_response(history))
+
+    assert crawlers.crawler_ids == list(LENGTHS)
+    assert list(crawlers.lengths) == list(LENGTHS.values())
+    for crawler_id, entries in history.items():
+        times, records = sorted_columns(entries, "records")
+        _, bytes_ = sorted_columns(entries, "bytes")
+        assert_same(crawlers[crawler_id][0], times)
+        assert list(crawlers[crawler_id][1]) == records
+        assert list(crawlers[crawler_id][2]) == bytes_
+
+
+@pytest.mark.parametrize("column", ["records", "bytes"])
+@pytest.mark.parametrize("window", [1, 3, 20])
+def test_rates_and_moving_average_match_a_loop_per_crawler(history, column, window):
+    crawlers = CrawlerHistory.from_response(to_response(history))
+    rates = crawlers.rates(column, window)
+    averages = crawlers.moving_average(rates, window)
+
+    expected_rates, expected_averages = [], []
+    for entries in history.values():
+        times, values = sorted_columns(entries, column)
+        crawler_rates = loop_rates(times, values, window)
+        expected_rates += crawler_rates
+        expected_averages += loop_moving_average(crawler_rates, window)
+    # A window never reaches into the entries of the previous crawler
+    assert_same(rates, expected_rates)
+    assert_same(averages, expected_averages)
+
+
+def test_time_to_target_matches_a_loop_per_crawler(history):
+    crawlers = CrawlerHistory.from_response(to_response(history))
+    targets = {"a": 10**6, "single": 10, "b": 1, "stalled": 10**6}
+
+    expected = []
+    for crawler_id, entries in history.items():
+        times, values = sorted_columns(entries, "records")
+        target = targets.get(crawler_id, math.nan)
+        expected.append(loop_time_to_target(times, values, target, window=3))
+    assert_same(crawlers.time_to_target(targets, window=3), expected)
+
+    eta = dict(zip(crawlers.crawler_ids, crawlers.time_to_target(targets, window=3)))
+    assert math.isnan(eta["empty"]) and eta["b"] == 0 and eta["stalled"] == math.inf
+    assert_same(
+        crawlers.time_to_target(10**6, window=3),
+        [
+            loop_time_to_target(*sorted_columns(entries, "records"), 10**6, window=3)
+            for entries in history.values()
+        ],
+    )
+
+
+def test_increments_are_summed_per_crawler(history):
+    increments = {
+        crawler_id: [
+            (seconds, nanos, records % 100, bytes_ % 1000)
+            for seconds, nanos, records, bytes_ in entries
+        ]
+        for crawler_id, entries in history.items()
+    }
+    crawlers = CrawlerHistory.from_response(to_response(increments), cumulative=False)
+
+    for crawler_id, entries in increments.items():
+        for position, column in ((1, "records"), (2, "bytes")):
+            _, values = sorted_columns(entries, column)
+            totals = [sum(values[: i + 1]) for i in range(len(values))]
+            assert list(crawlers[crawler_id][position]) == totals
+
+
+def test_segmented_cumsum_restarts_at_each_offset():
+    values = np.array([1, 2, 3, 4, 5, 6])
+    offsets = np.array([0, 2, 2, 3, 6])
+
+    assert list(_segmented_cumsum(values, offsets)) == [1, 3, 3, 4, 9, 15]
+    assert list(_segmented_cumsum(np.array([], dtype=np.int64), np.array([0, 0]))) == []
+
+
+def test_empty_response():
+    crawlers = CrawlerHistory.from_response(gravity_pb2.GetCrawlerHistoryResponse())
+
+    assert len(crawlers) == 0
+    assert len(crawlers.rates()) == 0
+    assert len(crawlers.time_to_target(10)) == 0
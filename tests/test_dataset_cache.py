@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from macrocosmos.resources.datasets.cache import DatasetFileCache, cache_key
+
+
+def add(cache, name, size):
+    """Put a file of `size` bytes in the cache under the key of `name`."""
+    key = cache_key(name, None)
+    with open(cache.staging_path(key), "wb") as f:
+        f.write(os.urandom(size))
+    cache.put(key, cache.staging_path(key), s3_key=name)
+    return key
+
+
+def test_put_get_and_materialize(tmp_path):
+    cache = DatasetFileCache(str(tmp_path / "cache"))
+    key = add(cache, "a.parquet", 10)
+
+    path = cache.get(key)
+    assert path == cache.path(key) and os.path.getsize(path) == 10
+    assert cache.get(cache_key("b.parquet", None)) is None
+
+    destination = str(tmp_path / "out" / "a.parquet")
+    cache.materialize(key, destination)
+    assert os.path.samefile(destination, path)
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    cache = DatasetFileCache(str(tmp_path / "cache"), max_bytes=25)
+    first = add(cache, "a", 10)
+    second = add(cache, "b", 10)
+    cache.get(first)
+
+    third = add(cache, "c", 10)
+
+    assert second not in cache and not os.path.exists(cache.path(second))
+    assert first in cache and third in cache
+    assert cache.stats()["evictions"] == 1
+
+
+def test_hard_link_falls_back_to_symlink_then_copy(tmp_path, monkeypatch):
+    cache = DatasetFileCache(str(tmp_path / "cache"))
+    key = add(cache, "a", 10)
+
+    def fail(*args):
+        raise OSError("not supported")
+
+    monkeypatch.setattr(os, "link", fail)
+    symlinked = cache.materialize(key, str(tmp_path / "symlinked"))
+    assert os.path.islink(symlinked)
+
+    monkeypatch.setattr(os, "symlink", fail)
+    copied = cache.materialize(key, str(tmp_path / "copied"))
+    assert not os.path.islink(copied) and not os.path.samefile(copied, cache.path(key))
+    with open(copied, "rb") as f, open(cache.path(key), "rb") as g:
+        assert f.read() == g.read()
+
+
+@pytest.mark.parametrize("max_bytes", [100, 25])
+def test_instances_sharing_a_directory_keep_each_others_entries(tmp_path, max_bytes):
+    directory = str(tmp_path / "cache")
+    first = DatasetFileCache(directory, max_bytes=max_bytes)
+    second = DatasetFileCache(directory, max_bytes=max_bytes)
+
+    a = add(first, "a", 10)
+    b = add(second, "b", 10)
+    c = add(first, "c", 10)
+    first.save()
+    second.save()
+
+    reopened = DatasetFileCache(directory, max_bytes=max_bytes)
+    cached = {key for key in (a, b, c) if key in reopened}
+    objects = {
+        name
+        for _, _, names in os.walk(os.path.join(directory, "objects"))
+        for name in names
+    }
+    # Evictions see every process's files, and the index matches the objects on disk
+    assert cached == objects
+    assert cached == ({a, b, c} if max_bytes == 100 else {b, c})
+    # A file added by another instance is found without reopening
+    assert second.get(c) == second.path(c)
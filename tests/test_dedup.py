@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from macrocosmos.resources.ondemand.dedup import (
+    BloomDeduplicator,
+    ExactDeduplicator,
+    create_deduplicator,
+    iter_new_rows,
+    load_deduplicator,
+    open_deduplicator,
+)
+
+
+def posts(keys):
+    return [{"uri": f"post/{key}"} for key in keys]
+
+
+@pytest.fixture(params=[{"mode": "exact"}, {"mode": "bloom", "error_rate": 1e-6}])
+def deduplicator(request):
+    return create_deduplicator(**request.param)
+
+
+def test_filter_drops_posts_seen_before_and_repeated_in_a_batch(deduplicator):
+    assert deduplicator.filter(posts([1, 2, 2, 3])) == posts([1, 2, 3])
+    assert deduplicator.filter({"data": posts([3, 4, 1])}) == posts([4])
+    assert deduplicator.filter_response(
+        {"status": "success", "data": posts([4, 5])}
+    ) == {
+        "status": "success",
+        "data": posts([5]),
+    }
+    assert deduplicator.filter([]) == []
+
+    assert "post/5" in deduplicator and {"uri": "post/1"} in deduplicator
+    assert "post/6" not in deduplicator
+    assert len(deduplicator) == 5
+    assert deduplicator.stats()["dropped"] == 4
+
+
+def test_iter_new_rows_spans_responses(deduplicator):
+    responses = [{"data": posts([1, 2])}, {"data": posts([2, 3])}]
+    assert list(iter_new_rows(deduplicator, responses)) == posts([1, 2, 3])
+
+
+def test_exact_deduplicator_merges_runs_without_losing_keys():
+    deduplicator = ExactDeduplicator()
+    for start in range(0, 1000, 7):
+        deduplicator.add(posts(range(start, start + 10)))
+
+    # Runs are merged so that each is more than twice as long as the next
+    runs = [len(run) for run in deduplicator._runs]
+    assert all(earlier > 2 * later for earlier, later in zip(runs, runs[1:]))
+    assert sum(runs) == len(deduplicator) == 1004
+    assert deduplicator.filter(posts(range(1010))) == posts(range(1004, 1010))
+
+
+def test_bloom_false_positive_rate_at_capacity():
+    capacity, error_rate = 10_000, 0.01
+    deduplicator = BloomDeduplicator(capacity=capacity, error_rate=error_rate)
+    assert deduplicator.filter(posts(range(capacity))) != []
+
+    kept = deduplicator.filter(posts(range(capacity, 3 * capacity)))
+    false_positive_rate = 1 - len(kept) / (2 * capacity)
+    assert false_positive_rate < 2 * error_rate
+    # Duplicates are never kept
+    assert deduplicator.filter(posts(range(capacity))) == []
+
+
+@pytest.mark.parametrize(
+    "deduplicator",
+    [ExactDeduplicator(), BloomDeduplicator(capacity=1000, error_rate=0.001)],
+    ids=["exact", "bloom"],
+)
+def test_state_round_trips_through_a_file(tmp_path, deduplicator):
+    path = str(tmp_path / "seen.npz")
+    deduplicator.filter(posts([1, 2, 2, 3]))
+    deduplicator.save(path)
+
+    loaded = load_deduplicator(path)
+    assert type(loaded) is type(deduplicator)
+    assert loaded.stats() == deduplicator.stats()
+    if isinstance(loaded, BloomDeduplicator):
+        assert (loaded.capacity, loaded.error_rate) == (1000, 0.001)
+        assert np.array_equal(loaded._bits, deduplicator._bits)
+    assert loaded.filter(posts([3, 4])) == posts([4])
+
+    assert open_deduplicator(path).stats() == deduplicator.stats()
+    missing = str(tmp_path / "missing.npz")
+    assert len(open_deduplicator(missing, mode=deduplicator.mode)) == 0
+
+
+def test_load_rejects_unknown_state_versions(tmp_path):
+    path = str(tmp_path / "seen.npz")
+    np.savez(path, version=99, mode="exact", counters=np.zeros(2), hashes=np.zeros(0))
+
+    with pytest.raises(ValueError, match="version"):
+        load_deduplicator(path)
+
+
+def test_invalid_options_are_rejected():
+    with pytest.raises(ValueError, match="mode"):
+        create_deduplicator("fuzzy")
+    with pytest.raises(ValueError, match="error_rate"):
+        BloomDeduplicator(error_rate=1)
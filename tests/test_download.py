@@ -0,0 +1,129 @@
+import contextlib
+import http.server
+import os
+import re
+import threading
+
+import pytest
+
+from macrocosmos.resources.datasets.download import (
+    dataset_file_specs,
+    download_dataset_files,
+)
+from macrocosmos.types import MacrocosmosError
+
+PART_SIZE = 1000
+
+
+class FileHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Serve `files` by name, answering range requests unless `ranges` is False, and sending
+    Content-Length headers unless `lengths` is False.
+    """
+
+    files = {}
+    ranges = True
+    lengths = True
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Accept-Ranges", "bytes")
+        if self.lengths:
+            self.send_header("Content-Length", str(len(self.files["file.bin"])))
+        self.end_headers()
+
+    def do_GET(self):
+        data = self.files[self.path.lstrip("/")]
+        type(self).requests.append(self.headers.get("Range"))
+        match = re.match(r"bytes=(\d+)-(\d+)", self.headers.get("Range") or "")
+        if match and self.ranges:
+            start, end = int(match.group(1)), int(match.group(2))
+            body = data[start : end + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        else:
+            body = data
+            self.send_response(200)
+        if self.lengths:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@contextlib.contextmanager
+def serve(data: bytes, ranges: bool = True, lengths: bool = True):
+    handler = type(
+        "Handler",
+        (FileHandler,),
+        {
+            "files": {"file.bin": data},
+            "ranges": ranges,
+            "lengths": lengths,
+            "requests": [],
+        },
+    )
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/file.bin", handler
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.parametrize("ranges", [True, False])
+def test_download_matches_file_with_or_without_range_support(tmp_path, ranges):
+    data = os.urandom(10 * PART_SIZE + 123)
+    with serve(data, ranges) as (url, handler):
+        files = [{"file_name": "file.bin", "url": url, "file_size_bytes": len(data)}]
+        (path,) = download_dataset_files(
+            files, str(tmp_path), max_connections=4, part_size=PART_SIZE
+        )
+
+    with open(path, "rb") as f:
+        assert f.read() == data
+    assert sorted(os.listdir(tmp_path)) == ["file.bin"]
+    assert len(handler.requests) == 11
+
+
+@pytest.mark.parametrize("lengths", [True, False])
+def test_file_size_is_probed_or_streamed_whole(tmp_path, lengths):
+    data = os.urandom(3 * PART_SIZE)
+    with serve(data, lengths=lengths) as (url, handler):
+        files = [{"file_name": "file.bin", "url": url}]
+        (path,) = download_dataset_files(files, str(tmp_path), part_size=PART_SIZE)
+
+    with open(path, "rb") as f:
+        assert f.read() == data
+    if lengths:
+        # The HEAD request reported the size, so the file is fetched in ranges
+        assert len(handler.requests) == 3 and None not in handler.requests
+    else:
+        assert handler.requests == [None]
+
+
+def test_empty_body_without_size_is_not_a_complete_file(tmp_path):
+    with serve(b"", lengths=False) as (url, _):
+        files = [{"file_name": "file.bin", "url": url}]
+        with pytest.raises(MacrocosmosError, match="no data and no size"):
+            download_dataset_files(files, str(tmp_path))
+
+    assert not os.path.exists(tmp_path / "file.bin")
+
+
+@pytest.mark.parametrize("dataset_id", ["..", "../escape", "a/b", "a\\b", "."])
+def test_unsafe_dataset_id_is_rejected(tmp_path, dataset_id):
+    files = [{"dataset_id": dataset_id, "file_name": "file.bin", "url": "http://x/f"}]
+    with pytest.raises(ValueError, match="unsafe dataset ID"):
+        dataset_file_specs(files, str(tmp_path))
+
+
+def test_unsafe_file_name_is_rejected(tmp_path):
+    files = [{"dataset_id": "ds", "file_name": "..", "url": "http://x/f"}]
+    with pytest.raises(ValueError, match="unsafe file name"):
+        dataset_file_specs(files, str(tmp_path))
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import os
+import sqlite3
+import time
+
+from macrocosmos.resources.ondemand.jobs import (
+    DONE,
+    FAILED,
+    IN_FLIGHT,
+    PENDING,
+    HarvestQueue,
+    drain_harvest_queue,
+)
+from macrocosmos.types import MacrocosmosError
+
+SPECS = [{"source": "X", "keywords": ["a"]}, {"source": "X", "keywords": ["b"]}]
+
+
+def test_claim_complete_and_fail():
+    with HarvestQueue(":memory:") as queue:
+        assert queue.enqueue(SPECS + SPECS[:1]) == 2
+
+        (job,) = queue.claim()
+        assert (job.spec, job.state, job.attempts) == (SPECS[0], IN_FLIGHT, 1)
+        queue.complete(job.id, "result.json")
+
+        (job,) = queue.claim()
+        queue.fail(job.id, "boom", retry=False)
+        assert queue.claim() == []
+        assert queue.counts() == {PENDING: 0, IN_FLIGHT: 0, DONE: 1, FAILED: 1}
+        (failed,) = queue.jobs(FAILED)
+        assert failed.error == "boom"
+
+        assert queue.retry_failed() == 1
+        (job,) = queue.claim()
+        assert job.attempts == 1
+
+
+def test_failed_job_is_not_claimed_before_its_delay():
+    with HarvestQueue(":memory:") as queue:
+        queue.enqueue(SPECS[:1])
+        (job,) = queue.claim()
+        queue.fail(job.id, "unavailable", delay=60)
+
+        assert queue.claim() == []
+        assert queue.next_available() > time.time() + 50
+
+        queue.fail(job.id, "unavailable", delay=0)
+        assert [job.id for job in queue.claim()] == [job.id]
+        assert queue.next_available() is None
+
+
+def test_reopening_requeues_jobs_in_flight(tmp_path):
+    path = str(tmp_path / "queue.db")
+    with HarvestQueue(path) as queue:
+        queue.enqueue(SPECS)
+        queue.claim(2)
+        assert queue.counts()[IN_FLIGHT] == 2
+
+    with HarvestQueue(path) as queue:
+        assert queue.counts()[PENDING] == 2
+        assert [job.attempts for job in queue.claim(2)] == [2, 2]
+
+
+def test_queue_created_without_available_at_is_migrated(tmp_path):
+    path = str(tmp_path / "queue.db")
+    db = sqlite3.connect(path)
+    db.execute(
+        "CREATE TABLE jobs (id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL "
+        "UNIQUE, spec TEXT NOT NULL, state TEXT NOT NULL, attempts INTEGER NOT NULL "
+        "DEFAULT 0, result TEXT, error TEXT, updated_at REAL NOT NULL)"
+    )
+    db.execute(
+        "INSERT INTO jobs (key, spec, state, updated_at) VALUES ('k', '{}', ?, 0)",
+        (PENDING,),
+    )
+    db.commit()
+    db.close()
+
+    with HarvestQueue(path) as queue:
+        assert len(queue.claim()) == 1
+
+
+class FlakySn13:
+    """Fails the first `failures` calls of each spec, then answers with the spec."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = {}
+
+    async def OnDemandData(self, **spec):
+        key = json.dumps(spec, sort_keys=True)
+        self.calls.setdefault(key, []).append(time.monotonic())
+        if len(self.calls[key]) <= self.failures:
+            raise MacrocosmosError("UNAVAILABLE")
+        return {"status": "success", "data": [spec], "meta": {}}
+
+
+def drain(sn13, queue, **kwargs):
+    return asyncio.run(drain_harvest_queue(sn13, queue, retry_backoff=0.05, **kwargs))
+
+
+def test_drain_retries_failed_jobs_with_backoff(tmp_path):
+    sn13 = FlakySn13(failures=2)
+    with HarvestQueue(":memory:") as queue:
+        queue.enqueue(SPECS)
+        counts = drain(sn13, queue, results_dir=str(tmp_path), max_attempts=3)
+
+        assert counts[DONE] == 2
+        for times in sn13.calls.values():
+            gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+            # The backoff doubles from 0.05s, with jitter down to half
+            assert gaps[0] >= 0.02 and gaps[1] >= 0.045
+        for job in queue.jobs():
+            with open(job.result) as f:
+                assert json.load(f)["data"] == [job.spec]
+        assert sorted(os.listdir(tmp_path)) == ["00000001.json", "00000002.json"]
+
+
+def test_drain_marks_jobs_failed_after_max_attempts():
+    sn13 = FlakySn13(failures=5)
+    with HarvestQueue(":memory:") as queue:
+        queue.enqueue(SPECS)
+        counts = drain(sn13, queue, handler=lambda job, response: None, max_attempts=2)
+
+        assert counts[FAILED] == 2
+        assert all(len(times) == 2 for times in sn13.calls.values())
+        assert {job.error for job in queue.jobs()} == {"UNAVAILABLE"}
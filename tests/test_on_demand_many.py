@@ -0,0 +1,190 @@
+import asyncio
+
+import grpc
+import pytest
+
+import macrocosmos as mc
+from macrocosmos.resources._retry import RetryPolicy
+from macrocosmos.resources.ondemand.dedup import ExactDeduplicator
+from macrocosmos.resources.ondemand.rows import parse_datetime
+from macrocosmos.types import MacrocosmosError
+
+from fake_server import FakeSn13Service, serve
+
+START, END = "2025-01-01T00:00:00Z", "2025-01-01T08:00:00Z"
+
+
+def run(service, call):
+    """Run `call(sn13)` against the fake server, returning its result."""
+
+    async def main():
+        async with serve(service) as address:
+            async with mc.AsyncSn13Client(
+                api_key="test",
+                base_url=address,
+                secure=False,
+                retry_policy=RetryPolicy(max_retries=0),
+                circuit_breaker=mc.CircuitBreakerConfig(enabled=False),
+            ) as client:
+                return await call(client.sn13)
+
+    return asyncio.run(main())
+
+
+def collect(**kwargs):
+    async def call(sn13):
+        return [result async for result in sn13.OnDemandDataMany(**kwargs)]
+
+    return call
+
+
+def keyword_requests(count):
+    return [{"source": "X", "keywords": [str(i)]} for i in range(count)]
+
+
+def window_seconds(request):
+    start = parse_datetime(request.start_date)
+    return (parse_datetime(request.end_date) - start).total_seconds()
+
+
+def test_many_bounds_requests_in_flight():
+    service = FakeSn13Service()
+
+    async def slow(request):
+        await asyncio.sleep(0.05)
+        return [{"uri": f"post/{request.keywords[0]}"}]
+
+    service.handler = slow
+    results = run(service, collect(requests=keyword_requests(10), max_concurrency=3))
+
+    assert service.max_in_flight == 3
+    assert all(result.ok for result in results)
+    assert sorted(result.index for result in results) == list(range(10))
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_many_yields_in_input_or_completion_order(ordered):
+    service = FakeSn13Service()
+
+    async def later_first(request):
+        # Later requests answer sooner
+        await asyncio.sleep(0.2 - 0.05 * int(request.keywords[0]))
+        return [{"uri": f"post/{request.keywords[0]}"}]
+
+    service.handler = later_first
+    results = run(service, collect(requests=keyword_requests(4), ordered=ordered))
+
+    indices = [result.index for result in results]
+    assert indices == ([0, 1, 2, 3] if ordered else [3, 2, 1, 0])
+    assert [result.response["data"] for result in results] == [
+        [{"uri": f"post/{index}"}] for index in indices
+    ]
+
+
+def test_many_paces_request_starts():
+    service = FakeSn13Service()
+    run(service, collect(requests=keyword_requests(5), rate_limit=20))
+
+    gaps = [
+        later - earlier for earlier, later in zip(service.started, service.started[1:])
+    ]
+    assert all(gap >= 0.04 for gap in gaps)
+
+
+def test_many_captures_errors_and_drops_seen_posts():
+    service = FakeSn13Service()
+
+    async def handler(request):
+        if request.keywords[0] == "1":
+            return grpc.StatusCode.INVALID_ARGUMENT
+        return [{"uri": "post/shared"}, {"uri": f"post/{request.keywords[0]}"}]
+
+    service.handler = handler
+    deduplicator = ExactDeduplicator()
+    results = run(
+        service,
+        collect(requests=keyword_requests(3), ordered=True, deduplicator=deduplicator),
+    )
+
+    assert [result.ok for result in results] == [True, False, True]
+    assert isinstance(results[1].error, MacrocosmosError)
+    assert results[0].response["data"] == [{"uri": "post/shared"}, {"uri": "post/0"}]
+    assert results[2].response["data"] == [{"uri": "post/2"}]
+    assert results[1].request == {"source": "X", "keywords": ["1"]}
+
+
+def sharded(**kwargs):
+    async def call(sn13):
+        return await sn13.OnDemandDataSharded(
+            source="X", start_date=START, end_date=END, **kwargs
+        )
+
+    return call
+
+
+def test_adaptive_sharding_splits_full_windows_down_to_the_minimum():
+    service = FakeSn13Service()
+
+    async def full(request):
+        return [{"uri": f"post/{request.start_date}/{i}"} for i in range(2)]
+
+    service.handler = full
+    response = run(
+        service, sharded(shards=2, limit=2, adaptive=True, min_shard_seconds=3600)
+    )
+
+    # 4h windows split into 2h windows, which split into 1h windows
+    assert sorted({window_seconds(request) for request in service.requests}) == [
+        3600,
+        7200,
+        14400,
+    ]
+    assert response["meta"]["shards"] == len(service.requests) == 2 + 4 + 8
+    assert response["status"] == "success"
+
+
+def test_sharded_merges_posts_without_duplicates_across_shards():
+    service = FakeSn13Service()
+
+    async def with_boundary_post(request):
+        # Every shard also returns a post on its boundary with the previous one
+        return [{"uri": "post/boundary"}, {"uri": f"post/{request.start_date}"}]
+
+    service.handler = with_boundary_post
+    deduplicator = ExactDeduplicator()
+    deduplicator.add([{"uri": "post/2025-01-01T06:00:00Z"}])
+    response = run(service, sharded(shards=4, deduplicator=deduplicator))
+
+    assert [row["uri"] for row in response["data"]] == [
+        "post/boundary",
+        "post/2025-01-01T00:00:00Z",
+        "post/2025-01-01T02:00:00Z",
+        "post/2025-01-01T04:00:00Z",
+    ]
+    assert response["meta"]["duplicates_removed"] == 3
+    assert response["meta"]["previously_seen"] == 1
+
+
+def test_sharded_reports_failed_shards_and_fails_if_all_do():
+    service = FakeSn13Service()
+
+    async def second_fails(request):
+        if request.start_date == "2025-01-01T04:00:00Z":
+            return grpc.StatusCode.INVALID_ARGUMENT
+        return await FakeSn13Service.one_post(request)
+
+    service.handler = second_fails
+    response = run(service, sharded(shards=2))
+    assert response["status"] == "partial"
+    assert [
+        (shard["start_date"], shard["end_date"])
+        for shard in response["meta"]["failed_shards"]
+    ] == [("2025-01-01T04:00:00Z", END)]
+    assert len(response["data"]) == 1
+
+    async def all_fail(request):
+        return grpc.StatusCode.INVALID_ARGUMENT
+
+    service.handler = all_fail
+    with pytest.raises(MacrocosmosError, match="INVALID_ARGUMENT"):
+        run(service, sharded(shards=2))
@@ -0,0 +1,98 @@
+import asyncio
+import fcntl
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+
+import macrocosmos as mc
+
+from fake_server import FakeGravityService, serve
+
+RATE = 50
+PROCESSES = 4
+CALLS = 25
+
+
+def reserve_calls(directory: str, start: float, queue) -> None:
+    # Wait for every process to be ready, so that they contend for the bucket together
+    time.sleep(max(start - time.time(), 0))
+    limiter = mc.RateLimiter(
+        {"GravityService": RATE}, backend=mc.FileRateLimitBackend(directory)
+    )
+    scheduled = []
+    for _ in range(CALLS):
+        wait = limiter.reserve("key", "GravityService", "GetCrawler")
+        scheduled.append(time.time() + wait)
+    queue.put(scheduled)
+
+
+def test_file_backend_limits_calls_across_processes(tmp_path):
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    start = time.time() + 1.0
+    processes = [
+        context.Process(target=reserve_calls, args=(str(tmp_path), start, queue))
+        for _ in range(PROCESSES)
+    ]
+    for process in processes:
+        process.start()
+    scheduled = sorted(time for _ in processes for time in queue.get(timeout=30))
+    for process in processes:
+        process.join(timeout=30)
+
+    assert len(scheduled) == PROCESSES * CALLS
+    # With the default burst of 1, calls are spaced by 1 / RATE across all processes
+    tolerance = 0.001
+    gaps = [later - earlier for earlier, later in zip(scheduled, scheduled[1:])]
+    assert min(gaps) >= 1 / RATE - tolerance
+    first_second = [time for time in scheduled if time < scheduled[0] + 1]
+    assert len(first_second) <= RATE + 1
+
+
+def test_default_burst_is_one_call():
+    assert mc.RateLimit(50).burst == 1
+    limiter = mc.RateLimiter({"*": 50})
+    waits = [limiter.reserve("key", "GravityService", "GetCrawler") for _ in range(3)]
+    assert waits[0] == 0
+    assert waits[1] == pytest.approx(1 / 50, rel=0.1)
+
+
+def test_async_call_waits_for_file_lock_off_the_event_loop(tmp_path):
+    backend = mc.FileRateLimitBackend(str(tmp_path))
+    limiter = mc.RateLimiter({"GravityService": 1000}, backend=backend)
+    # Create the bucket file
+    limiter.reserve("test", "GravityService", "GetGravityTasks")
+    bucket_file = next(tmp_path.iterdir())
+
+    # Another process holding the bucket lock; a separate open file conflicts like one
+    fd = os.open(bucket_file, os.O_RDWR)
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    threading.Timer(0.3, fcntl.flock, (fd, fcntl.LOCK_UN)).start()
+
+    async def main():
+        service = FakeGravityService()
+        async with serve(service) as address:
+            async with mc.AsyncGravityClient(
+                api_key="test", base_url=address, secure=False, rate_limiter=limiter
+            ) as client:
+                ticks = 0
+
+                async def tick():
+                    nonlocal ticks
+                    while True:
+                        await asyncio.sleep(0.01)
+                        ticks += 1
+
+                ticker = asyncio.ensure_future(tick())
+                await client.gravity.GetGravityTasks(gravity_task_id="task")
+                ticker.cancel()
+                return ticks
+
+    try:
+        ticks = asyncio.run(main())
+    finally:
+        os.close(fd)
+    assert ticks >= 10
@@ -0,0 +1,198 @@
+import asyncio
+import time
+
+import grpc
+import pytest
+
+import macrocosmos as mc
+from macrocosmos.resources._retry import (
+    RETRY_PUSHBACK_METADATA_KEY,
+    RetryBudget,
+    RetryPolicy,
+)
+from macrocosmos.resources.gravity import AsyncGravity
+from macrocosmos.types import MacrocosmosError
+
+from fake_server import FakeGravityService, serve
+
+UNAVAILABLE = grpc.StatusCode.UNAVAILABLE
+
+
+class RpcError(grpc.RpcError):
+    def __init__(self, code, pushback=None):
+        self._code = code
+        self._pushback = pushback
+
+    def code(self):
+        return self._code
+
+    def trailing_metadata(self):
+        if self._pushback is None:
+            return ()
+        return ((RETRY_PUSHBACK_METADATA_KEY, self._pushback),)
+
+
+def test_only_allowlisted_codes_are_retried():
+    policy = RetryPolicy(max_retries=3)
+    for code in (UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED):
+        assert policy.next_delay(RpcError(code), 0, None) is not None
+    for code in (grpc.StatusCode.INVALID_ARGUMENT, grpc.StatusCode.UNAUTHENTICATED):
+        assert policy.next_delay(RpcError(code), 0, None) is None
+
+    custom = RetryPolicy(
+        max_retries=3, retryable_status_codes=[grpc.StatusCode.ABORTED]
+    )
+    assert custom.next_delay(RpcError(grpc.StatusCode.ABORTED), 0, None) is not None
+    assert custom.next_delay(RpcError(UNAVAILABLE), 0, None) is None
+
+
+def test_retries_stop_after_max_retries():
+    policy = RetryPolicy(max_retries=2)
+    assert policy.next_delay(RpcError(UNAVAILABLE), 1, None) is not None
+    assert policy.next_delay(RpcError(UNAVAILABLE), 2, None) is None
+
+
+def test_backoff_grows_up_to_the_maximum_within_jitter_bounds():
+    exact = RetryPolicy(max_retries=10, initial_backoff=0.1, max_backoff=1.0, jitter=0)
+    assert [exact.backoff(retry) for retry in range(5)] == pytest.approx(
+        [0.1, 0.2, 0.4, 0.8, 1.0]
+    )
+
+    jittered = RetryPolicy(max_retries=10, initial_backoff=1.0, jitter=0.25)
+    delays = [jittered.next_delay(RpcError(UNAVAILABLE), 0, None) for _ in range(200)]
+    assert all(0.75 <= delay <= 1.0 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_server_pushback_overrides_the_backoff():
+    policy = RetryPolicy(max_retries=3, initial_backoff=10.0)
+    assert policy.next_delay(RpcError(UNAVAILABLE, "250"), 0, None) == 0.25
+    # A negative or malformed pushback means do not retry
+    assert policy.next_delay(RpcError(UNAVAILABLE, "-1"), 0, None) is None
+    assert policy.next_delay(RpcError(UNAVAILABLE, "soon"), 0, None) is None
+
+
+def test_total_timeout_bounds_retries_and_attempts():
+    policy = RetryPolicy(
+        max_retries=3, initial_backoff=1.0, jitter=0, total_timeout=0.5
+    )
+    deadline = policy.deadline()
+    assert policy.next_delay(RpcError(UNAVAILABLE), 0, deadline) is None
+    assert policy.attempt_timeout(10.0, deadline) <= 0.5
+    assert policy.attempt_timeout(0.1, deadline) == 0.1
+    assert policy.attempt_timeout(10.0, None) == 10.0
+
+
+def call_with_retries(service, policy):
+    """Call GetGravityTasks once against the fake server, returning the elapsed time."""
+
+    async def main():
+        async with serve(service) as address:
+            async with mc.AsyncGravityClient(
+                api_key="test",
+                base_url=address,
+                secure=False,
+                retry_policy=policy,
+                circuit_breaker=mc.CircuitBreakerConfig(enabled=False),
+            ) as client:
+                start = time.monotonic()
+                try:
+                    await client.gravity.GetGravityTasks(gravity_task_id="task")
+                finally:
+                    elapsed = time.monotonic() - start
+                return elapsed
+
+    return asyncio.run(main())
+
+
+def test_unavailable_is_retried_until_the_call_succeeds():
+    service = FakeGravityService()
+    service.errors = [UNAVAILABLE] * 3
+
+    call_with_retries(service, RetryPolicy(max_retries=3, initial_backoff=0.01))
+
+    assert service.calls == 4
+
+
+def test_call_fails_once_retries_are_exhausted():
+    service = FakeGravityService()
+    service.error = UNAVAILABLE
+
+    with pytest.raises(MacrocosmosError) as error:
+        call_with_retries(service, RetryPolicy(max_retries=2, initial_backoff=0.01))
+
+    assert error.value.code == UNAVAILABLE
+    assert service.calls == 3
+
+
+def test_non_retryable_error_fails_on_the_first_attempt():
+    service = FakeGravityService()
+    service.errors = [grpc.StatusCode.INVALID_ARGUMENT]
+
+    with pytest.raises(MacrocosmosError, match="INVALID_ARGUMENT"):
+        call_with_retries(service, RetryPolicy(max_retries=3, initial_backoff=0.01))
+
+    assert service.calls == 1
+
+
+def test_server_pushback_is_honored_end_to_end():
+    service = FakeGravityService()
+    service.errors = [UNAVAILABLE]
+    service.trailing_metadata = ((RETRY_PUSHBACK_METADATA_KEY, "50"),)
+
+    elapsed = call_with_retries(service, RetryPolicy(max_retries=1, initial_backoff=30))
+
+    assert service.calls == 2
+    assert 0.05 <= elapsed < 5
+
+
+def test_budget_drains_on_failures_and_refuses_retries_at_half():
+    budget = RetryBudget(max_tokens=10, token_ratio=0.5)
+    for _ in range(4):
+        budget.on_failure()
+    assert budget.tokens == 6 and budget.try_retry()
+
+    budget.on_failure()
+    assert budget.tokens == 5 and not budget.try_retry()
+    assert budget.stats()["retries"] == 1
+    assert budget.stats()["retries_throttled"] == 1
+
+
+def test_budget_refills_on_success_up_to_its_capacity():
+    budget = RetryBudget(max_tokens=10, token_ratio=0.5)
+    for _ in range(5):
+        budget.on_failure()
+    budget.on_success()
+    assert budget.tokens == 5.5 and budget.try_retry()
+
+    for _ in range(20):
+        budget.on_success()
+    assert budget.tokens == 10
+
+
+def test_budget_is_shared_by_the_resources_of_a_client():
+    service = FakeGravityService()
+    service.error = UNAVAILABLE
+
+    async def main():
+        async with serve(service) as address:
+            async with mc.AsyncGravityClient(
+                api_key="test",
+                base_url=address,
+                secure=False,
+                retry_policy=RetryPolicy(max_retries=5, initial_backoff=0.01),
+                retry_budget=RetryBudget(max_tokens=4),
+                circuit_breaker=mc.CircuitBreakerConfig(enabled=False),
+            ) as client:
+                for gravity in (client.gravity, AsyncGravity(client)):
+                    with pytest.raises(MacrocosmosError):
+                        await gravity.GetGravityTasks(gravity_task_id="task")
+                return client.retry_budget.stats()
+
+    stats = asyncio.run(main())
+
+    # The first call drains the budget to half after one retry, so the second resource
+    # gets no retry at all
+    assert service.calls == 3
+    assert stats["retries"] == 1
+    assert stats["retries_throttled"] == 2
@@ -0,0 +1,30 @@
+import asyncio
+
+import macrocosmos as mc
+
+from fake_server import FakeGravityService, serve
+
+
+def test_coalesced_callers_get_independent_responses():
+    async def main():
+        service = FakeGravityService()
+        service.delay = 0.1
+        async with serve(service) as address:
+            async with mc.AsyncGravityClient(
+                api_key="test", base_url=address, secure=False
+            ) as client:
+                responses = await asyncio.gather(
+                    *[
+                        client.gravity.GetGravityTasks(gravity_task_id="task")
+                        for _ in range(3)
+                    ]
+                )
+                assert service.calls == 1
+                assert client.single_flight.stats()["coalesced"] == 2
+
+                del responses[0].gravity_task_states[:]
+                assert len(responses[1].gravity_task_states) == 1
+                assert len(responses[2].gravity_task_states) == 1
+                assert responses[1] is not responses[2]
+
+    asyncio.run(main())
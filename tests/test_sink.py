@@ -0,0 +1,133 @@
+import gzip
+import json
+import os
+import time
+
+import pytest
+
+from macrocosmos.resources.ondemand.sink import MANIFEST_NAME, SegmentSink
+
+
+def posts(start, count, **fields):
+    return [
+        {"uri": f"post/{i}", "score": i, **fields} for i in range(start, start + count)
+    ]
+
+
+def read_jsonl(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_segments_rotate_by_rows_and_bytes(tmp_path):
+    by_rows = SegmentSink(str(tmp_path / "rows"), segment_rows=4, buffer_rows=3)
+    with by_rows:
+        by_rows.write(posts(0, 10))
+    assert [segment["rows"] for segment in by_rows.segments] == [4, 4, 2]
+
+    by_bytes = SegmentSink(
+        str(tmp_path / "bytes"), segment_bytes=100, buffer_rows=2, compression="gzip"
+    )
+    with by_bytes:
+        by_bytes.write(posts(0, 10))
+    # Each flush of two posts is about 60 bytes, so every segment holds two flushes
+    assert [segment["rows"] for segment in by_bytes.segments] == [4, 4, 2]
+    rows = [
+        row
+        for segment in by_bytes.segments
+        for row in read_jsonl(str(tmp_path / "bytes" / segment["path"]))
+    ]
+    assert rows == posts(0, 10)
+
+
+def test_segments_rotate_by_age(tmp_path):
+    sink = SegmentSink(str(tmp_path), segment_seconds=0.05)
+    sink.write(posts(0, 2))
+    sink.write(posts(2, 2))
+    assert sink.segments == []
+
+    time.sleep(0.06)
+    sink.write(posts(4, 1))
+    assert [segment["rows"] for segment in sink.segments] == [5]
+
+    sink.write(posts(5, 1))
+    assert [segment["rows"] for segment in sink.close()] == [5, 1]
+
+
+def test_segments_are_renamed_when_complete_and_listed_in_the_manifest(tmp_path):
+    sink = SegmentSink(str(tmp_path), segment_rows=3, buffer_rows=1)
+    sink.write(posts(0, 4))
+
+    assert sorted(os.listdir(tmp_path)) == [
+        MANIFEST_NAME,
+        "part-00000.jsonl",
+        "part-00001.jsonl.part",
+    ]
+    sink.close()
+    assert sorted(os.listdir(tmp_path)) == [
+        MANIFEST_NAME,
+        "part-00000.jsonl",
+        "part-00001.jsonl",
+    ]
+
+    with open(tmp_path / MANIFEST_NAME) as f:
+        manifest = json.load(f)
+    assert manifest["rows"] == 4
+    assert [
+        (segment["index"], segment["path"], segment["format"], segment["rows"])
+        for segment in manifest["segments"]
+    ] == [(0, "part-00000.jsonl", "jsonl", 3), (1, "part-00001.jsonl", "jsonl", 1)]
+    for segment in manifest["segments"]:
+        path = tmp_path / segment["path"]
+        assert segment["file_size_bytes"] == os.path.getsize(path)
+
+    # A new sink on the directory continues the numbering and the manifest
+    with SegmentSink(str(tmp_path)) as sink:
+        sink.write(posts(4, 1))
+    assert [segment["path"] for segment in sink.segments][-1] == "part-00002.jsonl"
+    with open(tmp_path / MANIFEST_NAME) as f:
+        assert json.load(f)["rows"] == 5
+
+
+def test_empty_segment_leaves_no_file(tmp_path):
+    with SegmentSink(str(tmp_path)) as sink:
+        sink.write([])
+        sink.rotate()
+    assert sink.segments == []
+    assert os.listdir(tmp_path) == [MANIFEST_NAME]
+
+
+def test_parquet_segments_cast_posts_to_their_schema(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    with SegmentSink(
+        str(tmp_path), format="parquet", source="X", buffer_rows=2
+    ) as sink:
+        sink.write(posts(0, 2, tag="a"))
+        # A missing column, a column of nulls only and floats for an int column
+        sink.write([{"uri": "post/2", "score": 2.0}, {"uri": "post/3", "extra": None}])
+        sink.write([{"uri": "post/4", "score": 4, "tag": 1}])
+    assert [segment["rows"] for segment in sink.segments] == [5]
+
+    table = pq.read_table(str(tmp_path / "part-00000.parquet"))
+    assert table.column_names == ["uri", "score", "tag"]
+    assert table.column("score").to_pylist() == [0, 1, 2, None, 4]
+    assert table.column("tag").to_pylist() == ["a", "a", None, None, "1"]
+
+
+def test_parquet_segment_rotates_on_incompatible_posts(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    with SegmentSink(str(tmp_path), format="parquet", buffer_rows=1) as sink:
+        sink.write(posts(0, 1))
+        sink.write([{"uri": "post/1", "score": 1.5}])
+        sink.write([{"uri": "post/2", "score": 2, "tag": "new"}])
+        sink.write([{"uri": "post/3", "score": ["a"]}])
+    assert [segment["rows"] for segment in sink.segments] == [1, 1, 1, 1]
+
+    scores = [
+        pq.read_table(str(tmp_path / segment["path"])).column("score").to_pylist()
+        for segment in sink.segments
+    ]
+    assert scores == [[0], [1.5], [2], [["a"]]]
@@ -0,0 +1,105 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from macrocosmos.resources.ondemand.rows import format_datetime
+from macrocosmos.resources.ondemand.tail import (
+    Watermark,
+    WatermarkStore,
+    query_key,
+    tail_on_demand_data,
+)
+from macrocosmos.types import MacrocosmosError
+
+T0 = "2025-01-01T00:00:00Z"
+T1 = "2025-01-01T00:01:00Z"
+T2 = "2025-01-01T00:02:00Z"
+
+
+def post(uri, timestamp):
+    return {"uri": uri, "datetime": timestamp}
+
+
+def response(*rows, failed_since=None):
+    failed = [{"start_date": failed_since, "end_date": T2}] if failed_since else []
+    return {"data": list(rows), "meta": {"failed_shards": failed}}
+
+
+class FakeSn13:
+    """Answers `OnDemandDataSharded` with the next response or error of `responses`."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    async def OnDemandDataSharded(self, **kwargs):
+        self.calls.append(kwargs)
+        result = self.responses.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def tail(sn13, **kwargs):
+    async def main():
+        rows = tail_on_demand_data(
+            sn13, source="X", keywords=["a"], interval=0, **kwargs
+        )
+        return [row["uri"] async for row in rows]
+
+    return asyncio.run(main())
+
+
+def test_posts_sharing_the_watermark_second_are_yielded_once():
+    sn13 = FakeSn13(
+        response(post("a", T0), post("b", T0)),
+        response(post("b", T0), post("a", T0), post("c", T0), post("d", T1)),
+    )
+
+    assert tail(sn13, start_date=T0, max_polls=2) == ["a", "b", "c", "d"]
+    assert sn13.calls[1]["start_date"] == T0
+
+
+def test_watermark_does_not_advance_past_a_failed_shard():
+    sn13 = FakeSn13(
+        response(post("a", T0), post("c", T2), failed_since=T1),
+        response(post("a", T0), post("b", T1), post("c", T2)),
+    )
+
+    assert tail(sn13, start_date=T0, max_polls=2) == ["a", "b", "c"]
+    assert sn13.calls[1]["start_date"] == T0
+
+
+def test_failed_poll_is_retried_on_the_next_poll():
+    sn13 = FakeSn13(MacrocosmosError("every shard failed"), response(post("a", T0)))
+
+    assert tail(sn13, start_date=T0, max_polls=2) == ["a"]
+    assert [call["start_date"] for call in sn13.calls] == [T0, T0]
+
+
+def test_restart_continues_from_the_saved_watermark(tmp_path):
+    path = str(tmp_path / "state.json")
+    first = FakeSn13(response(post("a", T0), post("b", T1)))
+    assert tail(first, start_date=T0, state=WatermarkStore(path), max_polls=1) == [
+        "a",
+        "b",
+    ]
+
+    second = FakeSn13(response(post("b", T1), post("c", T1), post("d", T2)))
+    assert tail(second, start_date=T0, state=WatermarkStore(path), max_polls=1) == [
+        "c",
+        "d",
+    ]
+    assert second.calls[0]["start_date"] == T1
+
+
+def test_watermark_ahead_of_the_clock_skips_the_poll():
+    state = WatermarkStore()
+    future = datetime.now(timezone.utc) + timedelta(minutes=5)
+    state.set(query_key("X", keywords=["a"]), Watermark(future, ["a"]))
+    sn13 = FakeSn13()
+
+    assert tail(sn13, state=state, max_polls=1) == []
+    assert sn13.calls == []
+    assert format_datetime(state.get(query_key("X", keywords=["a"])).timestamp) == (
+        format_datetime(future)
+    )
@@ -0,0 +1,122 @@
+import random
+import warnings
+
+import pytest
+
+from macrocosmos.resources import gravity
+from macrocosmos.resources.topics import COMPLETION_CACHE_SIZE, TopicIndex, TopicInfo
+
+TOPICS = [
+    TopicInfo("r/MachineLearning", 500, 500),
+    TopicInfo("r/Machinists", 50, 50),
+    TopicInfo("r/math", 300, 300),
+    TopicInfo("r/bittensor_", 100, 100),
+]
+
+
+def index_with(topics, **kwargs):
+    index = TopicIndex(**kwargs)
+    index.load("Reddit", topics)
+    return index
+
+
+def test_lookups_are_case_and_whitespace_insensitive():
+    index = index_with(TOPICS)
+
+    assert index.contains("reddit", "  R/machinelearning ")
+    assert index.get("REDDIT", "r/MATH").label == "r/math"
+    assert index.content_size("reddit", "r/bittensor_") == 100
+    assert not index.contains("reddit", "r/unknown")
+    assert not index.contains("x", "r/math")
+    assert len(index) == 4
+
+
+def test_complete_returns_largest_topics_first():
+    index = index_with(TOPICS)
+
+    assert [info.label for info in index.complete("reddit", "r/ma")] == [
+        "r/MachineLearning",
+        "r/math",
+        "r/Machinists",
+    ]
+    assert [info.label for info in index.complete("reddit", "R/MACH", limit=1)] == [
+        "r/MachineLearning"
+    ]
+    assert index.complete("reddit", "r/zzz") == []
+    assert index.complete("x", "#") == []
+
+
+@pytest.mark.parametrize("limit", [1, COMPLETION_CACHE_SIZE, 3 * COMPLETION_CACHE_SIZE])
+def test_complete_matches_a_full_scan(limit):
+    rng = random.Random(0)
+    topics = [
+        TopicInfo(
+            "#" + "".join(rng.choice("abc") for _ in range(rng.randint(1, 6))),
+            rng.randrange(10**6),
+            0,
+        )
+        for _ in range(500)
+    ]
+    index = TopicIndex()
+    index.load("X", topics)
+    by_label = {topic.label: topic for topic in topics}
+
+    for prefix in ("#", "#a", "#ab", "#cab"):
+        expected = sorted(
+            (topic for topic in by_label.values() if topic.label.startswith(prefix)),
+            key=lambda topic: topic.content_size_bytes,
+            reverse=True,
+        )[:limit]
+        assert index.complete("x", prefix, limit=limit) == expected
+
+
+def test_topics_are_stale_after_max_age():
+    index = index_with(TOPICS, max_age=0)
+    assert not index.is_warm("reddit")
+    assert index_with(TOPICS).is_warm("Reddit")
+    assert not TopicIndex().is_warm("reddit")
+
+
+def test_invalid_unknown_topics_policy_is_rejected():
+    with pytest.raises(ValueError, match="unknown_topics"):
+        TopicIndex(unknown_topics="ignore")
+
+
+@pytest.fixture
+def default_index(monkeypatch):
+    index = index_with(TOPICS)
+    monkeypatch.setattr(gravity, "default_topic_index", lambda: index)
+    return index
+
+
+def test_validation_suggests_topics_from_a_warm_index(default_index):
+    with pytest.raises(ValueError, match=r"did you mean: r/math\?"):
+        gravity._validate_topic_prefix_if_applicable("reddit", "math")
+
+    default_index.max_age = 0
+    with pytest.raises(ValueError) as error:
+        gravity._validate_topic_prefix_if_applicable("reddit", "math")
+    assert "did you mean" not in str(error.value)
+
+
+@pytest.mark.parametrize("policy", ["allow", "warn", "reject"])
+def test_unknown_topics_follow_the_index_policy(default_index, policy):
+    default_index.unknown_topics = policy
+    validate = gravity._validate_topic_prefix_if_applicable
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        validate("reddit", "r/MachineLearning")
+
+    if policy == "allow":
+        validate("reddit", "r/new_subreddit")
+    elif policy == "warn":
+        with pytest.warns(UserWarning, match="unknown topic"):
+            validate("reddit", "r/new_subreddit")
+    else:
+        with pytest.raises(ValueError, match="did you mean: r/MachineLearning"):
+            validate("reddit", "r/mach")
+
+    # A stale index never rejects a well-formed topic
+    default_index.max_age = 0
+    validate("reddit", "r/new_subreddit")
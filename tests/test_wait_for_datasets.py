@@ -0,0 +1,87 @@
+import asyncio
+
+import grpc
+import pytest
+
+import macrocosmos as mc
+from macrocosmos.types import DatasetWaitError
+
+from fake_server import FakeGravityService, serve
+
+UNAVAILABLE = grpc.StatusCode.UNAVAILABLE
+FAST = {"interval": 0.01, "min_interval": 0.01, "max_interval": 0.05}
+
+
+def run_with_client(datasets, test):
+    async def main():
+        service = FakeGravityService()
+        service.datasets = datasets
+        async with serve(service) as address:
+            async with mc.AsyncGravityClient(
+                api_key="test",
+                base_url=address,
+                secure=False,
+                circuit_breaker=mc.CircuitBreakerConfig(enabled=False),
+            ) as client:
+                return await test(client)
+
+    return asyncio.run(main())
+
+
+def test_transient_errors_keep_polling_the_dataset():
+    datasets = {
+        "flaky": [UNAVAILABLE, UNAVAILABLE, "Running", UNAVAILABLE, "Completed"],
+        "steady": ["Running", "Completed"],
+    }
+    result = run_with_client(
+        datasets,
+        lambda client: client.gravity.wait_for_datasets(["flaky", "steady"], **FAST),
+    )
+
+    assert {dataset_id: dataset.status for dataset_id, dataset in result.items()} == {
+        "flaky": "Completed",
+        "steady": "Completed",
+    }
+
+
+def test_non_retryable_error_fails_only_its_dataset():
+    datasets = {
+        "missing": [grpc.StatusCode.NOT_FOUND],
+        "steady": ["Running", "Running", "Completed"],
+    }
+    result = run_with_client(
+        datasets,
+        lambda client: client.gravity.wait_for_datasets(
+            ["missing", "steady"], return_exceptions=True, **FAST
+        ),
+    )
+
+    assert isinstance(result["missing"], DatasetWaitError)
+    assert result["missing"].dataset_id == "missing"
+    assert result["missing"].code == grpc.StatusCode.NOT_FOUND
+    assert result["steady"].status == "Completed"
+
+
+def test_non_retryable_error_is_raised_for_its_dataset():
+    datasets = {"missing": [grpc.StatusCode.NOT_FOUND], "steady": ["Running"]}
+    with pytest.raises(DatasetWaitError) as error:
+        run_with_client(
+            datasets,
+            lambda client: client.gravity.wait_for_datasets(
+                ["missing", "steady"], **FAST
+            ),
+        )
+    assert error.value.dataset_id == "missing"
+
+
+def test_errors_persisting_past_the_timeout_are_surfaced():
+    datasets = {"down": [UNAVAILABLE]}
+    with pytest.raises(asyncio.TimeoutError) as error:
+        run_with_client(
+            datasets,
+            lambda client: client.gravity.wait_for_datasets(
+                ["down"], timeout=0.3, **FAST
+            ),
+        )
+    assert isinstance(error.value.__cause__, DatasetWaitError)
+    assert error.value.__cause__.code == UNAVAILABLE
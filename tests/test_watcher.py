@@ -0,0 +1,147 @@
+import asyncio
+
+import grpc
+import pytest
+
+import macrocosmos as mc
+from macrocosmos.generated.gravity.v1 import gravity_pb2
+from macrocosmos.resources.watcher import (
+    CrawlerRecordsChanged,
+    CrawlerReposAdded,
+    CrawlerStatusChanged,
+    TaskStatusChanged,
+    diff_tasks,
+)
+from macrocosmos.types import MacrocosmosError
+
+from fake_server import FakeGravityService, serve
+
+UNAVAILABLE = grpc.StatusCode.UNAVAILABLE
+FAST = {"interval": 0.01, "min_interval": 0.01, "max_interval": 0.05}
+
+
+def task(status="Running", crawler_status="Running", records=0, repos=()):
+    return gravity_pb2.GravityTaskState(
+        gravity_task_id="task",
+        status=status,
+        crawler_workflows=[
+            gravity_pb2.Crawler(
+                crawler_id="crawler",
+                state=gravity_pb2.CrawlerState(
+                    status=crawler_status,
+                    records_collected=records,
+                    bytes_collected=records * 10,
+                    repos=[gravity_pb2.HfRepo(repo_name=name) for name in repos],
+                ),
+            )
+        ],
+    )
+
+
+def run_with_client(service, test):
+    async def main():
+        async with serve(service) as address:
+            async with mc.AsyncGravityClient(
+                api_key="test",
+                base_url=address,
+                secure=False,
+                circuit_breaker=mc.CircuitBreakerConfig(enabled=False),
+            ) as client:
+                return await test(client)
+
+    return asyncio.run(main())
+
+
+def event_types(events):
+    return [type(event) for event in events]
+
+
+def test_diff_tasks_reports_first_seen_tasks_and_crawlers():
+    events, snapshot = diff_tasks({}, [task(records=5)])
+
+    assert event_types(events) == [TaskStatusChanged, CrawlerStatusChanged]
+    assert events[0].old_status is None and events[0].new_status == "Running"
+    assert events[1].old_status is None and events[1].crawler_id == "crawler"
+    assert diff_tasks(snapshot, [task(records=5)])[0] == []
+
+
+def test_diff_tasks_reports_changes_since_the_snapshot():
+    _, snapshot = diff_tasks({}, [task(records=5, repos=["a"])])
+    events, snapshot = diff_tasks(
+        snapshot,
+        [task("Completed", "Completed", records=8, repos=["a", "b"])],
+    )
+
+    assert event_types(events) == [
+        TaskStatusChanged,
+        CrawlerStatusChanged,
+        CrawlerRecordsChanged,
+        CrawlerReposAdded,
+    ]
+    assert events[0].old_status == "Running" and events[0].new_status == "Completed"
+    assert (events[2].records_delta, events[2].bytes_delta) == (3, 30)
+    assert [repo.repo_name for repo in events[3].repos] == ["b"]
+
+    # Tasks missing from the poll are dropped from the snapshot
+    assert diff_tasks(snapshot, []) == ([], {})
+
+
+def test_failed_poll_keeps_the_previous_snapshot():
+    service = FakeGravityService()
+    service.tasks = [task(records=10)]
+
+    async def test(client):
+        watcher = client.gravity.watch(["task"], **FAST)
+        await watcher.poll()
+        service.errors = [UNAVAILABLE]
+        with pytest.raises(MacrocosmosError):
+            await watcher.poll()
+        service.tasks = [task(records=15)]
+        return await watcher.poll()
+
+    events = run_with_client(service, test)
+
+    assert event_types(events) == [CrawlerRecordsChanged]
+    assert events[0].records_delta == 5
+
+
+def test_watcher_keeps_polling_through_transient_errors():
+    service = FakeGravityService()
+    service.errors = [UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED, UNAVAILABLE]
+    service.tasks = [task("Completed", "Completed")]
+
+    async def test(client):
+        watcher = client.gravity.watch(["task"], **FAST)
+        events = [event async for event in watcher]
+        return watcher, events
+
+    watcher, events = run_with_client(service, test)
+
+    assert event_types(events) == [TaskStatusChanged, CrawlerStatusChanged]
+    assert watcher.stats()["errors"] == 3
+    assert watcher.last_error.code == UNAVAILABLE
+    assert service.calls == 4
+
+
+def test_watcher_raises_non_transient_errors():
+    service = FakeGravityService()
+    service.errors = [grpc.StatusCode.PERMISSION_DENIED]
+
+    async def test(client):
+        async for _ in client.gravity.watch(["task"], **FAST):
+            pass
+
+    with pytest.raises(MacrocosmosError, match="PERMISSION_DENIED"):
+        run_with_client(service, test)
+    assert service.calls == 1
+
+
+def test_empty_task_ids_watch_nothing():
+    service = FakeGravityService()
+
+    async def test(client):
+        watcher = client.gravity.watch([], **FAST)
+        return await watcher.poll(), watcher.task_ids
+
+    assert run_with_client(service, test) == ([], set())
+    assert service.calls == 0